@@ -1,9 +1,14 @@
 # app/auth/dependencies.py
 
+import hmac
+
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
 from app.schemas.user import UserResponse
+from app.auth.user_cache import cache_enabled, user_cache
+from app.config import settings
+from app.serialization import user_response
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -35,11 +40,19 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
     if user_id is None:
         raise credentials_exception
 
+    if cache_enabled():
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return cached
+
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
 
-    return UserResponse.model_validate(user)
+    current_user = user_response(user)
+    if cache_enabled():
+        user_cache.set(user_id, current_user)
+    return current_user
 
 
 def get_current_active_user(
@@ -51,3 +64,19 @@ def get_current_active_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
     return current_user
+
+
+def require_internal_token(request: Request) -> None:
+    """
+    Dependency guarding /metrics and /internal/*: the request must carry
+    INTERNAL_API_TOKEN as its bearer token. Without a configured token these
+    endpoints refuse every request.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    auth_header = request.headers.get("Authorization", "")
+    token = auth_header[len("Bearer "):] if auth_header.startswith("Bearer ") else ""
+    if not expected or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Requires the internal API token",
+        )
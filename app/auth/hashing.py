@@ -0,0 +1,113 @@
+# app/auth/hashing.py
+
+"""
+Password hashing off the event loop.
+
+pbkdf2_sha256 costs tens of milliseconds of CPU per call, which would stall every
+other request on the worker if it ran inside an `async def` handler. PasswordHasher
+runs hashing and verification on a thread or process pool instead, and bounds the
+number of calls waiting for it: once HASH_QUEUE_SIZE calls are in flight, new ones
+fail fast with HashingQueueFull so the endpoint can answer 503 right away.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.config import settings
+
+
+class HashingQueueFull(Exception):
+    """Raised when too many hashing calls are already waiting for the pool."""
+
+
+def _hash(password: str) -> str:
+    # Imported lazily so process-pool workers only load the models when first used
+    from app.models.user import User
+
+    return User.hash_password(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    from app.models.user import pwd_context
+
+    return pwd_context.verify(password, hashed)
+
+
+class PasswordHasher:
+    def __init__(self, kind: str = "thread", workers: int = 4, max_pending: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hashing pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use so importing the app does not fork workers
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the pool."""
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against its hash on the pool."""
+        return await self._run(_verify, password, hashed)
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HashingQueueFull("Too many password hashing requests in progress")
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.pending -= 1
+            self.completed += 1
+            self.latency_seconds_total += elapsed
+            self.latency_seconds_max = max(self.latency_seconds_max, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_depth": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_seconds_total": self.latency_seconds_total,
+            "latency_seconds_avg": (
+                self.latency_seconds_total / self.completed if self.completed else 0.0
+            ),
+            "latency_seconds_max": self.latency_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    kind=settings.HASH_POOL_KIND,
+    workers=settings.HASH_POOL_WORKERS,
+    max_pending=settings.HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,39 @@
+# app/auth/user_cache.py
+
+"""
+In-process cache of validated UserResponse objects, keyed by user id.
+
+get_current_user() consults this cache before querying the users table. Entries
+expire after USER_CACHE_TTL seconds and are dropped as soon as a User row is
+updated or deleted through the ORM in this process. Other workers only see such
+changes once their own entry expires, so keep the TTL short.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.cache import LRUCache
+from app.config import settings
+from app.models.user import User
+
+user_cache = LRUCache(max_entries=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+def cache_enabled() -> bool:
+    return settings.USER_CACHE_SIZE > 0 and settings.USER_CACHE_TTL > 0
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_write(orm_execute_state):
+    # Bulk UPDATE/DELETE statements bypass the mapper events above and do not say
+    # which rows they touched, so drop everything.
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            user_cache.clear()
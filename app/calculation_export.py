@@ -0,0 +1,79 @@
+# app/calculation_export.py
+
+"""
+Streaming export of a user's calculation history.
+
+Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE
+(SQLAlchemy's yield_per) and encoded one batch at a time, so the worker only
+ever holds one batch in memory no matter how long the history is.
+"""
+
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.calculation import Calculation
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FIELDS = ("id", "type", "inputs", "result", "formula")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_batches(db: Session, user_id, batch_size: Optional[int] = None):
+    """Yield lists of (id, type, inputs, result, formula) rows for the user, in id order."""
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    query = (
+        select(
+            Calculation.id,
+            Calculation.type,
+            Calculation.inputs,
+            Calculation.result,
+            Calculation.formula,
+        )
+        .where(Calculation.user_id == user_id)
+        .order_by(Calculation.id)
+        .execution_options(yield_per=batch_size)
+    )
+    # Selecting columns rather than entities keeps rows out of the identity map
+    yield from db.execute(query).partitions()
+
+
+def iter_ndjson(db: Session, user_id, batch_size: Optional[int] = None) -> Iterator[str]:
+    """Yield the export as newline-delimited JSON, one chunk per batch."""
+    for rows in iter_batches(db, user_id, batch_size):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n" for row in rows
+        )
+
+
+def iter_csv(db: Session, user_id, batch_size: Optional[int] = None) -> Iterator[str]:
+    """Yield the export as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in iter_batches(db, user_id, batch_size):
+        writer.writerows(
+            (row.id, row.type, json.dumps(row.inputs), row.result, row.formula)
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Only the header remains when the user has no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORTERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
@@ -0,0 +1,320 @@
+# app/calculation_import.py
+
+"""
+Bulk import of calculations for one user.
+
+The request body is parsed incrementally as it arrives and handled in chunks of
+IMPORT_CHUNK_SIZE rows: each chunk is validated, its results are computed, and
+it is written with a single multi-row statement (executemany) or, on
+PostgreSQL with asyncpg, a binary COPY, then committed. Memory therefore stays
+bounded by the chunk size rather than by the upload, and an interrupted import
+keeps the chunks it already committed.
+
+Accepted formats:
+    json    a JSON array of {"type": ..., "inputs": [...]} objects
+    ndjson  one such object per line (the format of /calculations/export)
+    csv     a header row with "type" and "inputs" columns, inputs as a JSON
+            array (the format of /calculations/export?format=csv)
+
+Other keys and columns, such as the "id" and "result" of an export, are ignored.
+"""
+
+import codecs
+import csv
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import JSON, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.calculation import Calculation
+from app.schemas.calculation import (
+    CalculationImportReject,
+    CalculationImportResponse,
+    CalculationImportRow,
+)
+
+IMPORT_CHUNK_SIZE = 1000
+
+# Only the first rejects are listed in the response; all of them are counted
+MAX_REPORTED_REJECTS = 1000
+
+# A single JSON record larger than this is treated as malformed rather than
+# buffered indefinitely while waiting for it to end
+MAX_RECORD_BYTES = 1024 * 1024
+
+MEDIA_TYPES = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "text/csv": "csv",
+}
+
+calculations = Calculation.__table__
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class ImportFormatError(ValueError):
+    """Raised when the body as a whole cannot be parsed; per-row problems are rejects."""
+
+
+def detect_format(content_type: Optional[str], filename: Optional[str] = None) -> Optional[str]:
+    """Map a media type, or failing that a file extension, to an import format."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in MEDIA_TYPES:
+        return MEDIA_TYPES[media_type]
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension in ("json", "ndjson", "csv"):
+            return extension
+    return None
+
+
+# ---------------------------------------------
+# Incremental parsers
+# ---------------------------------------------
+
+
+async def iter_json_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield the elements of a JSON array as its bytes arrive."""
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    chunks = chunks.__aiter__()
+    buffer, pos, eof = "", 0, False
+    # "[" -> "first" (a value or "]") -> "," (a comma or "]") -> "value" -> ... -> "done"
+    expect = "["
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == "[":
+                if char != "[":
+                    raise ImportFormatError("JSON body must be an array")
+                pos, expect = pos + 1, "first"
+                continue
+            if expect == "done":
+                raise ImportFormatError("Unexpected data after the JSON array")
+            if char == "]" and expect in ("first", ","):
+                pos, expect = pos + 1, "done"
+                continue
+            if expect == ",":
+                if char != ",":
+                    raise ImportFormatError(f"Expected ',' or ']' in JSON array, found {char!r}")
+                pos, expect = pos + 1, "value"
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            # A value that ends the buffer may have been cut short, e.g. a number
+            if end is not None and (end < len(buffer) or eof):
+                yield value
+                pos, expect = end, ","
+                continue
+            if len(buffer) - pos > MAX_RECORD_BYTES:
+                raise ImportFormatError("JSON record too large or malformed")
+        if eof:
+            break
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            chunk, eof = b"", True
+        buffer, pos = buffer[pos:] + text.decode(chunk, final=eof), 0
+
+    if expect != "done":
+        raise ImportFormatError("Malformed or unterminated JSON array")
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Yield the complete lines received so far, a batch per chunk."""
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        lines = (pending + text.decode(chunk)).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        if lines:
+            yield lines
+    pending += text.decode(b"", final=True)
+    if pending:
+        yield [pending]
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield one value per non-blank line; a line that is not JSON becomes a reject."""
+    async for lines in _iter_lines(chunks):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                # Passed on for validate_record() to reject, so row numbers stay aligned
+                yield ValueError(f"Invalid JSON: {exc.msg}")
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, str]]:
+    """Yield each data row as a dict keyed by the header row. Rows may not span lines."""
+    header = None
+    async for lines in _iter_lines(chunks):
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            if header is None:
+                header = [name.strip() for name in row]
+                if "type" not in header or "inputs" not in header:
+                    raise ImportFormatError("CSV header must include 'type' and 'inputs'")
+                continue
+            yield dict(zip(header, row))
+
+
+PARSERS = {
+    "json": iter_json_records,
+    "ndjson": iter_ndjson_records,
+    "csv": iter_csv_records,
+}
+
+
+# ---------------------------------------------
+# Validation and insertion
+# ---------------------------------------------
+
+
+def validate_calculation(calc_type, inputs, formula=None) -> CalculationImportRow:
+    """
+    Validate one calculation's type, inputs and formula, as the import does for
+    each row. The form and edit routes use it too.
+
+    Raises:
+        ValueError: With the validation errors joined into one message.
+    """
+    try:
+        return CalculationImportRow(type=calc_type, formula=formula, inputs=inputs)
+    except ValidationError as exc:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+        )
+
+
+def validate_record(record: Any, user_id) -> dict:
+    """
+    Turn one parsed record into a row for the calculations table.
+
+    Raises:
+        ValueError: With a message suitable for the reject list.
+    """
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Expected an object with 'type' and 'inputs'")
+    inputs = record.get("inputs")
+    if isinstance(inputs, str):
+        try:
+            inputs = json.loads(inputs)
+        except json.JSONDecodeError:
+            raise ValueError("inputs: Expected a JSON array of numbers")
+    row = validate_calculation(record.get("type"), inputs, record.get("formula") or None)
+    return Calculation.row_values(row.type.value, user_id, row.inputs, row.formula)
+
+
+def _use_copy(db: AsyncSession) -> bool:
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "asyncpg"
+
+
+async def _copy_rows(db: AsyncSession, rows: List[dict]) -> None:
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    keys = list(rows[0])
+    columns = [calculations.c[key] for key in keys]
+    # asyncpg encodes json columns from their text form; float8[] takes the list
+    encoders = [json.dumps if isinstance(column.type, JSON) else None for column in columns]
+    await raw.driver_connection.copy_records_to_table(
+        calculations.name,
+        columns=[column.name for column in columns],
+        records=[
+            tuple(
+                encode(row[key]) if encode else row[key]
+                for key, encode in zip(keys, encoders)
+            )
+            for row in rows
+        ],
+    )
+
+
+async def insert_rows(db: AsyncSession, rows: List[dict]) -> None:
+    """Write one chunk of validated rows and commit it."""
+    if _use_copy(db):
+        await _copy_rows(db, rows)
+    else:
+        await db.execute(insert(calculations), rows)
+    await db.commit()
+
+
+async def import_calculations(
+    db: AsyncSession,
+    user_id,
+    records: AsyncIterator[Any],
+    chunk_size: Optional[int] = None,
+) -> CalculationImportResponse:
+    """
+    Validate and insert records for the user, chunk by chunk.
+
+    Rows are numbered from 1 in the order they appear in the upload. If the body
+    turns out to be malformed part way through, the chunks committed before that
+    point are kept and the response carries the error.
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    start = time.perf_counter()
+    inserted, rejected = 0, 0
+    rejects: List[CalculationImportReject] = []
+    chunk: List[dict] = []
+    row_number = 0
+    error = None
+
+    try:
+        async for record in records:
+            row_number += 1
+            try:
+                chunk.append(validate_record(record, user_id))
+            except ValueError as exc:
+                rejected += 1
+                if len(rejects) < MAX_REPORTED_REJECTS:
+                    rejects.append(CalculationImportReject(row=row_number, error=str(exc)))
+                continue
+            if len(chunk) >= chunk_size:
+                await insert_rows(db, chunk)
+                inserted += len(chunk)
+                chunk = []
+    except ImportFormatError as exc:
+        error = str(exc)
+    if chunk:
+        await insert_rows(db, chunk)
+        inserted += len(chunk)
+
+    seconds = time.perf_counter() - start
+    return CalculationImportResponse(
+        inserted=inserted,
+        rejected=rejected,
+        rejects=rejects,
+        method="copy" if _use_copy(db) else "executemany",
+        seconds=seconds,
+        rows_per_second=inserted / seconds if seconds > 0 else 0.0,
+        error=error,
+    )
+
+
+async def iter_upload(upload, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Read a multipart UploadFile in chunks; it is spooled to disk when large."""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
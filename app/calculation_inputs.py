@@ -0,0 +1,161 @@
+# app/calculation_inputs.py
+
+"""
+Online migration of calculations.inputs from JSON text to packed floats.
+
+The inputs_packed column holds the same values as inputs, as float8[] on
+PostgreSQL or packed little-endian doubles elsewhere (see app.models.types), and
+loads without going through the JSON decoder. Migrate without downtime by:
+
+1. ``add-column``: add the nullable inputs_packed column.
+2. Deploy with CALCULATION_INPUTS_STORAGE=dual. Reads still use the JSON column,
+   and every insert or update also writes inputs_packed.
+3. ``backfill``: fill inputs_packed for older rows in chunks; it can be
+   interrupted and rerun.
+4. ``check``: compare a random sample of both columns.
+5. Deploy with CALCULATION_INPUTS_STORAGE=packed. Reads and writes use
+   inputs_packed only, and the JSON column can be dropped once no older
+   deployment is left.
+
+Usage:
+    python -m app.calculation_inputs add-column
+    python -m app.calculation_inputs backfill --chunk-size 1000
+    python -m app.calculation_inputs check --sample-size 500
+"""
+
+import argparse
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    bindparam,
+    func,
+    inspect,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models.types import PackedFloats
+
+# Both columns, whichever of them the Calculation model currently maps
+calculations = Table(
+    "calculations",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("inputs", JSON),
+    Column("inputs_packed", PackedFloats),
+)
+
+
+class InputsMismatch(NamedTuple):
+    id: int
+    json: Optional[list]
+    packed: Optional[list]
+
+
+def ensure_packed_column(bind=engine) -> bool:
+    """
+    Add the inputs_packed column to the calculations table if it is missing.
+
+    Returns:
+        bool: True if the column was added.
+    """
+    columns = {column["name"] for column in inspect(bind).get_columns("calculations")}
+    if "inputs_packed" in columns:
+        return False
+    column_type = PackedFloats().compile(dialect=bind.dialect)
+    with bind.begin() as connection:
+        connection.execute(text(f"ALTER TABLE calculations ADD COLUMN inputs_packed {column_type}"))
+    return True
+
+
+def backfill_packed(db: Session, chunk_size: int = 1000) -> int:
+    """
+    Copy inputs into inputs_packed for rows that have none, committing per chunk.
+
+    Rows are walked in id order with a keyset cursor, so every chunk costs the same
+    and locks are only held for one chunk at a time.
+
+    Returns:
+        int: The number of rows written.
+    """
+    statement = (
+        update(calculations)
+        .where(calculations.c.id == bindparam("row_id"))
+        .values(inputs_packed=bindparam("row_inputs", type_=PackedFloats))
+    )
+
+    written, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(calculations.c.id, calculations.c.inputs)
+            .where(
+                calculations.c.id > last_id,
+                calculations.c.inputs_packed.is_(None),
+                calculations.c.inputs.is_not(None),
+            )
+            .order_by(calculations.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return written
+
+        db.execute(statement, [{"row_id": row.id, "row_inputs": row.inputs} for row in rows])
+        db.commit()
+        written += len(rows)
+        last_id = rows[-1].id
+
+
+def check_packed(db: Session, sample_size: int = 100) -> List[InputsMismatch]:
+    """Return the rows of a random sample whose packed inputs differ from the JSON ones."""
+    rows = db.execute(
+        select(calculations.c.id, calculations.c.inputs, calculations.c.inputs_packed)
+        .order_by(func.random())
+        .limit(sample_size)
+    ).all()
+
+    mismatches = []
+    for row in rows:
+        expected = None if row.inputs is None else [float(value) for value in row.inputs]
+        if row.inputs_packed != expected:
+            mismatches.append(InputsMismatch(row.id, row.inputs, row.inputs_packed))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate calculations.inputs to packed floats")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("add-column", help="Add the inputs_packed column")
+    backfill = commands.add_parser("backfill", help="Fill in missing packed inputs")
+    backfill.add_argument("--chunk-size", type=int, default=1000)
+    check = commands.add_parser("check", help="Compare a sample of both columns")
+    check.add_argument("--sample-size", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == "add-column":
+        added = ensure_packed_column()
+        print("Added calculations.inputs_packed" if added else "inputs_packed already exists")
+        return
+
+    with SessionLocal() as db:
+        if args.command == "backfill":
+            count = backfill_packed(db, args.chunk_size)
+            print(f"Backfilled {count} rows")
+        else:
+            mismatches = check_packed(db, args.sample_size)
+            for mismatch in mismatches:
+                print(f"id={mismatch.id} json={mismatch.json} packed={mismatch.packed}")
+            print(f"{len(mismatches)} mismatches in sample of {args.sample_size}")
+            # Non-zero so the check can gate the cutover to packed storage
+            raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# app/calculation_results.py
+
+"""
+Maintenance commands for the materialized calculations.result column.
+
+Rows written before the column existed have no stored result. Use ``backfill``
+to fill them in chunks (it also adds the result, formula and version columns to
+an older table), and ``check`` to recompute a random sample of rows and
+report any that disagree with the stored value.
+
+Usage:
+    python -m app.calculation_results backfill --chunk-size 1000
+    python -m app.calculation_results check --sample-size 500
+"""
+
+import argparse
+import math
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import bindparam, func, inspect, select, text, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models.calculation import Calculation
+
+calculations = Calculation.__table__
+
+
+class ResultMismatch(NamedTuple):
+    id: int
+    stored: Optional[float]
+    expected: Optional[float]
+
+
+def _add_column(bind, name: str, definition: str) -> bool:
+    columns = {column["name"] for column in inspect(bind).get_columns("calculations")}
+    if name in columns:
+        return False
+    with bind.begin() as connection:
+        connection.execute(text(f"ALTER TABLE calculations ADD COLUMN {name} {definition}"))
+    return True
+
+
+def ensure_result_column(bind=engine) -> bool:
+    """
+    Add the result column to an existing calculations table if it is missing.
+
+    Returns:
+        bool: True if the column was added.
+    """
+    return _add_column(bind, "result", "FLOAT")
+
+
+def ensure_formula_column(bind=engine) -> bool:
+    """
+    Add the formula column of expression calculations to an existing calculations
+    table if it is missing.
+
+    Returns:
+        bool: True if the column was added.
+    """
+    return _add_column(bind, "formula", "VARCHAR")
+
+
+def ensure_version_column(bind=engine) -> bool:
+    """
+    Add the row version column to an existing calculations table if it is
+    missing; existing rows start at version 1.
+
+    Returns:
+        bool: True if the column was added.
+    """
+    return _add_column(bind, "version", "INTEGER NOT NULL DEFAULT 1")
+
+
+def backfill_results(db: Session, chunk_size: int = 1000, only_missing: bool = True) -> int:
+    """
+    Compute and store results in chunks of chunk_size rows, committing per chunk.
+    Each written row gets a new version, so cached copies of it are invalidated.
+
+    Rows are walked in id order with a keyset cursor, so every chunk costs the same
+    and the command can be interrupted and rerun. Rows whose result cannot be
+    computed (e.g. a zero divisor) stay NULL.
+
+    Returns:
+        int: The number of rows visited.
+    """
+    statement = update(calculations).where(calculations.c.id == bindparam("row_id"))
+    statement = statement.values(
+        result=bindparam("row_result"), version=calculations.c.version + 1
+    )
+
+    visited, last_id = 0, 0
+    while True:
+        query = (
+            select(
+                calculations.c.id,
+                calculations.c.type,
+                calculations.c.inputs,
+                calculations.c.formula,
+            )
+            .where(calculations.c.id > last_id)
+            .order_by(calculations.c.id)
+            .limit(chunk_size)
+        )
+        if only_missing:
+            query = query.where(calculations.c.result.is_(None))
+        rows = db.execute(query).all()
+        if not rows:
+            return visited
+
+        db.execute(
+            statement,
+            [
+                {
+                    "row_id": row.id,
+                    "row_result": Calculation.compute_result(row.type, row.inputs, row.formula),
+                }
+                for row in rows
+            ],
+        )
+        db.commit()
+        visited += len(rows)
+        last_id = rows[-1].id
+
+
+def check_results(db: Session, sample_size: int = 100) -> List[ResultMismatch]:
+    """
+    Recompute a random sample of rows and return those whose stored result is wrong.
+    """
+    rows = db.execute(
+        select(
+            calculations.c.id,
+            calculations.c.type,
+            calculations.c.inputs,
+            calculations.c.formula,
+            calculations.c.result,
+        )
+        .order_by(func.random())
+        .limit(sample_size)
+    ).all()
+
+    mismatches = []
+    for row in rows:
+        expected = Calculation.compute_result(row.type, row.inputs, row.formula)
+        if expected is None or row.result is None:
+            matches = expected is None and row.result is None
+        else:
+            matches = math.isclose(row.result, expected, rel_tol=1e-9, abs_tol=1e-12)
+        if not matches:
+            mismatches.append(ResultMismatch(row.id, row.result, expected))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain calculations.result")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill = commands.add_parser("backfill", help="Fill in missing results")
+    backfill.add_argument("--chunk-size", type=int, default=1000)
+    backfill.add_argument(
+        "--all", action="store_true", help="Recompute every row, not only missing ones"
+    )
+    check = commands.add_parser("check", help="Recompute a sample of rows")
+    check.add_argument("--sample-size", type=int, default=100)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.command == "backfill":
+            if ensure_result_column():
+                print("Added calculations.result column")
+            if ensure_formula_column():
+                print("Added calculations.formula column")
+            if ensure_version_column():
+                print("Added calculations.version column")
+            count = backfill_results(db, args.chunk_size, only_missing=not args.all)
+            print(f"Backfilled {count} rows")
+        else:
+            mismatches = check_results(db, args.sample_size)
+            for mismatch in mismatches:
+                print(
+                    f"id={mismatch.id} stored={mismatch.stored} expected={mismatch.expected}"
+                )
+            print(f"{len(mismatches)} mismatches in sample of {args.sample_size}")
+            raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
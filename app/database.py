@@ -1,16 +1,169 @@
 # app/database.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from .config import settings
 
 
+class PoolStats:
+    """Thread-safe counters for connection checkouts from a pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / attempts if attempts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class SessionStats:
+    """Thread-safe counters of request sessions, and of those that never queried."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sessions = 0
+        self.unused = 0
+
+    def record(self, used: bool):
+        with self._lock:
+            self.sessions += 1
+            if not used:
+                self.unused += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": self.sessions,
+                "unused": self.unused,
+                "unused_ratio": self.unused / self.sessions if self.sessions else 0.0,
+            }
+
+
+# Sessions handed out by get_db() and get_async_db()
+session_stats = {"sync": SessionStats(), "async": SessionStats()}
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_connected(session, transaction, connection):
+    # Fires when the session first checks a connection out of the pool
+    session.info["connected"] = True
+
+
+class RoutingSession(Session):
+    """
+    Session that can send its reads to a read replica.
+
+    When info["read_bind"] holds an engine, SELECT statements run on it; flushes
+    and every other statement still use the session's own bind, the primary.
+    Once the session has pending changes or has flushed in its transaction, its
+    SELECTs go to the primary as well, so they see its own writes. Without
+    read_bind the session behaves like a plain Session. See app.replicas.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        read_bind = self.info.get("read_bind")
+        if read_bind is not None and getattr(clause, "is_select", False) and not self.writing:
+            return read_bind
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    @property
+    def writing(self) -> bool:
+        """Whether the session has pending changes or flushed in this transaction."""
+        return bool(self.info.get("flushed") or self.new or self.dirty or self.deleted)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info["flushed"] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _clear_flushed(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("flushed", None)
+
+
+class _InstrumentedPoolMixin:
+    """Pool mixin that times how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool with checkout statistics, used by the sync engine."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout statistics, used by the async engine."""
+
+
+def _is_memory_sqlite(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _engine_options(database_url: str, poolclass) -> dict:
+    options = {"echo": settings.DB_ECHO}
+    if not _is_memory_sqlite(database_url):
+        options.update(
+            poolclass=poolclass,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    return options
+
+
 def get_engine(database_url: str = settings.DATABASE_URL):
     """
     Create and return a new SQLAlchemy engine.
 
+    Pool size, overflow, timeout, recycle, pre-ping and statement echo come from
+    settings. In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+
     Args:
         database_url (str): The database connection URL.
 
@@ -18,14 +171,103 @@ def get_engine(database_url: str = settings.DATABASE_URL):
         Engine: A new SQLAlchemy Engine instance.
     """
     try:
-        # Create an engine instance with echo=True to log SQL queries (useful for learning)
-        engine = create_engine(database_url, echo=True)
+        engine = create_engine(
+            database_url, **_engine_options(database_url, InstrumentedQueuePool)
+        )
         return engine
     except SQLAlchemyError as e:
         print(f"Error creating engine: {e}")
         raise
 
 
+def get_pool_status(engine) -> dict:
+    """
+    Report the live state of an engine's connection pool.
+
+    Returns:
+        dict: Configured size, checked-out, idle and overflow connections, plus
+        checkout wait statistics when the pool is an InstrumentedQueuePool.
+    """
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            # overflow() is negative while the pool has not yet opened pool_size connections
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, _InstrumentedPoolMixin):
+        status.update(pool.stats.snapshot())
+    return status
+
+
+# Async drivers used in place of each backend's default sync driver
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str = settings.DATABASE_URL) -> str:
+    """
+    Return the async equivalent of a sync database URL.
+
+    ASYNC_DATABASE_URL takes precedence for DATABASE_URL when it is set.
+    Otherwise the driver is swapped, e.g. postgresql:// becomes
+    postgresql+asyncpg://.
+    """
+    if settings.ASYNC_DATABASE_URL and database_url == settings.DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return database_url
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def get_async_engine(database_url: str = settings.DATABASE_URL):
+    """
+    Create and return a new async SQLAlchemy engine with the same pool settings.
+
+    Args:
+        database_url (str): The sync database connection URL to derive from.
+
+    Returns:
+        AsyncEngine: A new SQLAlchemy AsyncEngine instance.
+    """
+    async_url = get_async_database_url(database_url)
+    try:
+        return create_async_engine(
+            async_url, **_engine_options(async_url, InstrumentedAsyncQueuePool)
+        )
+    except SQLAlchemyError as e:
+        print(f"Error creating async engine: {e}")
+        raise
+
+
+def get_async_sessionmaker(engine):
+    """
+    Create and return a new async_sessionmaker.
+
+    Args:
+        engine (AsyncEngine): The AsyncEngine to bind the sessionmaker to.
+
+    Returns:
+        async_sessionmaker: A configured AsyncSession factory.
+    """
+    return async_sessionmaker(
+        bind=engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        # Attribute access after commit would need an implicit (sync) refresh
+        expire_on_commit=False,
+    )
+
+
 def get_sessionmaker(engine):
     """
     Create and return a new sessionmaker.
@@ -37,6 +279,7 @@ def get_sessionmaker(engine):
         sessionmaker: A configured sessionmaker factory.
     """
     return sessionmaker(
+        class_=RoutingSession,
         autocommit=False,  # Disable autocommit to control transactions manually
         autoflush=False,  # Disable autoflush to control when changes are sent to the DB
         bind=engine,  # Bind the sessionmaker to the provided engine
@@ -46,6 +289,8 @@ def get_sessionmaker(engine):
 # Initialize engine and SessionLocal using the factory functions
 engine = get_engine()
 SessionLocal = get_sessionmaker(engine)
+async_engine = get_async_engine()
+AsyncSessionLocal = get_async_sessionmaker(async_engine)
 
 # Base declarative class that our models will inherit from
 Base = declarative_base()
@@ -58,6 +303,11 @@ def get_db():
     This function can be used with FastAPI's dependency injection system
     to provide a database session to your route handlers.
 
+    The session is lazy: it checks a connection out of the pool only when the
+    first statement runs, and returns it when the request ends. Requests that
+    are rejected (e.g. by auth or a cached user lookup) before any query never
+    hold a pool slot; they are counted as unused in session_stats.
+
     Yields:
         Session: A SQLAlchemy Session instance.
     """
@@ -66,3 +316,21 @@ def get_db():
         yield db  # Provide the session to the caller
     finally:
         db.close()  # Ensure the session is closed after use
+        session_stats["sync"].record(db.info.pop("connected", False))
+
+
+async def get_async_db():
+    """
+    Dependency function that provides an async database session.
+
+    The async counterpart of get_db() for `async def` route handlers, so queries
+    do not block the event loop. It is lazy in the same way.
+
+    Yields:
+        AsyncSession: A SQLAlchemy AsyncSession instance.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        finally:
+            session_stats["async"].record(db.info.pop("connected", False))
@@ -0,0 +1,52 @@
+# app/etags.py
+
+"""
+ETags for the calculation routes.
+
+A calculation's ETag is its id and row version, which every ORM update bumps
+(see Calculation.version). A page's ETag hashes the user, the query string and
+Calculation.page_version_query() for the page. A request whose If-None-Match
+matches gets a 304 after that version-only query, without loading, computing or
+serializing any row.
+
+PUT /calculations/{id} accepts the calculation's ETag in If-Match and answers
+412 if the row has changed since. If-Match uses the strong comparison, so a
+weak ETag (W/"...") never satisfies it; without it, an edit that loses a race with
+another writer gets a 409.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi.responses import Response
+
+
+def calculation_etag(calc_id: int, version: int) -> str:
+    return f'"{calc_id}-{version}"'
+
+
+def page_etag(user_id, query: str, count: int, min_id, max_id, version_sum) -> str:
+    key = f"{user_id}:{query}:{count}:{min_id}:{max_id}:{version_sum}"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def strong_matches(if_match: Optional[str], etag: str) -> bool:
+    """Whether an If-Match header matches etag (strong comparison, per RFC 9110)."""
+    if not if_match:
+        return False
+    if if_match.strip() == "*":
+        return True
+    return etag in {tag.strip() for tag in if_match.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,267 @@
+# app/metrics.py
+
+"""
+Request and database metrics in Prometheus text format.
+
+MetricsMiddleware records, per (method, route template): request count by status
+code, a latency histogram, response bytes, and the number and total duration of
+SQL statements the request ran. SQL statements are timed around the DBAPI execute
+calls of every engine passed to instrument_engine() and attributed to the request
+through a context variable, so both sync and async sessions are covered.
+
+Recording happens on the event loop thread at the end of each request and costs a
+few dictionary updates, so it is cheap enough to leave on; see
+tests/benchmarks/bench_metrics.py. Other subsystems can publish gauges with
+register_collector(). render() produces the /metrics response body.
+"""
+
+import contextvars
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus' default buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of upper bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, cumulative count) pairs, ending with +Inf."""
+        total, buckets = 0, []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+
+class RouteMetrics:
+    __slots__ = ("statuses", "latency", "response_bytes", "db_statements", "db_latency")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram()
+        self.response_bytes = 0
+        self.db_statements = 0
+        self.db_latency = Histogram()
+
+
+class RequestMetrics:
+    """SQL activity of the request in progress, shared through a context variable."""
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current_request: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar(
+    "current_request_metrics", default=None
+)
+
+routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+_collectors: List[Collector] = []
+
+
+def register_collector(collector: Collector) -> None:
+    """
+    Register a callable that returns (name, type, help, samples) tuples, where
+    samples is a list of (labels, value) pairs. It is called on every scrape.
+    """
+    _collectors.append(collector)
+
+
+def reset() -> None:
+    routes.clear()
+
+
+# ---------------------------------------------
+# SQL timing
+# ---------------------------------------------
+
+
+def _timed(execute):
+    def timed_execute(*args, **kwargs):
+        request = _current_request.get()
+        if request is None:
+            return execute(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return execute(*args, **kwargs)
+        finally:
+            request.statements += 1
+            request.db_seconds += time.perf_counter() - start
+
+    return timed_execute
+
+
+def instrument_engine(engine) -> None:
+    """
+    Attribute SQL statements run on this (sync) engine to the current request.
+
+    This wraps the dialect's do_execute* methods rather than listening for
+    before/after_cursor_execute: any cursor event listener moves SQLAlchemy off
+    its fast path and costs ~10x more per statement than the wrapper itself
+    (see bench_metrics.py).
+    """
+    dialect = engine.dialect
+    if getattr(dialect, "_metrics_instrumented", False):
+        return
+    for name in ("do_execute", "do_execute_no_params", "do_executemany"):
+        setattr(dialect, name, _timed(getattr(dialect, name)))
+    dialect._metrics_instrumented = True
+
+
+# ---------------------------------------------
+# ASGI middleware
+# ---------------------------------------------
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (not BaseHTTPMiddleware) so the request's context variable
+    is visible to the route handler, its dependencies and the threadpool.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+        token = _current_request.set(request)
+        status = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else UNMATCHED_ROUTE)
+            metrics = routes.get(key)
+            if metrics is None:
+                metrics = routes[key] = RouteMetrics()
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.latency.observe(elapsed)
+            metrics.response_bytes += response_bytes
+            metrics.db_statements += request.statements
+            metrics.db_latency.observe(request.db_seconds)
+
+
+# ---------------------------------------------
+# Exposition
+# ---------------------------------------------
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, labels: Dict[str, str], histogram: Histogram) -> List[str]:
+    lines = [
+        f"{name}_bucket{_labels({**labels, 'le': le})} {count}"
+        for le, count in histogram.cumulative()
+    ]
+    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def render() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    snapshot = sorted(routes.items())
+    lines = [
+        "# HELP http_requests_total HTTP requests by route and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route), metrics in snapshot:
+        for status, count in sorted(metrics.statuses.items()):
+            labels = {"method": method, "route": route, "status": str(status)}
+            lines.append(f"http_requests_total{_labels(labels)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds HTTP request latency by route.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), metrics in snapshot:
+        lines += _histogram_lines(
+            "http_request_duration_seconds", {"method": method, "route": route}, metrics.latency
+        )
+
+    lines += [
+        "# HELP http_response_size_bytes_total Response body bytes sent by route.",
+        "# TYPE http_response_size_bytes_total counter",
+    ]
+    for (method, route), metrics in snapshot:
+        labels = {"method": method, "route": route}
+        lines.append(f"http_response_size_bytes_total{_labels(labels)} {metrics.response_bytes}")
+
+    lines += [
+        "# HELP http_request_db_statements_total SQL statements executed by route.",
+        "# TYPE http_request_db_statements_total counter",
+    ]
+    for (method, route), metrics in snapshot:
+        labels = {"method": method, "route": route}
+        lines.append(f"http_request_db_statements_total{_labels(labels)} {metrics.db_statements}")
+
+    lines += [
+        "# HELP http_request_db_duration_seconds Total SQL time per request by route.",
+        "# TYPE http_request_db_duration_seconds histogram",
+    ]
+    for (method, route), metrics in snapshot:
+        lines += _histogram_lines(
+            "http_request_db_duration_seconds",
+            {"method": method, "route": route},
+            metrics.db_latency,
+        )
+
+    for collector in _collectors:
+        for name, kind, help_text, samples in collector():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines += [f"{name}{_labels(labels)} {float(value)!r}" for labels, value in samples]
+
+    return "\n".join(lines) + "\n"
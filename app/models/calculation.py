@@ -1,79 +1,217 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, JSON, Index, event, func, select
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from app.config import settings
 from app.database import Base
+from app.models.types import PackedFloats
+from app.operations.expressions import EXPRESSION
+from app.operations.registry import CALCULATION_TYPES
+
+# Where inputs live: "json" (the inputs JSON column), "dual" (read JSON, also write
+# the inputs_packed column) or "packed" (read and write inputs_packed only). See
+# app/calculation_inputs.py for the migration between them.
+INPUTS_STORAGE = settings.CALCULATION_INPUTS_STORAGE
+
+
+class CalculationPage(NamedTuple):
+    items: List["Calculation"]
+    next_after: Optional[int]
+    prev_before: Optional[int]
 
 
 class Calculation(Base):
     __tablename__ = "calculations"
+    # Serves both the per-user filter and the keyset order of page_for_user()
+    __table_args__ = (Index("ix_calculations_user_id_id", "user_id", "id"),)
     id = Column(Integer, primary_key=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     type = Column(String)
-    inputs = Column(JSON)
-    __mapper_args__ = {"polymorphic_on": type, "polymorphic_identity": "calculation"}
+    if INPUTS_STORAGE == "packed":
+        inputs = Column("inputs_packed", PackedFloats, key="inputs")
+    else:
+        inputs = Column(JSON)
+    if INPUTS_STORAGE == "dual":
+        inputs_packed = Column(PackedFloats)
+    # Formula of an expression calculation; inputs are then its variable values
+    formula = Column(String, nullable=True)
+    # Materialized get_result(), written on insert/update so reads never recompute it
+    result = Column(Float, nullable=True)
+    # Row version, bumped by every ORM update; the read routes derive ETags from it
+    version = Column(Integer, nullable=False, server_default="1")
+    __mapper_args__ = {
+        "polymorphic_on": type,
+        "polymorphic_identity": "calculation",
+        "version_id_col": version,
+    }
 
     @staticmethod
-    def create(calc_type, user_id, inputs):
-        if calc_type == "addition":
-            return Addition(user_id=user_id, inputs=inputs)
-        if calc_type == "subtraction":
-            return Subtraction(user_id=user_id, inputs=inputs)
-        if calc_type == "multiplication":
-            return Multiplication(user_id=user_id, inputs=inputs)
-        if calc_type == "division":
-            return Division(user_id=user_id, inputs=inputs)
-        if calc_type == "modulus":
-            return Modulus(user_id=user_id, inputs=inputs)
-        return Calculation(user_id=user_id, inputs=inputs)
-class Modulus(Calculation):
-    __mapper_args__ = {"polymorphic_identity": "modulus"}
-
-    def get_result(self):
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            if value == 0:
-                raise ValueError()
-            result %= value
-        return result
-
-    def get_result(self):
-        return None
-
-
-class Addition(Calculation):
-    __mapper_args__ = {"polymorphic_identity": "addition"}
-
-    def get_result(self):
-        return sum(self.inputs)
-
-
-class Subtraction(Calculation):
-    __mapper_args__ = {"polymorphic_identity": "subtraction"}
+    def create(calc_type, user_id, inputs, formula=None):
+        operation = CALCULATION_TYPES.get(calc_type)
+        model = operation.model if operation is not None else Calculation
+        return model(user_id=user_id, inputs=inputs, formula=formula)
 
     def get_result(self):
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            result -= value
-        return result
-
-
-class Multiplication(Calculation):
-    __mapper_args__ = {"polymorphic_identity": "multiplication"}
-
-    def get_result(self):
-        result = 1
-        for value in self.inputs:
-            result *= value
-        return result
+        operation = CALCULATION_TYPES.get(self.__mapper__.polymorphic_identity)
+        if operation is None:
+            return None
+        return operation.evaluate(self.inputs, self.formula)
+
+    @classmethod
+    def page_query(cls, user_id, after=None, before=None, limit=50):
+        """
+        Build the keyset query for one page of a user's calculations.
+
+        Pass after=<id> for the page following a row or before=<id> for the page
+        preceding it. Each page is a single index range scan on (user_id, id), so
+        its cost does not grow with how deep into the history it is. One extra row
+        is fetched to learn whether another page exists; see build_page().
+        """
+        query = select(cls).where(cls.user_id == user_id)
+        if before is not None:
+            query = query.where(cls.id < before).order_by(cls.id.desc())
+        else:
+            if after is not None:
+                query = query.where(cls.id > after)
+            query = query.order_by(cls.id)
+        return query.limit(limit + 1)
+
+    @classmethod
+    def page_version_query(cls, user_id, after=None, before=None, limit=50):
+        """
+        Build a query of the count, min and max id and summed version of the rows
+        page_query() would return, including its extra row.
+
+        Versions only grow and ids are never reused, so any insert, update or
+        delete that changes the page changes one of the four. The query reads
+        at most limit + 1 rows of the (user_id, id) range.
+        """
+        window = (
+            cls.page_query(user_id, after, before, limit)
+            .with_only_columns(cls.id, cls.version)
+            .subquery()
+        )
+        return select(
+            func.count(),
+            func.min(window.c.id),
+            func.max(window.c.id),
+            func.coalesce(func.sum(window.c.version), 0),
+        )
+
+    @classmethod
+    def version_query(cls, id, user_id):
+        """Build a query of the version of one of the user's calculations."""
+        return select(cls.version).where(cls.id == id, cls.user_id == user_id)
 
+    @staticmethod
+    def build_page(rows, after=None, before=None, limit=50) -> CalculationPage:
+        """Turn the rows returned by page_query() into a page with its cursors."""
+        items = list(rows)
+        has_more = len(items) > limit
+        items = items[:limit]
+
+        if before is not None:
+            items.reverse()
+            next_after = items[-1].id if items else None
+            prev_before = items[0].id if has_more else None
+        else:
+            next_after = items[-1].id if has_more else None
+            prev_before = items[0].id if after is not None and items else None
+        return CalculationPage(items, next_after, prev_before)
+
+    @classmethod
+    def page_for_user(cls, db, user_id, after=None, before=None, limit=50) -> CalculationPage:
+        """Return one page of a user's calculations in id order (sync Session)."""
+        rows = db.execute(cls.page_query(user_id, after, before, limit)).scalars()
+        return cls.build_page(rows, after, before, limit)
+
+    @classmethod
+    async def page_for_user_async(
+        cls, db, user_id, after=None, before=None, limit=50
+    ) -> CalculationPage:
+        """Return one page of a user's calculations in id order (AsyncSession)."""
+        rows = (await db.execute(cls.page_query(user_id, after, before, limit))).scalars()
+        return cls.build_page(rows, after, before, limit)
+
+    @classmethod
+    def stats_query(cls, user_id, min_id=None, max_id=None):
+        """
+        Build a GROUP BY type query of a user's row counts and result aggregates,
+        optionally limited to ids in [min_id, max_id].
+
+        The aggregation runs in the database over the (user_id, id) index range,
+        so only one row per type comes back. min/max/sum/avg skip NULL results.
+        """
+        query = select(
+            cls.type,
+            func.count(cls.id).label("count"),
+            func.min(cls.result).label("min"),
+            func.max(cls.result).label("max"),
+            func.sum(cls.result).label("sum"),
+            func.avg(cls.result).label("mean"),
+        ).where(cls.user_id == user_id)
+        if min_id is not None:
+            query = query.where(cls.id >= min_id)
+        if max_id is not None:
+            query = query.where(cls.id <= max_id)
+        return query.group_by(cls.type).order_by(cls.type)
+
+    @classmethod
+    async def stats_for_user_async(cls, db, user_id, min_id=None, max_id=None):
+        """Return the rows of stats_query() (AsyncSession)."""
+        return (await db.execute(cls.stats_query(user_id, min_id, max_id))).all()
 
-class Division(Calculation):
-    __mapper_args__ = {"polymorphic_identity": "division"}
+    @staticmethod
+    def row_values(calc_type, user_id, inputs, formula=None) -> dict:
+        """
+        Column values for inserting a calculation with a Core insert(), which
+        skips the before_insert listener, so the result is computed here.
+        """
+        values = {
+            "user_id": user_id,
+            "type": calc_type,
+            "inputs": inputs,
+            "formula": formula,
+            "result": Calculation.compute_result(calc_type, inputs, formula),
+        }
+        if INPUTS_STORAGE == "dual":
+            values["inputs_packed"] = inputs
+        return values
 
-    def get_result(self):
-        result = self.inputs[0]
-        for value in self.inputs[1:]:
-            if value == 0:
-                raise ValueError()
-            result /= value
-        return result
+    @staticmethod
+    def compute_result(calc_type, inputs, formula=None):
+        """Result for the given type and inputs, or None if it cannot be computed."""
+        operation = CALCULATION_TYPES.get(calc_type)
+        if operation is None or inputs is None:
+            return None
+        try:
+            return operation.evaluate(inputs, formula)
+        except (ValueError, TypeError):
+            return None
+
+
+@event.listens_for(Calculation, "before_insert", propagate=True)
+@event.listens_for(Calculation, "before_update", propagate=True)
+def _materialize_result(mapper, connection, target):
+    # Use the type column rather than the Python class: an edit can change the
+    # type of a loaded row without changing its class.
+    target.result = Calculation.compute_result(target.type, target.inputs, target.formula)
+    if INPUTS_STORAGE == "dual":
+        target.inputs_packed = target.inputs
+
+
+# One subclass per calculation type, named after it (Addition, Expression, ...)
+for _operation in CALCULATION_TYPES.values():
+    _operation.model = type(
+        _operation.name.capitalize(),
+        (Calculation,),
+        {"__module__": __name__, "__mapper_args__": {"polymorphic_identity": _operation.name}},
+    )
+
+Addition = CALCULATION_TYPES["addition"].model
+Subtraction = CALCULATION_TYPES["subtraction"].model
+Multiplication = CALCULATION_TYPES["multiplication"].model
+Division = CALCULATION_TYPES["division"].model
+Modulus = CALCULATION_TYPES["modulus"].model
+Expression = CALCULATION_TYPES[EXPRESSION].model
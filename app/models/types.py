@@ -0,0 +1,46 @@
+# app/models/types.py
+
+"""
+Column types shared by the models.
+"""
+
+import numpy as np
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
+from sqlalchemy.types import TypeDecorator
+
+# Little-endian IEEE-754 doubles, whatever the host byte order
+PACKED_DTYPE = np.dtype("<f8")
+
+
+class PackedFloats(TypeDecorator):
+    """
+    A list of floats stored natively: float8[] on PostgreSQL, and a blob of packed
+    little-endian doubles elsewhere.
+
+    Loading decodes straight from the array or the blob instead of parsing JSON text.
+    Values come back as a list of floats, so integer inputs read back as floats and
+    integers beyond 2**53 lose precision.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(ARRAY(DOUBLE_PRECISION))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return [float(item) for item in value]
+        return np.asarray(value, dtype=PACKED_DTYPE).tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == "postgresql":
+            return list(value)
+        return np.frombuffer(value, dtype=PACKED_DTYPE).tolist()
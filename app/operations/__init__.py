@@ -16,14 +16,20 @@ Functions:
 Usage:
 These functions can be imported and used in other modules or integrated into APIs
 to perform arithmetic operations based on user input.
+
+Every function goes through the optional result cache in app.operations.memo,
+which is a no-op unless RESULT_CACHE_ENABLED is set.
 """
 
 from typing import Union  # Import Union for type hinting multiple possible types
 
+from app.operations.memo import memoize
+
 # Define a type alias for numbers that can be either int or float
 Number = Union[int, float]
 
 
+@memoize
 def add(a: Number, b: Number) -> Number:
     """
     Add two numbers and return the result.
@@ -46,6 +52,7 @@ def add(a: Number, b: Number) -> Number:
     return result
 
 
+@memoize
 def subtract(a: Number, b: Number) -> Number:
     """
     Subtract the second number from the first and return the result.
@@ -68,6 +75,7 @@ def subtract(a: Number, b: Number) -> Number:
     return result
 
 
+@memoize
 def multiply(a: Number, b: Number) -> Number:
     """
     Multiply two numbers and return the product.
@@ -90,6 +98,7 @@ def multiply(a: Number, b: Number) -> Number:
     return result
 
 
+@memoize
 def divide(a: Number, b: Number) -> float:
     """
     Divide the first number by the second and return the quotient.
@@ -123,6 +132,7 @@ def divide(a: Number, b: Number) -> float:
     result = a / b
     return result
 
+@memoize
 def modulus(a: Number, b: Number) -> Number:
     """
     Compute the modulus (remainder) of the first number divided by the second.
@@ -149,4 +159,8 @@ def modulus(a: Number, b: Number) -> Number:
     """
     if b == 0:
         raise ValueError("Cannot perform modulus by zero!")
-    return a % b
\ No newline at end of file
+    return a % b
+
+
+# Registers the operations above, filling the dispatch tables of the kernel modules
+from app.operations import registry  # noqa: E402,F401
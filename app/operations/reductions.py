@@ -0,0 +1,160 @@
+# app/operations/reductions.py
+
+"""
+Module: reductions.py
+
+This module contains the reduction kernels used by Calculation.get_result to fold
+a list of inputs into a single result. Every reduction has two implementations:
+
+- a scalar kernel, a plain Python loop that is fastest for short input lists, and
+- a vector kernel, a NumPy ufunc reduction that wins once the list is long enough
+  to amortize converting it to an array.
+
+reduce_inputs() picks the kernel from the length of the inputs and the thresholds
+registered for each operation in app.operations.registry. Inputs that are
+already arrays (anything other than a list or tuple) always take the vector kernel
+because there is no conversion to pay for.
+
+The vector kernels use the sequential ufunc reductions (np.subtract.reduce and
+friends), which fold left to right exactly like the scalar loops, so both paths
+return the same value. The only exception is addition, where NumPy uses pairwise
+summation and may differ from sum() in the last bits.
+
+Run ``python -m tests.benchmarks.bench_reductions`` to measure the crossover.
+
+reduce_inputs() goes through the optional result cache in app.operations.memo.
+"""
+
+from typing import Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from app.operations.memo import cached
+
+Number = Union[int, float]
+
+# ---------------------------------------------
+# Scalar kernels
+# ---------------------------------------------
+
+
+def add_scalar(values: Sequence[Number]) -> Number:
+    return sum(values)
+
+
+def subtract_scalar(values: Sequence[Number]) -> Number:
+    result = values[0]
+    for value in values[1:]:
+        result -= value
+    return result
+
+
+def multiply_scalar(values: Sequence[Number]) -> Number:
+    result = 1
+    for value in values:
+        result *= value
+    return result
+
+
+def divide_scalar(values: Sequence[Number]) -> float:
+    result = values[0]
+    for value in values[1:]:
+        if value == 0:
+            raise ValueError("Cannot divide by zero!")
+        result /= value
+    return result
+
+
+def modulus_scalar(values: Sequence[Number]) -> Number:
+    result = values[0]
+    for value in values[1:]:
+        if value == 0:
+            raise ValueError("Cannot perform modulus by zero!")
+        result %= value
+    return result
+
+
+# ---------------------------------------------
+# Vector kernels
+# ---------------------------------------------
+
+
+def _as_array(values: Sequence[Number]) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def add_vector(values: Sequence[Number]) -> float:
+    return float(np.add.reduce(_as_array(values)))
+
+
+def subtract_vector(values: Sequence[Number]) -> float:
+    return float(np.subtract.reduce(_as_array(values)))
+
+
+def multiply_vector(values: Sequence[Number]) -> float:
+    return float(np.multiply.reduce(_as_array(values)))
+
+
+def divide_vector(values: Sequence[Number]) -> float:
+    array = _as_array(values)
+    if not array[1:].all():
+        raise ValueError("Cannot divide by zero!")
+    return float(np.divide.reduce(array))
+
+
+def modulus_vector(values: Sequence[Number]) -> float:
+    array = _as_array(values)
+    if not array[1:].all():
+        raise ValueError("Cannot perform modulus by zero!")
+    return float(np.remainder.reduce(array))
+
+
+Kernel = Callable[[Sequence[Number]], Number]
+
+# Dispatch tables keyed by calculation type, filled in by app.operations.registry
+SCALAR_KERNELS: Dict[str, Kernel] = {}
+VECTOR_KERNELS: Dict[str, Kernel] = {}
+
+# Minimum list length from which each vector kernel is used; None means never
+VECTOR_THRESHOLDS: Dict[str, Optional[int]] = {}
+
+
+def use_vector(calc_type: str, values: Sequence[Number]) -> bool:
+    """Return True if reduce_inputs() would use the vector kernel for these inputs."""
+    if not isinstance(values, (list, tuple)):
+        return True
+    threshold = VECTOR_THRESHOLDS[calc_type]
+    return threshold is not None and len(values) >= threshold
+
+
+def reduce_inputs(calc_type: str, values: Sequence[Number]) -> Number:
+    """
+    Reduce a sequence of inputs with the kernel for the given calculation type.
+
+    Parameters:
+    - calc_type (str): One of "addition", "subtraction", "multiplication",
+      "division" or "modulus".
+    - values (sequence of int or float): The inputs, in order.
+
+    Returns:
+    - int or float: The folded result.
+
+    Raises:
+    - ValueError: If a division or modulus divisor is zero.
+    - KeyError: If calc_type is not a known calculation type.
+
+    Example:
+    >>> reduce_inputs("subtraction", [10, 2, 3])
+    5
+    >>> reduce_inputs("division", [8, 0])
+    Traceback (most recent call last):
+        ...
+    ValueError: Cannot divide by zero!
+    """
+    return cached(calc_type, values, _reduce)
+
+
+def _reduce(calc_type: str, values: Sequence[Number]) -> Number:
+    if use_vector(calc_type, values):
+        return VECTOR_KERNELS[calc_type](values)
+    return SCALAR_KERNELS[calc_type](values)
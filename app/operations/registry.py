@@ -0,0 +1,180 @@
+# app/operations/registry.py
+
+"""
+Module: registry.py
+
+The single list of calculator operations and calculation types. Each Operation
+ties together:
+
+- name: the calculation type stored in calculations.type ("addition", ...),
+- code: the short form used by the /<code> routes, the homepage form and /batch,
+  or None for a type that is only stored (expression),
+- scalar: the two-operand function from app.operations,
+- batch: the element-wise NumPy kernel from app.operations.vectorized,
+- reduce_scalar / reduce_vector: the list reductions from app.operations.reductions,
+  and vector_threshold, the list length from which reduce_inputs() prefers the
+  vector kernel (None: never, for lists),
+- zero_divisor_error: the error raised when an operand after the first is zero, or
+  None if the operation accepts zero,
+- model: the Calculation subclass, filled in by app.models.calculation,
+
+and validate() and evaluate(), which check and compute a stored calculation of
+the type. FormulaOperation overrides both for the expression type, whose inputs
+are the values of a formula's variables.
+
+register() indexes every type by name in CALCULATION_TYPES. Operations with a
+code also go into OPERATIONS and BY_CODE and fill the dispatch tables of the
+kernel modules, so every lookup is a dict access. CalculationType, its
+validation, Calculation.create() and the stored results are derived from
+CALCULATION_TYPES; the /batch op codes and the /<code> routes from OPERATIONS.
+Adding an operation means adding its kernels and one register() call.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence
+
+from app.operations import add, divide, modulus, multiply, reductions, subtract, vectorized
+from app.operations.expressions import EXPRESSION, get_expression
+
+
+@dataclass
+class Operation:
+    name: str
+    code: Optional[str]
+    description: str
+    scalar: Optional[Callable] = None
+    batch: Optional[Callable] = None
+    reduce_scalar: Optional[Callable] = None
+    reduce_vector: Optional[Callable] = None
+    vector_threshold: Optional[int] = None
+    zero_divisor_error: Optional[str] = None
+    model: Optional[type] = None
+
+    def validate(self, inputs: Sequence[float], formula: Optional[str] = None) -> None:
+        """Raise ValueError if a calculation of this type cannot have these inputs."""
+        if formula is not None:
+            raise ValueError("A formula is only allowed for expressions")
+        if len(inputs) < 2:
+            raise ValueError("At least two inputs are required")
+
+    def evaluate(self, inputs: Sequence[float], formula: Optional[str] = None):
+        """
+        Result of a calculation of this type.
+
+        Raises:
+        - ValueError: If there are no inputs or a divisor is zero.
+        """
+        if not inputs:
+            raise ValueError("No inputs")
+        return reductions.reduce_inputs(self.name, inputs)
+
+
+@dataclass
+class FormulaOperation(Operation):
+    """A calculation type whose inputs are the values of a formula's variables."""
+
+    def validate(self, inputs: Sequence[float], formula: Optional[str] = None) -> None:
+        if formula is None:
+            raise ValueError("A formula is required for expressions")
+        variables = get_expression(formula).variables
+        if len(inputs) != len(variables):
+            raise ValueError(
+                f"Expected {len(variables)} inputs, one per variable: {', '.join(variables)}"
+            )
+
+    def evaluate(self, inputs: Sequence[float], formula: Optional[str] = None) -> float:
+        return get_expression(formula).evaluate_values(inputs)
+
+
+# Every calculation type, and the two-operand operations among them
+CALCULATION_TYPES: Dict[str, Operation] = {}
+OPERATIONS: Dict[str, Operation] = {}
+BY_CODE: Dict[str, Operation] = {}
+
+
+def register(operation: Operation) -> Operation:
+    """Add an operation to the registry and to the kernel dispatch tables."""
+    if operation.name in CALCULATION_TYPES or operation.code in BY_CODE:
+        raise ValueError(f"Operation already registered: {operation.name}")
+    CALCULATION_TYPES[operation.name] = operation
+    if operation.code is None:
+        return operation
+    OPERATIONS[operation.name] = operation
+    BY_CODE[operation.code] = operation
+    reductions.SCALAR_KERNELS[operation.name] = operation.reduce_scalar
+    reductions.VECTOR_KERNELS[operation.name] = operation.reduce_vector
+    reductions.VECTOR_THRESHOLDS[operation.name] = operation.vector_threshold
+    vectorized.KERNELS[operation.code] = (operation.batch, operation.zero_divisor_error)
+    return operation
+
+
+# Vector thresholds are the list lengths at which each vector reduction beats its
+# scalar loop, measured with tests/benchmarks/bench_reductions.py. Converting a
+# list to an array costs about as much as the scalar loop itself, so only the
+# loops with a per-element zero check come out ahead.
+register(
+    Operation(
+        name="addition",
+        code="add",
+        description="Add two numbers.",
+        scalar=add,
+        batch=vectorized.add,
+        reduce_scalar=reductions.add_scalar,
+        reduce_vector=reductions.add_vector,
+    )
+)
+register(
+    Operation(
+        name="subtraction",
+        code="subtract",
+        description="Subtract two numbers.",
+        scalar=subtract,
+        batch=vectorized.subtract,
+        reduce_scalar=reductions.subtract_scalar,
+        reduce_vector=reductions.subtract_vector,
+    )
+)
+register(
+    Operation(
+        name="multiplication",
+        code="multiply",
+        description="Multiply two numbers.",
+        scalar=multiply,
+        batch=vectorized.multiply,
+        reduce_scalar=reductions.multiply_scalar,
+        reduce_vector=reductions.multiply_vector,
+    )
+)
+register(
+    Operation(
+        name="division",
+        code="divide",
+        description="Divide two numbers.",
+        scalar=divide,
+        batch=vectorized.divide,
+        reduce_scalar=reductions.divide_scalar,
+        reduce_vector=reductions.divide_vector,
+        vector_threshold=256,
+        zero_divisor_error=vectorized.DIVIDE_BY_ZERO,
+    )
+)
+register(
+    Operation(
+        name="modulus",
+        code="modulus",
+        description="Compute the remainder of dividing two numbers.",
+        scalar=modulus,
+        batch=vectorized.modulus,
+        reduce_scalar=reductions.modulus_scalar,
+        reduce_vector=reductions.modulus_vector,
+        vector_threshold=512,
+        zero_divisor_error=vectorized.MODULUS_BY_ZERO,
+    )
+)
+register(
+    FormulaOperation(
+        name=EXPRESSION,
+        code=None,
+        description="Evaluate an arithmetic formula.",
+    )
+)
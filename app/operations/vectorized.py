@@ -0,0 +1,162 @@
+# app/operations/vectorized.py
+
+"""
+Module: vectorized.py
+
+This module contains NumPy counterparts of the scalar functions in app.operations.
+Each function takes two equally sized arrays and evaluates the operation for every
+(a, b) pair in a single pass, which lets the API answer a whole batch of operations
+with one HTTP request.
+
+Functions:
+- add(a, b) -> ndarray: Element-wise sum of a and b.
+- subtract(a, b) -> ndarray: Element-wise difference a - b.
+- multiply(a, b) -> ndarray: Element-wise product of a and b.
+- divide(a, b) -> ndarray: Element-wise quotient a / b, NaN where b is zero.
+- modulus(a, b) -> ndarray: Element-wise remainder a % b, NaN where b is zero.
+- evaluate(ops, a, b) -> BatchResult: Evaluate a columnar batch of mixed operations.
+
+Unlike the scalar functions, divide and modulus do not raise on a zero divisor.
+The offending elements, like those whose result overflows to infinity, are
+reported by evaluate() so the rest of the batch still gets a result.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Error messages match the ValueError raised by the scalar functions
+DIVIDE_BY_ZERO = "Cannot divide by zero!"
+MODULUS_BY_ZERO = "Cannot perform modulus by zero!"
+NOT_FINITE = "Result is not a finite number (overflow)"
+
+
+def _as_array(values: Sequence[float]) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def add(a: Sequence[float], b: Sequence[float]) -> np.ndarray:
+    """
+    Add two arrays element-wise.
+
+    Example:
+    >>> add([1, 2], [3, 4]).tolist()
+    [4.0, 6.0]
+    """
+    return np.add(_as_array(a), _as_array(b))
+
+
+def subtract(a: Sequence[float], b: Sequence[float]) -> np.ndarray:
+    """
+    Subtract the second array from the first element-wise.
+
+    Example:
+    >>> subtract([5, 2], [3, 4]).tolist()
+    [2.0, -2.0]
+    """
+    return np.subtract(_as_array(a), _as_array(b))
+
+
+def multiply(a: Sequence[float], b: Sequence[float]) -> np.ndarray:
+    """
+    Multiply two arrays element-wise.
+
+    Example:
+    >>> multiply([2, 2.5], [3, 4]).tolist()
+    [6.0, 10.0]
+    """
+    return np.multiply(_as_array(a), _as_array(b))
+
+
+def divide(a: Sequence[float], b: Sequence[float]) -> np.ndarray:
+    """
+    Divide the first array by the second element-wise.
+
+    Elements with a zero divisor are set to NaN instead of raising.
+
+    Example:
+    >>> divide([6, 5], [3, 0]).tolist()
+    [2.0, nan]
+    """
+    a, b = _as_array(a), _as_array(b)
+    out = np.full(a.shape, np.nan)
+    return np.divide(a, b, out=out, where=b != 0)
+
+
+def modulus(a: Sequence[float], b: Sequence[float]) -> np.ndarray:
+    """
+    Compute the remainder of the first array divided by the second element-wise.
+
+    Follows Python's % semantics (the result takes the sign of the divisor).
+    Elements with a zero divisor are set to NaN instead of raising.
+
+    Example:
+    >>> modulus([7, -7, 5], [3, 3, 0]).tolist()
+    [1.0, 2.0, nan]
+    """
+    a, b = _as_array(a), _as_array(b)
+    out = np.full(a.shape, np.nan)
+    return np.remainder(a, b, out=out, where=b != 0)
+
+
+# Op codes accepted by evaluate(), mapped to their kernel and zero-divisor message;
+# filled in by app.operations.registry
+KERNELS: Dict[str, Tuple[Callable, Optional[str]]] = {}
+
+
+@dataclass
+class BatchResult:
+    """Results of a batch evaluation, with per-element errors."""
+
+    results: np.ndarray
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    def to_list(self) -> List[Optional[float]]:
+        """Return the results as a list, with None in place of failed elements."""
+        values = self.results.tolist()
+        for index in self.errors:
+            values[index] = None
+        return values
+
+
+def evaluate(ops: Sequence[str], a: Sequence[float], b: Sequence[float]) -> BatchResult:
+    """
+    Evaluate a columnar batch where ops[i] is applied to (a[i], b[i]).
+
+    Each distinct op code is evaluated with one vectorized kernel call over the
+    elements that use it. Zero divisors for divide and modulus and results that
+    are not finite (an overflow such as 1e308 * 10) are reported in
+    BatchResult.errors, keyed by element index, instead of aborting the batch.
+
+    Raises:
+    - ValueError: If the three columns differ in length or an op code is unknown.
+
+    Example:
+    >>> batch = evaluate(["add", "divide"], [1, 1], [2, 0])
+    >>> batch.to_list(), batch.errors
+    ([3.0, None], {1: 'Cannot divide by zero!'})
+    """
+    if not len(ops) == len(a) == len(b):
+        raise ValueError("ops, a and b must have the same length")
+
+    codes = np.asarray(ops, dtype=object)
+    a, b = _as_array(a), _as_array(b)
+    results = np.empty(a.shape, dtype=np.float64)
+    errors: Dict[int, str] = {}
+
+    for op in set(ops):
+        if op not in KERNELS:
+            raise ValueError(f"Unknown operation: {op}")
+        kernel, zero_message = KERNELS[op]
+        mask = codes == op
+        with np.errstate(all="ignore"):
+            results[mask] = kernel(a[mask], b[mask])
+        if zero_message is not None:
+            for index in np.flatnonzero(mask & (b == 0)).tolist():
+                errors[index] = zero_message
+
+    for index in np.flatnonzero(~np.isfinite(results)).tolist():
+        errors.setdefault(index, NOT_FINITE)
+
+    return BatchResult(results=results, errors=dict(sorted(errors.items())))
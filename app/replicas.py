@@ -0,0 +1,235 @@
+# app/replicas.py
+
+"""
+Read-replica routing for the read-only calculation routes.
+
+With DATABASE_REPLICA_URLS set, e.g. '["postgresql://.../replica1",
+"postgresql://.../replica2"]', routes that depend on get_read_db() or
+get_async_read_db() run their SELECTs on a replica and everything else on the
+primary (see app.database.RoutingSession). Replicas are used round-robin.
+
+A background task probes every replica with SELECT 1 each
+REPLICA_HEALTH_CHECK_INTERVAL seconds; a replica that fails or times out gets
+no reads until a later probe succeeds. With no healthy replica, reads go to the
+primary.
+
+Read-your-writes: a user whose rows were written in the last
+READ_YOUR_WRITES_SECONDS reads from the primary, so replication lag never hides
+their own change. Writes are noted by an after_flush listener for ORM writes and
+by note_write() for Core inserts. The window is kept per process, so it assumes
+a user's requests stay on one worker; set it above the usual replication lag.
+
+To try it locally, point the URLs at two more databases, e.g. SQLite files:
+    DATABASE_REPLICA_URLS='["sqlite:////tmp/replica1.db", "sqlite:////tmp/replica2.db"]'
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from fastapi import Depends
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_active_user
+from app.config import settings
+from app.database import get_async_db, get_async_engine, get_db, get_engine
+from app.schemas.user import UserResponse
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    """One read replica, with a sync and an async engine."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = get_engine(url)
+        self.async_engine = get_async_engine(url)
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.reads = 0
+        self.failed_checks = 0
+
+    async def _probe(self) -> None:
+        async with self.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check(self, timeout: float) -> bool:
+        """Probe the replica with SELECT 1 and record whether it answered in time."""
+        try:
+            await asyncio.wait_for(self._probe(), timeout)
+        except Exception as exc:
+            if self.healthy:
+                logger.warning("Replica %s failed its health check: %s", self.name, exc)
+            self.healthy = False
+            self.last_error = str(exc) or type(exc).__name__
+            self.failed_checks += 1
+            return False
+        if not self.healthy:
+            logger.info("Replica %s is healthy again", self.name)
+        self.healthy = True
+        self.last_error = None
+        return True
+
+    @property
+    def name(self) -> str:
+        return make_url(self.url).render_as_string(hide_password=True)
+
+    def stats(self) -> dict:
+        return {
+            "url": self.name,
+            "healthy": self.healthy,
+            "last_error": self.last_error,
+            "reads": self.reads,
+            "failed_checks": self.failed_checks,
+        }
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replicas: Sequence[Replica],
+        read_your_writes_seconds: float = 5.0,
+        health_check_interval: float = 5.0,
+        health_check_timeout: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.replicas: List[Replica] = list(replicas)
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next = itertools.count()
+        # user id -> time until which the user's reads go to the primary
+        self._recent_writers: Dict[object, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.primary_reads = 0
+        self.read_your_writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """Return the next healthy replica in round-robin order, or None."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+    def note_write(self, user_id) -> None:
+        """Send the user's reads to the primary for the read-your-writes window."""
+        if not self.enabled or user_id is None:
+            return
+        now = self.clock()
+        with self._lock:
+            self._recent_writers[user_id] = now + self.read_your_writes_seconds
+            # Forget expired entries now and then, so the dict stays small
+            if len(self._recent_writers) > 1000:
+                self._recent_writers = {
+                    key: until for key, until in self._recent_writers.items() if until > now
+                }
+
+    def recently_wrote(self, user_id) -> bool:
+        with self._lock:
+            until = self._recent_writers.get(user_id)
+        return until is not None and until > self.clock()
+
+    def replica_for(self, user_id) -> Optional[Replica]:
+        """The replica to read the user's data from, or None to use the primary."""
+        if not self.enabled:
+            return None
+        if self.recently_wrote(user_id):
+            self.read_your_writes += 1
+            replica = None
+        else:
+            replica = self.choose()
+        if replica is None:
+            self.primary_reads += 1
+        else:
+            replica.reads += 1
+        return replica
+
+    async def check_health(self) -> None:
+        await asyncio.gather(
+            *(replica.check(self.health_check_timeout) for replica in self.replicas)
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+    def start(self) -> None:
+        """Start the health checks on the running event loop."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the health checks and close the replicas' connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            "primary_reads": self.primary_reads,
+            "read_your_writes": self.read_your_writes,
+        }
+
+
+replica_router = ReplicaRouter(
+    [Replica(url) for url in settings.DATABASE_REPLICA_URLS],
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    health_check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL,
+    health_check_timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_writes(session, flush_context):
+    if not replica_router.enabled:
+        return
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        replica_router.note_write(getattr(obj, "user_id", None))
+
+
+def get_read_db(
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_active_user),
+) -> Session:
+    """
+    Dependency for read-only routes: the request's session, with its SELECTs
+    routed to a replica unless the user wrote recently.
+    """
+    replica = replica_router.replica_for(current_user.id)
+    if replica is not None:
+        db.info["read_bind"] = replica.engine
+    return db
+
+
+async def get_async_read_db(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_active_user),
+) -> AsyncSession:
+    """The async counterpart of get_read_db()."""
+    replica = replica_router.replica_for(current_user.id)
+    if replica is not None:
+        db.info["read_bind"] = replica.async_engine.sync_engine
+    return db
@@ -2,40 +2,57 @@ from enum import Enum
 from pydantic import BaseModel, validator
 from typing import List, Optional
 
+from app.operations.registry import CALCULATION_TYPES
 
-class CalculationType(str, Enum):
-    addition = "addition"
-    subtraction = "subtraction"
-    multiplication = "multiplication"
-    division = "division"
-    modulus = "modulus"
+# One member per calculation type, e.g. CalculationType.addition == "addition",
+# including CalculationType.expression for formulas
+CalculationType = Enum(
+    "CalculationType",
+    [(name, name) for name in CALCULATION_TYPES],
+    type=str,
+    module=__name__,
+)
 
 
 class CalculationBase(BaseModel):
     type: CalculationType
+    # Only for expressions; their inputs are the values of the formula's variables
+    # in alphabetical order, e.g. a, b, c for "(a + b) * c"
+    formula: Optional[str] = None
     inputs: List[float]
 
     @validator("inputs")
-    def min_two_inputs(cls, v):
-        if len(v) < 2:
-            raise ValueError()
+    def inputs_fit_type(cls, v, values):
+        # Two or more operands, or one value per formula variable (Operation.validate)
+        t = values.get("type")
+        if t is not None:
+            CALCULATION_TYPES[t.value].validate(v, values.get("formula"))
         return v
 
 
+def _no_div_zero(v, values):
+    t = values.get("type")
+    error = CALCULATION_TYPES[t.value].zero_divisor_error if t is not None else None
+    if error is not None and any(x == 0 for x in v[1:]):
+        raise ValueError(error)
+    return v
+
+
 class CalculationCreate(CalculationBase):
     user_id: str
 
-    @validator("inputs")
-    def no_div_zero(cls, v, values):
-        t = values.get("type")
-        if t == CalculationType.division or t == CalculationType.modulus:
-            if any(x == 0 for x in v[1:]):
-                raise ValueError()
-        return v
+    no_div_zero = validator("inputs", allow_reuse=True)(_no_div_zero)
+
+
+class CalculationImportRow(CalculationBase):
+    """One row of a bulk import; the user comes from the request."""
+
+    no_div_zero = validator("inputs", allow_reuse=True)(_no_div_zero)
 
 
 class CalculationUpdate(BaseModel):
     type: Optional[CalculationType]
+    formula: Optional[str] = None
     inputs: Optional[List[float]]
     user_id: Optional[str]
 
@@ -43,4 +60,39 @@ class CalculationUpdate(BaseModel):
 class CalculationResponse(CalculationBase):
     id: int
     user_id: str
-    result: float
+    result: Optional[float]
+
+
+class CalculationPageResponse(BaseModel):
+    items: List[CalculationResponse]
+    next_after: Optional[int]
+    prev_before: Optional[int]
+
+
+class CalculationTypeStats(BaseModel):
+    type: str
+    count: int
+    min: Optional[float]
+    max: Optional[float]
+    sum: Optional[float]
+    mean: Optional[float]
+
+
+class CalculationStatsResponse(BaseModel):
+    count: int
+    by_type: List[CalculationTypeStats]
+
+
+class CalculationImportReject(BaseModel):
+    row: int
+    error: str
+
+
+class CalculationImportResponse(BaseModel):
+    inserted: int
+    rejected: int
+    rejects: List[CalculationImportReject]
+    method: str
+    seconds: float
+    rows_per_second: float
+    error: Optional[str] = None
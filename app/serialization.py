@@ -0,0 +1,99 @@
+# app/serialization.py
+
+"""
+Fast JSON responses for calculations and users.
+
+FastAPI's default path validates a returned object against the route's
+response_model and then serializes it with jsonable_encoder and json.dumps,
+which costs more than loading the rows did. The calculation routes instead
+return a JSONBytesResponse whose body is built here:
+
+- dump_calculation(): one calculation, serialized to bytes by a TypeAdapter built
+  once at import, with no validation pass;
+- dump_calculation_page(): a page of calculations, encoded with orjson straight
+  from plain dicts. Inputs are written as floats, as dump_calculation() writes
+  them, so a row looks the same in a page and on its own.
+
+The routes keep their response_model, so the OpenAPI schema is unchanged.
+tests/benchmarks/bench_serialization.py compares both paths with the default one.
+"""
+
+from typing import Iterable, List, Optional
+
+import orjson
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from app.schemas.user import UserResponse
+
+
+class JSONBytesResponse(Response):
+    """A JSON response whose content is already encoded."""
+
+    media_type = "application/json"
+
+
+class CalculationRow(TypedDict):
+    """The JSON shape of CalculationResponse."""
+
+    id: int
+    user_id: str
+    type: str
+    formula: Optional[str]
+    inputs: List[float]
+    result: Optional[float]
+
+
+CALCULATION_ROW = TypeAdapter(CalculationRow)
+
+
+def calculation_row(calc) -> dict:
+    return {
+        "id": calc.id,
+        "user_id": str(calc.user_id),
+        "type": calc.type,
+        "formula": calc.formula,
+        "inputs": calc.inputs,
+        "result": calc.result,
+    }
+
+
+def dump_calculation(calc) -> bytes:
+    """Serialize one Calculation as a CalculationResponse."""
+    return CALCULATION_ROW.dump_json(calculation_row(calc))
+
+
+def dump_calculation_page(
+    calcs: Iterable, next_after: Optional[int] = None, prev_before: Optional[int] = None
+) -> bytes:
+    """Serialize Calculations as a CalculationPageResponse."""
+    # orjson encodes the UUID user ids itself, so no str() per row
+    return orjson.dumps(
+        {
+            "items": [
+                {
+                    "id": calc.id,
+                    "user_id": calc.user_id,
+                    "type": calc.type,
+                    "formula": calc.formula,
+                    "inputs": [float(value) for value in calc.inputs],
+                    "result": calc.result,
+                }
+                for calc in calcs
+            ],
+            "next_after": next_after,
+            "prev_before": prev_before,
+        }
+    )
+
+
+def user_response(user) -> UserResponse:
+    """
+    Build a UserResponse from a User row.
+
+    The row is validated, since not every write path (e.g. register_user) runs
+    the user schemas first. With the user cache enabled, get_current_user()
+    only builds one on a cache miss.
+    """
+    return UserResponse.model_validate(user, from_attributes=True)
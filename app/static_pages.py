@@ -0,0 +1,279 @@
+# app/static_pages.py
+
+"""
+Prebuilt delivery of the pages that do not depend on the request: the homepage
+(index.html) and the login page (login.html).
+
+A build step renders them once instead of through Jinja2 on every hit:
+
+    python -m app.static_pages build
+
+It renders each page, moves its inline <style> and <script> into asset files
+named by their content hash (e.g. index.3f2a9c1e.css), strips comments and
+indentation, and writes every file with a .gz variant, plus .br when the
+brotli package is installed, and a manifest.json into STATIC_BUILD_DIR.
+
+load_site() reads that build into memory at startup. If there is no build, or it
+was made from other template sources, the site is built in memory instead.
+Requests are answered from the held bytes, choosing the br, gzip or identity
+variant from Accept-Encoding. Asset URLs change with their content, so assets
+are cached for a year as immutable; pages keep their URLs and revalidate with
+their ETag (Cache-Control: no-cache, 304 on a match).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi.responses import Response
+from jinja2 import Environment, FileSystemLoader
+
+from app import etags
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path("templates")
+PAGES = ("index.html", "login.html")
+ASSET_URL = "/static/"
+
+PAGE_CACHE_CONTROL = "no-cache"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+}
+
+# Only worth compressing files at least this large
+MIN_COMPRESS_BYTES = 256
+
+_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_INLINE = re.compile(r"<(style|script)>(.*?)</\1>", re.S)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_PUNCTUATION = re.compile(r"\s*([{};:,])\s*")
+
+
+# ---------------------------------------------
+# Build
+# ---------------------------------------------
+
+
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT.sub("", css)
+    css = _CSS_PUNCTUATION.sub(r"\1", " ".join(css.split()))
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js: str) -> str:
+    """
+    Drop block comments, whole-line // comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion still applies. Block
+    comments are matched without regard to strings, so this is only meant for
+    the scripts in this repo's templates.
+    """
+    js = _CSS_COMMENT.sub("", js)
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+def minify_html(html: str) -> str:
+    """Drop comments and collapse whitespace runs to one space or line break."""
+    html = _COMMENT.sub("", html)
+    lines = (" ".join(line.split()) for line in html.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def template_hashes(templates_dir: Path = TEMPLATES_DIR) -> Dict[str, str]:
+    """Hash of each page's template source, to tell whether a build is current."""
+    return {name: _content_hash((templates_dir / name).read_bytes()) for name in PAGES}
+
+
+def render_files(templates_dir: Path = TEMPLATES_DIR) -> Dict[str, bytes]:
+    """Render and minify the pages and their assets, keyed by file name."""
+    environment = Environment(loader=FileSystemLoader(str(templates_dir)), autoescape=True)
+    files = {}
+    for name in PAGES:
+        html = _COMMENT.sub("", environment.get_template(name).render())
+        stem = Path(name).stem
+
+        def extract(match):
+            kind, source = match.groups()
+            if kind == "style":
+                data, suffix = minify_css(source).encode(), ".css"
+            else:
+                data, suffix = minify_js(source).encode(), ".js"
+            asset = f"{stem}.{_content_hash(data)[:8]}{suffix}"
+            files[asset] = data
+            if kind == "style":
+                return f'<link rel="stylesheet" href="{ASSET_URL}{asset}">'
+            return f'<script src="{ASSET_URL}{asset}"></script>'
+
+        files[name] = minify_html(_INLINE.sub(extract, html)).encode()
+    return files
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """The identity, gzip and (with brotli installed) br variants worth sending."""
+    variants = {"identity": data}
+    if len(data) < MIN_COMPRESS_BYTES:
+        return variants
+    # mtime=0 keeps the output identical across builds
+    variants["gzip"] = gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    return {
+        encoding: body
+        for encoding, body in variants.items()
+        if encoding == "identity" or len(body) < len(data)
+    }
+
+
+SUFFIXES = {"identity": "", "gzip": ".gz", "br": ".br"}
+
+
+def build(output_dir: Path, templates_dir: Path = TEMPLATES_DIR) -> dict:
+    """Write the rendered files, their compressed variants and manifest.json."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for name, data in render_files(templates_dir).items():
+        variants = compress(data)
+        for encoding, body in variants.items():
+            (output_dir / f"{name}{SUFFIXES[encoding]}").write_bytes(body)
+        files[name] = sorted(variants)
+    manifest = {"templates": template_hashes(templates_dir), "files": files}
+    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+# ---------------------------------------------
+# Serving
+# ---------------------------------------------
+
+
+@dataclass
+class StaticFile:
+    content_type: str
+    cache_control: str
+    # Content-Encoding -> (body, ETag)
+    variants: Dict[str, tuple]
+
+
+def _static_file(name: str, variants: Dict[str, bytes]) -> StaticFile:
+    digest = _content_hash(variants["identity"])
+    return StaticFile(
+        content_type=CONTENT_TYPES[Path(name).suffix],
+        cache_control=PAGE_CACHE_CONTROL if name in PAGES else ASSET_CACHE_CONTROL,
+        variants={
+            encoding: (body, f'"{digest}{SUFFIXES[encoding].replace(".", "-")}"')
+            for encoding, body in variants.items()
+        },
+    )
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """The encodings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        encoding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class StaticSite:
+    def __init__(self, files: Dict[str, StaticFile]):
+        self.files = files
+
+    def response(self, name: str, headers) -> Optional[Response]:
+        """
+        The response for a built file, given the request headers, or None if
+        there is no such file.
+        """
+        static_file = self.files.get(name)
+        if static_file is None:
+            return None
+        accepted = accepted_encodings(headers.get("accept-encoding"))
+        encoding = next(
+            (
+                candidate
+                for candidate in ("br", "gzip")
+                if candidate in static_file.variants and candidate in accepted
+            ),
+            "identity",
+        )
+        body, etag = static_file.variants[encoding]
+        response_headers = {
+            "ETag": etag,
+            "Cache-Control": static_file.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etags.matches(headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=response_headers)
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        return Response(body, media_type=static_file.content_type, headers=response_headers)
+
+
+def load_site(
+    build_dir: Path = Path(settings.STATIC_BUILD_DIR), templates_dir: Path = TEMPLATES_DIR
+) -> StaticSite:
+    """Load the build in build_dir, or build in memory if it is missing or stale."""
+    manifest_path = build_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest["templates"] == template_hashes(templates_dir):
+            return StaticSite(
+                {
+                    name: _static_file(
+                        name,
+                        {
+                            encoding: (build_dir / f"{name}{SUFFIXES[encoding]}").read_bytes()
+                            for encoding in encodings
+                        },
+                    )
+                    for name, encodings in manifest["files"].items()
+                }
+            )
+        logger.warning("Static build in %s is stale; building pages in memory", build_dir)
+    return StaticSite(
+        {name: _static_file(name, compress(data)) for name, data in render_files(templates_dir).items()}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static pages")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_command = commands.add_parser("build", help="Render, minify and compress the pages")
+    build_command.add_argument("--output-dir", type=Path, default=Path(settings.STATIC_BUILD_DIR))
+    args = parser.parse_args()
+
+    manifest = build(args.output_dir)
+    for name, encodings in manifest["files"].items():
+        print(f"{name}: {', '.join(encodings)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# app/templating.py
+
+"""
+Jinja2 templates and the cached calculations list fragment.
+
+Templates are compiled once, when precompile() runs at startup, instead of on the
+first request that renders each of them. With TEMPLATES_AUTO_RELOAD off (the
+default) Jinja2 also skips checking the template file on every render; turn it on
+while editing templates. TEMPLATE_BYTECODE_CACHE_DIR keeps the compiled code on
+disk, so other workers and restarts load it instead of compiling again.
+
+GET /calculations renders the page's list (_calculation_list.html) through
+render_calculation_list(), which keeps the rendered HTML and the page's cursors
+in an LRU cache bounded by FRAGMENT_CACHE_SIZE entries and
+FRAGMENT_CACHE_MAX_BYTES of HTML. Entries are keyed by the user and the page's
+ETag, which covers the query and the versions of the rows on the page (see
+app.etags), so a changed page is never served from the cache. The write routes
+call invalidate_user() to drop the user's now unreachable entries right away
+instead of waiting for them to be evicted.
+"""
+
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+import jinja2
+from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
+
+from app.cache import LRUCache
+from app.config import settings
+
+TEMPLATES_DIR = "templates"
+CALCULATION_LIST = "_calculation_list.html"
+
+templates = Jinja2Templates(
+    env=jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=settings.TEMPLATES_AUTO_RELOAD,
+        bytecode_cache=(
+            jinja2.FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_CACHE_DIR)
+            if settings.TEMPLATE_BYTECODE_CACHE_DIR
+            else None
+        ),
+    )
+)
+
+
+def precompile() -> int:
+    """Compile every template into the environment's cache; return how many."""
+    environment = templates.env
+    names = environment.list_templates(extensions=["html"])
+    for name in names:
+        environment.get_template(name)
+    return len(names)
+
+
+class ListFragment(NamedTuple):
+    html: Markup
+    next_after: Optional[int]
+    prev_before: Optional[int]
+
+
+fragment_cache = LRUCache(
+    max_entries=settings.FRAGMENT_CACHE_SIZE,
+    max_bytes=settings.FRAGMENT_CACHE_MAX_BYTES,
+    sizeof=lambda fragment: len(fragment.html),
+)
+
+
+async def render_calculation_list(
+    user_id, etag: str, load_page: Callable[[], Awaitable]
+) -> ListFragment:
+    """
+    Return the rendered list for the page with this ETag, only awaiting
+    load_page() for its CalculationPage and rendering it on a cache miss.
+    """
+    key = (user_id, etag)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        page = await load_page()
+        html = templates.get_template(CALCULATION_LIST).render(calculations=page.items)
+        fragment = ListFragment(Markup(html), page.next_after, page.prev_before)
+        fragment_cache.set(key, fragment)
+    return fragment
+
+
+def invalidate_user(user_id) -> int:
+    """Drop the user's cached list fragments after a write."""
+    return fragment_cache.invalidate_where(lambda key: key[0] == user_id)
+
+
+def cache_stats() -> Dict[str, float]:
+    return fragment_cache.stats()
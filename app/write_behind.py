@@ -0,0 +1,177 @@
+# app/write_behind.py
+
+"""
+Group commit for calculations stored from the homepage (POST /).
+
+With WRITE_BEHIND_ENABLED, the handler hands its row to a WriteBehindQueue
+instead of committing it. The queue collects rows until WRITE_BEHIND_MAX_ROWS
+are pending or WRITE_BEHIND_FLUSH_MS have passed since the first of them, then
+inserts the whole batch in one transaction, so many clicks share one commit and
+its fsync.
+
+WRITE_BEHIND_DURABILITY trades latency for safety:
+    commit   the request waits until its batch is committed (adds up to one
+             flush interval of latency, loses nothing that was acknowledged)
+    enqueue  the request returns as soon as the row is queued; rows still queued
+             are lost if the process dies before the next flush
+
+The queue is started and stopped by the application lifespan; stop() flushes
+everything still queued before returning.
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.database import async_engine
+from app.models.calculation import Calculation
+
+logger = logging.getLogger(__name__)
+
+calculations = Calculation.__table__
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        flush_interval: float = 0.02,
+        max_rows: int = 500,
+        wait_for_commit: bool = True,
+        max_pending: int = 10000,
+    ):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.wait_for_commit = wait_for_commit
+        self.max_pending = max_pending
+        self._pending: List[Tuple[dict, Optional[asyncio.Future]]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.stalls = 0
+        self.flush_seconds_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start the flusher on the running event loop."""
+        if self._task is not None:
+            return
+        # Events are bound to the loop, so they are created here rather than in __init__
+        self._has_rows = asyncio.Event()
+        self._full = asyncio.Event()
+        self._space = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush all queued rows and stop the flusher."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._has_rows.set()
+        self._full.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    async def submit(self, row: dict) -> None:
+        """
+        Queue a row of calculations column values (see Calculation.row_values).
+
+        Waits for the row's batch to commit when wait_for_commit is set, and for
+        room in the queue when max_pending rows are already waiting.
+        """
+        if self._task is None or self._stopping:
+            raise RuntimeError("Write-behind queue is not running")
+        while len(self._pending) >= self.max_pending:
+            self.stalls += 1
+            self._space.clear()
+            await self._space.wait()
+
+        future = asyncio.get_running_loop().create_future() if self.wait_for_commit else None
+        self._pending.append((row, future))
+        self.enqueued += 1
+        self._has_rows.set()
+        if len(self._pending) >= self.max_rows:
+            self._full.set()
+        if future is not None:
+            await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_rows.wait()
+            if not self._stopping:
+                # The flush interval starts with the first row of the batch
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[: self.max_rows]
+            del self._pending[: self.max_rows]
+            if not self._stopping:
+                if not self._pending:
+                    self._has_rows.clear()
+                if len(self._pending) < self.max_rows:
+                    self._full.clear()
+            self._space.set()
+
+            if batch:
+                await self._flush(batch)
+            elif self._stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[dict, Optional[asyncio.Future]]]) -> None:
+        start = time.perf_counter()
+        try:
+            async with self.engine.begin() as connection:
+                await connection.execute(insert(calculations), [row for row, _ in batch])
+        except Exception as exc:
+            self.failed_rows += len(batch)
+            logger.exception("Write-behind flush of %d calculations failed", len(batch))
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        self.flushes += 1
+        self.flushed_rows += len(batch)
+        self.flush_seconds_total += time.perf_counter() - start
+        for _, future in batch:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "wait_for_commit": self.wait_for_commit,
+            "pending": len(self._pending),
+            "enqueued": self.enqueued,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "stalls": self.stalls,
+            "rows_per_flush": self.flushed_rows / self.flushes if self.flushes else 0.0,
+            "flush_seconds_total": self.flush_seconds_total,
+        }
+
+
+calculation_writer = WriteBehindQueue(
+    async_engine,
+    flush_interval=settings.WRITE_BEHIND_FLUSH_MS / 1000,
+    max_rows=settings.WRITE_BEHIND_MAX_ROWS,
+    wait_for_commit=settings.WRITE_BEHIND_DURABILITY == "commit",
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+)
@@ -1,37 +1,162 @@
-from app.auth.dependencies import get_current_active_user
-# Store homepage calculation in DB for logged-in user
-from app.schemas.calculation import CalculationType
-from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse, RedirectResponse
+from app.auth.dependencies import get_current_active_user, require_internal_token
+from app.auth.user_cache import user_cache
+from app.auth.hashing import HashingQueueFull, password_hasher
+from app.config import settings
+from app.replicas import get_async_read_db, get_read_db, replica_router
+from app.write_behind import calculation_writer
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Depends, Query
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse, Response
 from starlette.status import HTTP_303_SEE_OTHER
-from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Dict, List, Literal, Optional
 from fastapi.exceptions import RequestValidationError
+from contextlib import asynccontextmanager
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.orm.exc import StaleDataError
+from app.database import get_db, get_async_db
+from app import calculation_export, calculation_import, etags, metrics, static_pages, templating
+from app.serialization import JSONBytesResponse, dump_calculation, dump_calculation_page
 from app.models.user import User
 from app.models.calculation import Calculation
 from app.schemas.base import UserCreate, UserLogin
 from app.schemas.user import UserResponse, Token
 from app.schemas.calculation import (
     CalculationCreate,
+    CalculationImportResponse,
+    CalculationPageResponse,
     CalculationResponse,
+    CalculationStatsResponse,
+    CalculationTypeStats,
     CalculationUpdate,
 )
 import uvicorn
 import logging
-from app.operations import add, subtract, multiply, divide
-from app.database import engine, Base
+from app.operations import expressions, memo, vectorized
+from app.operations.expressions import EXPRESSION
+from app.operations.registry import BY_CODE, OPERATIONS
+from app.database import engine, async_engine, Base, get_pool_status, session_stats
 Base.metadata.create_all(bind=engine)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
-
-# Setup templates directory
-templates = Jinja2Templates(directory="templates")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WRITE_BEHIND_ENABLED:
+        calculation_writer.start()
+    replica_router.start()
+    logger.info("Precompiled %d templates", templating.precompile())
+    yield
+    # Flush queued homepage calculations before the engine goes away
+    await calculation_writer.stop()
+    await replica_router.stop()
+    # Close pooled async connections on the loop that opened them
+    await async_engine.dispose()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+metrics.instrument_engine(async_engine.sync_engine)
+for replica in replica_router.replicas:
+    metrics.instrument_engine(replica.engine)
+    metrics.instrument_engine(replica.async_engine.sync_engine)
+
+
+def _internal_metrics():
+    """Publish pool, session, cache, write-behind and password hashing state on /metrics."""
+    pools = {"sync": get_pool_status(engine), "async": get_pool_status(async_engine.sync_engine)}
+    for name, help_text in [
+        ("checked_out", "Connections currently checked out of the pool."),
+        ("idle", "Idle connections held by the pool."),
+        ("overflow", "Overflow connections open beyond the pool size."),
+        ("checkouts", "Connection checkouts since start."),
+        ("timeouts", "Checkouts that timed out waiting for a connection."),
+        ("wait_seconds_total", "Total time spent waiting for connections."),
+    ]:
+        samples = [({"engine": key}, status[name]) for key, status in pools.items() if name in status]
+        yield f"db_pool_{name}", "gauge", help_text, samples
+
+    sessions = {key: stats.snapshot() for key, stats in session_stats.items()}
+    yield "db_sessions_total", "counter", "Request sessions handed out.", [
+        ({"engine": key}, status["sessions"]) for key, status in sessions.items()
+    ]
+    yield "db_sessions_unused_total", "counter", "Request sessions that never ran a query.", [
+        ({"engine": key}, status["unused"]) for key, status in sessions.items()
+    ]
+
+    replicas = replica_router.stats()
+    yield "db_replica_healthy", "gauge", "1 if the read replica passed its last health check.", [
+        ({"replica": replica["url"]}, int(replica["healthy"])) for replica in replicas["replicas"]
+    ]
+    yield "db_replica_reads_total", "counter", "Read-only requests routed to each replica.", [
+        ({"replica": replica["url"]}, replica["reads"]) for replica in replicas["replicas"]
+    ]
+    yield "db_replica_primary_reads_total", "counter", "Read-only requests served by the primary.", [
+        ({}, replicas["primary_reads"])
+    ]
+
+    cache = user_cache.stats()
+    for name in ("hits", "misses", "evictions", "expirations"):
+        yield f"user_cache_{name}_total", "counter", f"User cache {name}.", [({}, cache[name])]
+    yield "user_cache_entries", "gauge", "Users currently cached.", [({}, cache["entries"])]
+
+    results = memo.stats()
+    for name in ("hits", "misses", "evictions", "bypassed"):
+        yield f"result_cache_{name}_total", "counter", f"Result cache {name}.", [({}, results[name])]
+    yield "result_cache_bytes", "gauge", "Estimated result cache size.", [({}, results["bytes"])]
+
+    compiled = expressions.cache_stats()
+    for name in ("hits", "misses", "evictions"):
+        yield f"expression_cache_{name}_total", "counter", f"Expression cache {name}.", [
+            ({}, compiled[name])
+        ]
+    yield "expression_cache_entries", "gauge", "Compiled formulas cached.", [
+        ({}, compiled["entries"])
+    ]
+
+    fragments = templating.cache_stats()
+    for name in ("hits", "misses", "evictions"):
+        yield f"fragment_cache_{name}_total", "counter", f"Calculation list fragment cache {name}.", [
+            ({}, fragments[name])
+        ]
+    yield "fragment_cache_hit_ratio", "gauge", "Share of list renders served from the cache.", [
+        ({}, fragments["hit_ratio"])
+    ]
+    yield "fragment_cache_bytes", "gauge", "Cached calculation list HTML.", [({}, fragments["bytes"])]
+
+    writer = calculation_writer.stats()
+    yield "write_behind_pending", "gauge", "Homepage calculations waiting to be flushed.", [
+        ({}, writer["pending"])
+    ]
+    for name in ("flushes", "flushed_rows", "failed_rows"):
+        yield f"write_behind_{name}_total", "counter", f"Write-behind {name}.", [({}, writer[name])]
+
+    hashing = password_hasher.stats()
+    yield "password_hash_queue_depth", "gauge", "Hashing calls in flight.", [
+        ({}, hashing["queue_depth"])
+    ]
+    yield "password_hash_rejected_total", "counter", "Hashing calls rejected with 503.", [
+        ({}, hashing["rejected"])
+    ]
+    yield "password_hash_seconds_total", "counter", "Total hashing latency.", [
+        ({}, hashing["latency_seconds_total"])
+    ]
+    yield "password_hash_completed_total", "counter", "Hashing calls completed.", [
+        ({}, hashing["completed"])
+    ]
+
+
+metrics.register_collector(_internal_metrics)
+
+# Setup templates directory (see app/templating.py)
+templates = templating.templates
+# Prebuilt homepage and login page with their assets (see app/static_pages.py)
+static_site = static_pages.load_site()
 
 
 # Pydantic model for request data
@@ -56,10 +181,75 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
 
 
+# Pydantic models for columnar batch requests
+class BatchRequest(BaseModel):
+    op: List[Literal[tuple(BY_CODE)]] = Field(
+        ..., description="Operation for each element"
+    )
+    a: List[float] = Field(..., description="First operand for each element")
+    b: List[float] = Field(..., description="Second operand for each element")
+
+    @model_validator(mode="after")
+    def validate_lengths(self):
+        if not len(self.op) == len(self.a) == len(self.b):
+            raise ValueError("op, a and b must have the same length")
+        return self
+
+
+class BatchError(BaseModel):
+    index: int = Field(..., description="Position of the failed element")
+    error: str = Field(..., description="Error message")
+
+
+class BatchResponse(BaseModel):
+    results: List[Optional[float]] = Field(
+        ..., description="Result for each element, null where it failed"
+    )
+    errors: List[BatchError] = Field(..., description="Per-element errors")
+
+
+# Pydantic models for formula evaluation
+class ExpressionRequest(BaseModel):
+    formula: str = Field(..., description='Arithmetic formula, e.g. "(a + b) * c / d"')
+    bindings: Optional[Dict[str, float]] = Field(
+        None, description="Value of each variable, for a single evaluation"
+    )
+    batch: Optional[Dict[str, List[float]]] = Field(
+        None, description="Values of each variable, one per element, for a batch"
+    )
+
+    @model_validator(mode="after")
+    def validate_bindings(self):
+        if self.bindings is not None and self.batch is not None:
+            raise ValueError("Give either bindings or batch, not both")
+        return self
+
+
+class ExpressionResponse(BaseModel):
+    variables: List[str] = Field(..., description="Variables of the formula, sorted")
+    result: Optional[float] = Field(None, description="Result of a single evaluation")
+    results: Optional[List[Optional[float]]] = Field(
+        None, description="Result for each batch element, null where it failed"
+    )
+    errors: List[BatchError] = Field([], description="Per-element errors of a batch")
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.error(f"HTTPException on {request.url.path}: {exc.detail}")
-    return JSONResponse(status_code=exc.status_code, content={"error": exc.detail})
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail},
+        headers=getattr(exc, "headers", None),
+    )
+
+
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    logger.error(f"HashingQueueFull on {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503, content={"error": str(exc)}, headers={"Retry-After": "1"}
+    )
 
 
 @app.exception_handler(RequestValidationError)
@@ -73,17 +263,87 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 @app.get("/")
 async def read_root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return static_site.response("index.html", request.headers)
 
 
 @app.get("/login")
 async def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return static_site.response("login.html", request.headers)
+
+
+@app.get("/static/{name}")
+async def static_asset(name: str, request: Request):
+    if name in static_pages.PAGES:
+        raise HTTPException(status_code=404)
+    response = static_site.response(name, request.headers)
+    if response is None:
+        raise HTTPException(status_code=404)
+    return response
+
+
+# Internal endpoints, only for callers with INTERNAL_API_TOKEN
+internal = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@internal.get("/metrics")
+def metrics_endpoint():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@internal.get("/internal/db/pool")
+def db_pool_status():
+    return {
+        "sync": get_pool_status(engine),
+        "async": get_pool_status(async_engine.sync_engine),
+    }
+
+
+@internal.get("/internal/db/replicas")
+def db_replica_status():
+    return replica_router.stats()
+
+
+@internal.get("/internal/db/sessions")
+def db_session_status():
+    return {key: stats.snapshot() for key, stats in session_stats.items()}
+
+
+@internal.get("/internal/cache/users")
+def user_cache_status():
+    return user_cache.stats()
+
+
+@internal.get("/internal/cache/results")
+def result_cache_status():
+    return {"enabled": memo.cache_enabled(), **memo.stats()}
+
+
+@internal.get("/internal/cache/expressions")
+def expression_cache_status():
+    return expressions.cache_stats()
+
+
+@internal.get("/internal/cache/fragments")
+def fragment_cache_status():
+    return templating.cache_stats()
+
+
+@internal.get("/internal/write-behind")
+def write_behind_status():
+    return calculation_writer.stats()
+
+
+@internal.get("/internal/auth/hashing")
+def password_hashing_status():
+    return password_hasher.stats()
+
+
+app.include_router(internal)
 
 
 # User Endpoints
 @app.post("/users/register")
-async def register_user(request: Request, db: Session = Depends(get_db)):
+async def register_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     form = await request.form()
     user_data = {
         "first_name": form.get("first_name"),
@@ -92,34 +352,34 @@ async def register_user(request: Request, db: Session = Depends(get_db)):
         "username": form.get("username"),
         "password": form.get("password"),
     }
-    db_user = (
-        db.query(User)
-        .filter(
+    result = await db.execute(
+        select(User).where(
             (User.email == user_data["email"])
             | (User.username == user_data["username"])
         )
-        .first()
     )
+    db_user = result.scalars().first()
     if db_user:
         return templates.TemplateResponse(
             "login.html", {"request": request, "error": "User already exists."}
         )
-    hashed = User.hash_password(user_data["password"])
+    hashed = await password_hasher.hash(user_data["password"])
     user_data["password"] = hashed
     new_user = User(**user_data)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return RedirectResponse("/login", status_code=HTTP_303_SEE_OTHER)
 
 
 @app.post("/users/login")
-async def login_user(request: Request, db: Session = Depends(get_db)):
+async def login_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     form = await request.form()
     username = form.get("username")
     password = form.get("password")
-    db_user = db.query(User).filter(User.username == username).first()
-    if not db_user or not db_user.verify_password(password):
+    result = await db.execute(select(User).where(User.username == username))
+    db_user = result.scalars().first()
+    if not db_user or not await password_hasher.verify(password, db_user.password):
         return templates.TemplateResponse(
             "login.html", {"request": request, "error": "Invalid credentials."}
         )
@@ -132,110 +392,237 @@ async def login_user(request: Request, db: Session = Depends(get_db)):
 # Calculation Endpoints (BREAD)
 from app.auth.dependencies import get_current_active_user
 
-@app.get("/calculations")
+@app.get("/calculations", response_model=CalculationPageResponse)
 async def browse_calculations(
     request: Request,
-    db: Session = Depends(get_db),
+    after: Optional[int] = Query(None, description="Return rows after this id"),
+    before: Optional[int] = Query(None, description="Return rows before this id"),
+    limit: int = Query(50, ge=1, le=500),
+    format: Literal["html", "json"] = "html",
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(get_current_active_user),
 ):
-    items = db.query(Calculation).filter(Calculation.user_id == current_user.id).all()
+    versions = await db.execute(
+        Calculation.page_version_query(current_user.id, after=after, before=before, limit=limit)
+    )
+    etag = etags.page_etag(current_user.id, request.url.query, *versions.one())
+    if etags.matches(request.headers.get("if-none-match"), etag):
+        return etags.not_modified(etag)
+
+    def load_page():
+        return Calculation.page_for_user_async(
+            db, current_user.id, after=after, before=before, limit=limit
+        )
+
+    if format == "json":
+        page = await load_page()
+        return JSONBytesResponse(
+            dump_calculation_page(page.items, page.next_after, page.prev_before),
+            headers={"ETag": etag},
+        )
+    fragment = await templating.render_calculation_list(current_user.id, etag, load_page)
     return templates.TemplateResponse(
-        "calculations.html", {"request": request, "calculations": items}
+        "calculations.html",
+        {
+            "request": request,
+            "calculation_list": fragment.html,
+            "limit": limit,
+            "next_after": fragment.next_after,
+            "prev_before": fragment.prev_before,
+        },
+        headers={"ETag": etag},
+    )
+
+
+@app.get("/calculations/export")
+def export_calculations(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_active_user),
+):
+    return StreamingResponse(
+        calculation_export.EXPORTERS[format](db, current_user.id),
+        media_type=calculation_export.MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="calculations.{format}"'
+        },
     )
 
 
+@app.get("/calculations/stats", response_model=CalculationStatsResponse)
+async def calculation_stats(
+    min_id: Optional[int] = Query(None, description="Only count rows with id >= min_id"),
+    max_id: Optional[int] = Query(None, description="Only count rows with id <= max_id"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(get_current_active_user),
+):
+    rows = await Calculation.stats_for_user_async(db, current_user.id, min_id, max_id)
+    by_type = [CalculationTypeStats(**row._mapping) for row in rows]
+    return CalculationStatsResponse(count=sum(stats.count for stats in by_type), by_type=by_type)
+
+
 @app.get("/calculations/{id}", response_model=CalculationResponse)
 def read_calculation(
     id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_active_user),
 ):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = db.execute(Calculation.version_query(id, current_user.id)).scalar()
+        if version is None:
+            raise HTTPException(status_code=404)
+        etag = etags.calculation_etag(id, version)
+        if etags.matches(if_none_match, etag):
+            return etags.not_modified(etag)
     i = db.query(Calculation).filter(Calculation.id == id, Calculation.user_id == current_user.id).first()
     if not i:
         raise HTTPException(status_code=404)
-    return CalculationResponse(
-        id=i.id,
-        user_id=str(i.user_id),
-        type=i.type,
-        inputs=i.inputs,
-        result=i.get_result(),
+    return JSONBytesResponse(
+        dump_calculation(i), headers={"ETag": etags.calculation_etag(i.id, i.version)}
     )
     
 @app.post("/")
 async def store_homepage_calculation(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     form = await request.form()
     a = float(form.get("a"))
     b = float(form.get("b"))
-    op = form.get("operation")
-    # Map operation to CalculationType
-    op_map = {
-        "add": CalculationType.addition,
-        "subtract": CalculationType.subtraction,
-        "multiply": CalculationType.multiplication,
-        "divide": CalculationType.division,
-        "modulus": CalculationType.modulus,
-    }
-    calc_type = op_map.get(op)
-    if not calc_type:
+    operation = BY_CODE.get(form.get("operation"))
+    if operation is None:
         return JSONResponse(status_code=400, content={"error": "Invalid operation"})
-    from app.models.calculation import Calculation
-    obj = Calculation.create(calc_type.value, current_user.id, [a, b])
+    if calculation_writer.running:
+        await calculation_writer.submit(
+            Calculation.row_values(operation.name, current_user.id, [a, b])
+        )
+        replica_router.note_write(current_user.id)
+        templating.invalidate_user(current_user.id)
+        return RedirectResponse("/calculations", status_code=303)
+    obj = Calculation.create(operation.name, current_user.id, [a, b])
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    templating.invalidate_user(current_user.id)
     return RedirectResponse("/calculations", status_code=303)
-@app.post("/modulus")
-async def modulus_endpoint(data: OperationRequest):
-    try:
-        from app.operations import modulus
-        result = modulus(data.a, data.b)
-        return {"result": result}
-    except Exception as e:
-        return JSONResponse(status_code=400, content={"error": str(e)})
-
-
 @app.post("/calculations")
 async def add_calculation(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     form = await request.form()
-    calc_type = form.get("type")
-    inputs = [float(x.strip()) for x in form.get("inputs", "").split(",") if x.strip()]
-    obj = Calculation.create(calc_type, current_user.id, inputs)
+    inputs = [x.strip() for x in form.get("inputs", "").split(",") if x.strip()]
+    formula = form.get("formula", "").strip() or None
+    try:
+        row = calculation_import.validate_calculation(form.get("type"), inputs, formula)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    obj = Calculation.create(row.type.value, current_user.id, row.inputs, row.formula)
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    await db.commit()
+    templating.invalidate_user(current_user.id)
     return RedirectResponse("/calculations", status_code=HTTP_303_SEE_OTHER)
 
 
+@app.post("/calculations/bulk", response_model=CalculationImportResponse)
+async def bulk_import_calculations(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_active_user),
+):
+    """
+    Import many calculations at once from a JSON array, NDJSON or CSV body, or
+    from a multipart upload in a "file" field. See app/calculation_import.py.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing file upload")
+        format = calculation_import.detect_format(upload.content_type, upload.filename)
+        chunks = calculation_import.iter_upload(upload)
+    else:
+        format = calculation_import.detect_format(content_type)
+        chunks = request.stream()
+    if format is None:
+        raise HTTPException(status_code=415, detail="Expected JSON, NDJSON or CSV")
+
+    report = await calculation_import.import_calculations(
+        db, current_user.id, calculation_import.PARSERS[format](chunks)
+    )
+    replica_router.note_write(current_user.id)
+    templating.invalidate_user(current_user.id)
+    logger.info(
+        "Imported %d calculations (%d rejected) in %.2fs, %.0f rows/s via %s",
+        report.inserted,
+        report.rejected,
+        report.seconds,
+        report.rows_per_second,
+        report.method,
+    )
+    if report.error:
+        return JSONResponse(status_code=400, content=report.model_dump())
+    return report
+
+
 @app.put("/calculations/{id}", response_model=CalculationResponse)
 def edit_calculation(
     id: int,
     calc: CalculationUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     obj = db.query(Calculation).filter(Calculation.id == id, Calculation.user_id == current_user.id).first()
     if not obj:
         raise HTTPException(status_code=404)
-    if calc.type:
-        obj.type = calc.type.value
-    if calc.inputs:
-        obj.inputs = calc.inputs
-    db.commit()
-    db.refresh(obj)
-    return CalculationResponse(
-        id=obj.id,
-        user_id=str(obj.user_id),
-        type=obj.type,
-        inputs=obj.inputs,
-        result=obj.get_result(),
+    # With If-Match the edit only applies to the version the client last read
+    if_match = request.headers.get("if-match")
+    if if_match and not etags.strong_matches(if_match, etags.calculation_etag(obj.id, obj.version)):
+        raise HTTPException(status_code=412, detail="Calculation was modified")
+    calc_type = calc.type.value if calc.type else obj.type
+    formula = calc.formula
+    # An expression keeps its formula unless the edit replaces it; any other type has none
+    if formula is None and calc_type == EXPRESSION and obj.type == EXPRESSION:
+        formula = obj.formula
+    try:
+        row = calculation_import.validate_calculation(calc_type, calc.inputs or obj.inputs, formula)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Another request updated or deleted the row since it was loaded
+    conflict = HTTPException(status_code=412 if if_match else 409, detail="Calculation was modified")
+    if row.type.value == obj.type:
+        obj.formula = row.formula
+        obj.inputs = row.inputs
+        try:
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise conflict
+    else:
+        # A new type maps the row to another subclass, which the ORM can neither
+        # flush nor reload through the loaded object: update the row with Core,
+        # drop the object and load the row again as its new subclass
+        table = Calculation.__table__
+        values = Calculation.row_values(row.type.value, obj.user_id, row.inputs, row.formula)
+        updated = db.execute(
+            update(table)
+            .where(table.c.id == obj.id, table.c.version == obj.version)
+            .values(**values, version=table.c.version + 1)
+        )
+        if updated.rowcount != 1:
+            db.rollback()
+            raise conflict
+        db.expunge(obj)
+        db.commit()
+    templating.invalidate_user(current_user.id)
+    obj = db.get(Calculation, id, populate_existing=True)
+    return JSONBytesResponse(
+        dump_calculation(obj), headers={"ETag": etags.calculation_etag(obj.id, obj.version)}
     )
 
 
@@ -250,76 +637,76 @@ def delete_calculation(
         raise HTTPException(status_code=404)
     db.delete(obj)
     db.commit()
+    templating.invalidate_user(current_user.id)
     return {"ok": True}
 
 
-@app.post(
-    "/add", response_model=OperationResponse, responses={400: {"model": ErrorResponse}}
-)
-async def add_route(operation: OperationRequest):
-    """
-    Add two numbers.
-    """
-    try:
-        result = add(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Add Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+def operation_route(operation):
+    """Build the POST /<code> handler for a registered operation."""
 
+    async def route(operands: OperationRequest):
+        try:
+            result = operation.scalar(operands.a, operands.b)
+            return OperationResponse(result=result)
+        except ValueError as e:
+            logger.error(f"{operation.name.capitalize()} Operation Error: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"{operation.name.capitalize()} Operation Internal Error: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal Server Error")
 
-@app.post(
-    "/subtract",
-    response_model=OperationResponse,
-    responses={400: {"model": ErrorResponse}},
-)
-async def subtract_route(operation: OperationRequest):
-    """
-    Subtract two numbers.
-    """
-    try:
-        result = subtract(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Subtract Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+    route.__name__ = f"{operation.code}_route"
+    route.__doc__ = operation.description
+    return route
+
+
+for registered in OPERATIONS.values():
+    app.post(
+        f"/{registered.code}",
+        response_model=OperationResponse,
+        responses={400: {"model": ErrorResponse}},
+    )(operation_route(registered))
 
 
 @app.post(
-    "/multiply",
-    response_model=OperationResponse,
+    "/batch",
+    response_model=BatchResponse,
     responses={400: {"model": ErrorResponse}},
 )
-async def multiply_route(operation: OperationRequest):
+async def batch_route(batch: BatchRequest):
     """
-    Multiply two numbers.
+    Evaluate a columnar batch of operations in one vectorized pass.
     """
-    try:
-        result = multiply(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except Exception as e:
-        logger.error(f"Multiply Operation Error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
+    result = vectorized.evaluate(batch.op, batch.a, batch.b)
+    return BatchResponse(
+        results=result.to_list(),
+        errors=[BatchError(index=i, error=e) for i, e in result.errors.items()],
+    )
 
 
 @app.post(
-    "/divide",
-    response_model=OperationResponse,
+    "/expressions/evaluate",
+    response_model=ExpressionResponse,
     responses={400: {"model": ErrorResponse}},
 )
-async def divide_route(operation: OperationRequest):
+async def evaluate_expression(request: ExpressionRequest):
     """
-    Divide two numbers.
+    Evaluate a formula for one set of bindings, or for a columnar batch of them in
+    one vectorized pass. The formula is compiled once and cached.
     """
     try:
-        result = divide(operation.a, operation.b)
-        return OperationResponse(result=result)
-    except ValueError as e:
-        logger.error(f"Divide Operation Error: {str(e)}")
+        compiled = expressions.get_expression(request.formula)
+        if request.batch is None:
+            result = compiled.evaluate(request.bindings or {})
+            return ExpressionResponse(variables=compiled.variables, result=result)
+        batch = compiled.evaluate_batch(request.batch)
+    except expressions.ExpressionError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"Divide Operation Internal Error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    return ExpressionResponse(
+        variables=compiled.variables,
+        results=batch.to_list(),
+        errors=[BatchError(index=i, error=e) for i, e in batch.errors.items()],
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+# tests/benchmarks/bench_inputs_storage.py
+
+"""
+Compare the JSON and packed storage formats for Calculation.inputs.
+
+For growing input lengths this reports the stored size of one row's inputs and
+the time to load --rows such rows from a scratch SQLite file through each column
+type, i.e. the driver fetch plus SQLAlchemy's result processing (json.loads for
+JSON, a frombuffer for the packed blob).
+
+Usage:
+    python -m tests.benchmarks.bench_inputs_storage
+    python -m tests.benchmarks.bench_inputs_storage --rows 20000 --max-size 4096
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import JSON, Column, Integer, MetaData, Table, create_engine, insert, select
+
+from app.models.types import PackedFloats
+from tests.benchmarks.bench_reductions import make_inputs, sizes_up_to
+
+
+def load_time(engine, table, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with engine.connect() as connection:
+            start = time.perf_counter()
+            connection.execute(select(table.c.inputs)).all()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows: int, max_size: int, repeat: int) -> list:
+    """Return [(size, json_bytes, packed_bytes, json_s, packed_s), ...]."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        for size in sizes_up_to(max_size):
+            metadata = MetaData()
+            tables = {
+                name: Table(
+                    f"inputs_{name}_{size}",
+                    metadata,
+                    Column("id", Integer, primary_key=True),
+                    Column("inputs", column_type),
+                )
+                for name, column_type in (("json", JSON), ("packed", PackedFloats))
+            }
+            metadata.create_all(engine)
+            values = make_inputs(size)
+            with engine.begin() as connection:
+                for table in tables.values():
+                    connection.execute(insert(table), [{"inputs": values}] * rows)
+
+            json_bytes = len(JSON().bind_processor(engine.dialect)(values))
+            packed_bytes = len(PackedFloats().process_bind_param(values, engine.dialect))
+            results.append(
+                (
+                    size,
+                    json_bytes,
+                    packed_bytes,
+                    load_time(engine, tables["json"], repeat),
+                    load_time(engine, tables["packed"], repeat),
+                )
+            )
+        engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--max-size", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>6} {'json (B)':>10} {'packed (B)':>11} "
+        f"{'json load (ms)':>15} {'packed load (ms)':>17} {'speedup':>8}"
+    )
+    for size, json_bytes, packed_bytes, json_s, packed_s in run(args.rows, args.max_size, args.repeat):
+        print(
+            f"{size:>6} {json_bytes:>10} {packed_bytes:>11} "
+            f"{json_s * 1e3:>15.2f} {packed_s * 1e3:>17.2f} {json_s / packed_s:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
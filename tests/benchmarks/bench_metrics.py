@@ -0,0 +1,99 @@
+# tests/benchmarks/bench_metrics.py
+
+"""
+Measure the overhead of the metrics subsystem in app.metrics.
+
+Two numbers are reported:
+
+- middleware: the per-request cost of MetricsMiddleware, measured by calling a
+  trivial ASGI app directly (no network, no routing) with and without it;
+- sql: the per-statement cost of instrument_engine(), measured with
+  "SELECT 1" on an in-memory SQLite engine inside a request context.
+
+Both are absolute costs in microseconds; compare them with the latency of a real
+request (hundreds of microseconds to milliseconds) to judge the overhead.
+
+Usage:
+    python -m tests.benchmarks.bench_metrics
+    python -m tests.benchmarks.bench_metrics --requests 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app import metrics
+
+
+class FakeRoute:
+    path = "/bench"
+
+
+async def plain_app(scope, receive, send):
+    scope["route"] = FakeRoute
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"result":3.0}'})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def time_requests(app, count: int) -> float:
+    scope = {"type": "http", "method": "POST", "path": "/bench"}
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / count
+
+
+def time_statements(instrumented: bool, count: int) -> float:
+    engine = create_engine("sqlite://")
+    if instrumented:
+        metrics.instrument_engine(engine)
+    token = metrics._current_request.set(metrics.RequestMetrics())
+    try:
+        with engine.connect() as connection:
+            statement = text("SELECT 1")
+            start = time.perf_counter()
+            for _ in range(count):
+                connection.execute(statement)
+            return (time.perf_counter() - start) / count
+    finally:
+        metrics._current_request.reset(token)
+        engine.dispose()
+
+
+def best_of(repeat: int, func, *args) -> float:
+    return min(func(*args) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.metrics overhead")
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--statements", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def run_requests(app):
+        return asyncio.run(time_requests(app, args.requests))
+
+    bare = best_of(args.repeat, run_requests, plain_app)
+    wrapped = best_of(args.repeat, run_requests, metrics.MetricsMiddleware(plain_app))
+    print(f"middleware: {bare * 1e6:.2f} us bare, {wrapped * 1e6:.2f} us with metrics, "
+          f"overhead {(wrapped - bare) * 1e6:.2f} us/request")
+
+    bare = best_of(args.repeat, time_statements, False, args.statements)
+    hooked = best_of(args.repeat, time_statements, True, args.statements)
+    print(f"sql:        {bare * 1e6:.2f} us bare, {hooked * 1e6:.2f} us instrumented, "
+          f"overhead {(hooked - bare) * 1e6:.2f} us/statement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# tests/benchmarks/bench_reductions.py
+
+"""
+Benchmark the scalar and vector reduction kernels in app.operations.reductions.
+
+For every calculation type this times both kernels over list inputs of growing
+length and reports the first length at which the vector kernel is faster. Use the
+output to tune VECTOR_THRESHOLDS. The "array" column times the vector kernel on
+inputs that are already an ndarray, i.e. without the list conversion.
+
+Usage:
+    python -m tests.benchmarks.bench_reductions
+    python -m tests.benchmarks.bench_reductions --max-size 1000000 --repeat 7
+"""
+
+import argparse
+import random
+import timeit
+
+import numpy as np
+
+from app.operations.reductions import (
+    SCALAR_KERNELS,
+    VECTOR_KERNELS,
+    VECTOR_THRESHOLDS,
+)
+
+
+def make_inputs(size: int) -> list:
+    """Inputs close to 1 so long products and quotients stay finite."""
+    rng = random.Random(size)
+    return [rng.uniform(0.99, 1.01) for _ in range(size)]
+
+
+def best_time(func, values, repeat: int) -> float:
+    """Best per-call time in seconds, auto-scaling the loop count."""
+    timer = timeit.Timer(lambda: func(values))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def sizes_up_to(max_size: int) -> list:
+    sizes, size = [], 2
+    while size <= max_size:
+        sizes.append(size)
+        size *= 2
+    return sizes
+
+
+def run(max_size: int, repeat: int) -> dict:
+    """Return {calc_type: [(size, scalar_s, vector_s, array_s), ...]}."""
+    results = {}
+    for calc_type in SCALAR_KERNELS:
+        rows = []
+        for size in sizes_up_to(max_size):
+            values = make_inputs(size)
+            scalar = best_time(SCALAR_KERNELS[calc_type], values, repeat)
+            vector = best_time(VECTOR_KERNELS[calc_type], values, repeat)
+            array = best_time(VECTOR_KERNELS[calc_type], np.asarray(values), repeat)
+            rows.append((size, scalar, vector, array))
+        results[calc_type] = rows
+    return results
+
+
+def crossover(rows: list):
+    """First size from which the vector kernel stays faster, or None."""
+    for index, (size, *_) in enumerate(rows):
+        if all(vector < scalar for _, scalar, vector, _ in rows[index:]):
+            return size
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-size", type=int, default=2**20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for calc_type, rows in run(args.max_size, args.repeat).items():
+        print(f"\n{calc_type}")
+        print(
+            f"{'size':>10} {'scalar (us)':>12} {'vector (us)':>12} "
+            f"{'speedup':>8} {'array (us)':>12}"
+        )
+        for size, scalar, vector, array in rows:
+            print(
+                f"{size:>10} {scalar * 1e6:>12.2f} {vector * 1e6:>12.2f} "
+                f"{scalar / vector:>7.2f}x {array * 1e6:>12.2f}"
+            )
+        print(
+            f"crossover: {crossover(rows)} "
+            f"(configured threshold: {VECTOR_THRESHOLDS[calc_type]})"
+        )
+
+
+if __name__ == "__main__":
+    main()
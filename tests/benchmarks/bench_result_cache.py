@@ -0,0 +1,70 @@
+# tests/benchmarks/bench_result_cache.py
+
+"""
+Benchmark the optional result cache in app.operations.memo.
+
+For growing input lengths this times reduce_inputs() with the cache disabled, on a
+cache hit, and on a cache miss (key building plus the reduction plus the insert).
+A hit only pays off where it is cheaper than the uncached reduction; compare the
+columns before enabling RESULT_CACHE_ENABLED.
+
+Usage:
+    python -m tests.benchmarks.bench_result_cache
+    python -m tests.benchmarks.bench_result_cache --calc-type division --repeat 7
+"""
+
+import argparse
+import itertools
+import timeit
+
+from app.cache import LRUCache
+from app.config import settings
+from app.operations import memo
+from app.operations.reductions import SCALAR_KERNELS, reduce_inputs
+from tests.benchmarks.bench_reductions import make_inputs, sizes_up_to
+
+
+def best_time(func, repeat: int) -> float:
+    """Best per-call time in seconds, auto-scaling the loop count."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(calc_type: str, max_size: int, repeat: int) -> list:
+    """Return [(size, uncached_s, hit_s, miss_s), ...]."""
+    rows = []
+    for size in sizes_up_to(max_size):
+        values = make_inputs(size)
+
+        settings.RESULT_CACHE_ENABLED = False
+        uncached = best_time(lambda: reduce_inputs(calc_type, values), repeat)
+
+        settings.RESULT_CACHE_ENABLED = True
+        memo.result_cache = LRUCache(max_bytes=settings.RESULT_CACHE_MAX_BYTES, sizeof=memo._entry_size)
+        reduce_inputs(calc_type, values)
+        hit = best_time(lambda: reduce_inputs(calc_type, values), repeat)
+
+        # Vary the last input so every call misses
+        offsets = itertools.count()
+        miss = best_time(
+            lambda: reduce_inputs(calc_type, values[:-1] + [values[-1] + next(offsets)]), repeat
+        )
+        rows.append((size, uncached, hit, miss))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calc-type", choices=sorted(SCALAR_KERNELS), default="addition")
+    parser.add_argument("--max-size", type=int, default=settings.RESULT_CACHE_MAX_INPUTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'uncached (us)':>14} {'hit (us)':>10} {'miss (us)':>10}")
+    for size, uncached, hit, miss in run(args.calc_type, args.max_size, args.repeat):
+        print(f"{size:>8} {uncached * 1e6:>14.2f} {hit * 1e6:>10.2f} {miss * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
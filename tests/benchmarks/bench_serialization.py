@@ -0,0 +1,107 @@
+# tests/benchmarks/bench_serialization.py
+
+"""
+Benchmark calculation response serialization.
+
+Compares FastAPI's default path (build the response model, jsonable_encoder,
+json.dumps) with app.serialization: the TypeAdapter path for one calculation and
+the orjson path for pages, for a single row and for large pages. Rows are built
+in memory, so no database is needed.
+
+Usage:
+    python -m tests.benchmarks.bench_serialization
+    python -m tests.benchmarks.bench_serialization --rows 10000 --repeat 7
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.calculation import Calculation
+from app.schemas.calculation import CalculationPageResponse, CalculationResponse
+from app.serialization import dump_calculation, dump_calculation_page
+
+
+def best_time(func, repeat: int) -> float:
+    """Best per-call time in seconds, auto-scaling the loop count."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def make_calculations(count: int) -> list:
+    user_id = uuid.uuid4()
+    calcs = []
+    for i in range(count):
+        calc = Calculation.create("addition", user_id, [float(i), 2.0, 3.5])
+        calc.id = i + 1
+        calc.result = i + 5.5
+        calcs.append(calc)
+    return calcs
+
+
+def default_response(calc) -> CalculationResponse:
+    return CalculationResponse(
+        id=calc.id,
+        user_id=str(calc.user_id),
+        type=calc.type,
+        formula=calc.formula,
+        inputs=calc.inputs,
+        result=calc.result,
+    )
+
+
+def default_single(calc) -> bytes:
+    return json.dumps(jsonable_encoder(default_response(calc))).encode()
+
+
+def default_page(calcs) -> bytes:
+    page = CalculationPageResponse(
+        items=[default_response(calc) for calc in calcs], next_after=None, prev_before=None
+    )
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+def run(rows: int, repeat: int) -> list:
+    """Return [(case, default_s, fast_s), ...]."""
+    calcs = make_calculations(rows)
+    single = calcs[0]
+    assert json.loads(default_single(single)) == json.loads(dump_calculation(single))
+    assert json.loads(default_page(calcs[:3])) == json.loads(dump_calculation_page(calcs[:3]))
+
+    results = [
+        (
+            "1 calculation",
+            best_time(lambda: default_single(single), repeat),
+            best_time(lambda: dump_calculation(single), repeat),
+        )
+    ]
+    for size in sorted({50, rows}):
+        page = calcs[:size]
+        results.append(
+            (
+                f"page of {size}",
+                best_time(lambda: default_page(page), repeat),
+                best_time(lambda: dump_calculation_page(page), repeat),
+            )
+        )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':>16} {'default (us)':>14} {'fast (us)':>12} {'speedup':>8}")
+    for case, default, fast in run(args.rows, args.repeat):
+        print(f"{case:>16} {default * 1e6:>14.1f} {fast * 1e6:>12.1f} {default / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
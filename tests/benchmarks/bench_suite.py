@@ -0,0 +1,225 @@
+# tests/benchmarks/bench_suite.py
+
+"""
+Microbenchmarks of the hot functions, with stored baselines and regression gating.
+
+Times each case below and keeps the best per-call time of --repeat runs, the
+figure least disturbed by other load on the machine. Cases that take a list of
+inputs run at sizes 2, 10, 100, ... up to --max-size:
+
+    operations.<op>                 app.operations.add/divide/modulus on two numbers
+    vectorized.<op>[n]              the same operations over two columns of n values
+    Calculation.get_result.<type>[n]  the reduction of n inputs for every type
+    Calculation.create              subclass dispatch, cycling through the types
+    CalculationCreate[n]            pydantic validation of a request with n inputs
+    OperationRequest                pydantic validation of an /add-style request
+    User.create_access_token        JWT encode
+    User.verify_token               JWT decode
+
+--save-baseline writes the results to the baseline file (BENCHMARK_BASELINE).
+A later run fails (exit status 1) if a case is slower than its baseline by more
+than --tolerance (BENCHMARK_TOLERANCE, 0.25 = 25%) and by more than
+BENCHMARK_MIN_DELTA seconds, and still is when timed twice more. Baselines only
+mean something on the machine that recorded them, so record one there before
+gating. tests/benchmarks/test_regressions.py runs the same check under
+pytest --run-slow.
+
+OperationRequest is defined in main.py, so importing this module needs a
+reachable DATABASE_URL, as the tests do.
+
+Usage:
+    python -m tests.benchmarks.bench_suite --save-baseline
+    python -m tests.benchmarks.bench_suite --tolerance 0.1
+    python -m tests.benchmarks.bench_suite --max-size 10000 --only get_result
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app import operations
+from app.models.calculation import Calculation
+from app.models.user import User
+from app.operations import vectorized
+from app.operations.registry import OPERATIONS
+from app.schemas.calculation import CalculationCreate
+from main import OperationRequest
+from tests.benchmarks.bench_reductions import make_inputs
+
+BASELINE_PATH = Path(os.environ.get("BENCHMARK_BASELINE", "tests/benchmarks/baseline.json"))
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", "0.25"))
+# Slowdowns smaller than this many seconds per call are timer noise
+MIN_DELTA = float(os.environ.get("BENCHMARK_MIN_DELTA", "5e-7"))
+MAX_SIZE = 10**6
+
+BINARY_OPERATIONS = ("add", "divide", "modulus")
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Best per-call time in seconds, auto-scaling the loop count."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def decade_sizes(max_size: int) -> List[int]:
+    """2, 10, 100, ... up to max_size."""
+    return [2] + [10**power for power in range(1, 7) if 10**power <= max_size]
+
+
+def cases(max_size: int) -> Iterator[Tuple[str, Callable[[], object]]]:
+    """Yield (name, zero-argument callable) for every case."""
+    for name in BINARY_OPERATIONS:
+        func = getattr(operations, name)
+        yield f"operations.{name}", lambda func=func: func(7.5, 2.5)
+
+    for size in decade_sizes(max_size):
+        a, b = make_inputs(size), make_inputs(size + 1)[:size]
+        for name in BINARY_OPERATIONS:
+            func = getattr(vectorized, name)
+            yield f"vectorized.{name}[{size}]", lambda func=func, a=a, b=b: func(a, b)
+
+    user_id = uuid.uuid4()
+    for size in decade_sizes(max_size):
+        inputs = make_inputs(size)
+        for calc_type in OPERATIONS:
+            calc = Calculation.create(calc_type, user_id, inputs)
+            yield f"Calculation.get_result.{calc_type}[{size}]", calc.get_result
+
+    types = itertools.cycle(OPERATIONS)
+    yield "Calculation.create", lambda: Calculation.create(next(types), user_id, [7.5, 2.5])
+
+    for size in decade_sizes(max_size):
+        payload = {"type": "addition", "inputs": make_inputs(size), "user_id": str(user_id)}
+        yield f"CalculationCreate[{size}]", lambda payload=payload: CalculationCreate(**payload)
+
+    yield "OperationRequest", lambda: OperationRequest(a=7.5, b=2.5)
+
+    token = User.create_access_token({"sub": str(user_id)})
+    yield "User.create_access_token", lambda: User.create_access_token({"sub": str(user_id)})
+    yield "User.verify_token", lambda: User.verify_token(token)
+
+
+def run(max_size: int = MAX_SIZE, repeat: int = 5, only: Optional[str] = None) -> Dict[str, float]:
+    """Return {case: best seconds per call} for the cases whose name contains only."""
+    return {
+        name: best_time(func, repeat)
+        for name, func in cases(max_size)
+        if only is None or only in name
+    }
+
+
+def regressions(
+    baseline: Dict[str, float],
+    results: Dict[str, float],
+    tolerance: float = TOLERANCE,
+    min_delta: float = MIN_DELTA,
+) -> List[Tuple[str, float, float]]:
+    """(case, baseline s, current s) for every case slower than tolerance allows."""
+    return [
+        (name, baseline[name], seconds)
+        for name, seconds in results.items()
+        if name in baseline
+        and seconds > baseline[name] * (1 + tolerance)
+        and seconds - baseline[name] > min_delta
+    ]
+
+
+def confirmed_regressions(
+    baseline: Dict[str, float],
+    results: Dict[str, float],
+    tolerance: float = TOLERANCE,
+    max_size: int = MAX_SIZE,
+    repeat: int = 5,
+    retries: int = 2,
+) -> List[Tuple[str, float, float]]:
+    """
+    regressions(), after timing each slower case up to retries more times and
+    keeping its best time, so a burst of other load is not reported.
+    """
+    slower = regressions(baseline, results, tolerance)
+    for _ in range(retries):
+        if not slower:
+            break
+        names = {name for name, _, _ in slower}
+        for name, func in cases(max_size):
+            if name in names:
+                results[name] = min(results[name], best_time(func, repeat))
+        slower = regressions(baseline, results, tolerance)
+    return slower
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_baseline(results: Dict[str, float], path: Path = BASELINE_PATH) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "commit": git_commit(),
+                "machine": platform.node(),
+                "python": platform.python_version(),
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Optional[Dict[str, float]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Only run cases whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.max_size, args.repeat, args.only)
+    baseline = load_baseline(args.baseline) or {}
+    if not args.save_baseline:
+        slower = confirmed_regressions(
+            baseline, results, args.tolerance, args.max_size, args.repeat
+        )
+    print(f"{'case':<48} {'time (us)':>14} {'baseline (us)':>14} {'change':>8}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        change = f"{(seconds - before) / before * 100:+.1f}%" if before else ""
+        reference = f"{before * 1e6:.3f}" if before else ""
+        print(f"{name:<48} {seconds * 1e6:>14.3f} {reference:>14} {change:>8}")
+
+    if args.save_baseline:
+        # Keep the baseline of cases this run skipped (--only, --max-size)
+        save_baseline({**baseline, **results}, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    for name, before, seconds in slower:
+        print(f"REGRESSION {name}: {before * 1e6:.3f}us -> {seconds * 1e6:.3f}us")
+    if slower:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# tests/benchmarks/bench_write_behind.py
+
+"""
+Compare homepage-style inserts committed one by one with the write-behind queue.
+
+Simulates --clients concurrent clients that each store --rows-per-client
+two-input calculations, first committing every row on its own (what POST / does
+by default), then through app.write_behind.WriteBehindQueue in "commit" mode,
+where every submit still waits for its row to be committed. Reports rows and
+commits per second for both. Runs against a scratch SQLite file, so every commit
+pays a real fsync.
+
+Usage:
+    python -m tests.benchmarks.bench_write_behind
+    python -m tests.benchmarks.bench_write_behind --clients 100 --flush-ms 5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert
+
+from app.database import Base, get_async_engine, get_engine
+from app.models.calculation import Calculation
+from app.models.user import User  # noqa: F401 - resolves the user_id foreign key
+from app.write_behind import WriteBehindQueue
+
+calculations = Calculation.__table__
+
+
+def make_row(user_id, i: int) -> dict:
+    return Calculation.row_values("addition", user_id, [float(i), 1.0])
+
+
+async def per_row_commits(engine, clients: int, rows_per_client: int) -> float:
+    async def client(user_id):
+        for i in range(rows_per_client):
+            async with engine.begin() as connection:
+                await connection.execute(insert(calculations), [make_row(user_id, i)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(uuid.uuid4()) for _ in range(clients)))
+    return time.perf_counter() - start
+
+
+async def write_behind(engine, clients: int, rows_per_client: int, flush_ms: float, max_rows: int):
+    queue = WriteBehindQueue(engine, flush_interval=flush_ms / 1000, max_rows=max_rows)
+    queue.start()
+
+    async def client(user_id):
+        for i in range(rows_per_client):
+            await queue.submit(make_row(user_id, i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(uuid.uuid4()) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    await queue.stop()
+    return elapsed, queue.stats()
+
+
+async def run(database_url: str, args) -> None:
+    engine = get_async_engine(database_url)
+    rows = args.clients * args.rows_per_client
+
+    elapsed = await per_row_commits(engine, args.clients, args.rows_per_client)
+    print(
+        f"per-row commits: {rows / elapsed:>9.0f} rows/s {rows / elapsed:>9.0f} commits/s"
+    )
+
+    elapsed, stats = await write_behind(
+        engine, args.clients, args.rows_per_client, args.flush_ms, args.max_rows
+    )
+    print(
+        f"write-behind:    {rows / elapsed:>9.0f} rows/s {stats['flushes'] / elapsed:>9.0f} commits/s "
+        f"({stats['rows_per_flush']:.1f} rows per commit)"
+    )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rows-per-client", type=int, default=20)
+    parser.add_argument("--flush-ms", type=float, default=20.0)
+    parser.add_argument("--max-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        sync_engine = get_engine(database_url)
+        Base.metadata.create_all(bind=sync_engine)
+        sync_engine.dispose()
+        asyncio.run(run(database_url, args))
+
+
+if __name__ == "__main__":
+    main()
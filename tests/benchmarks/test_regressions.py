@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from tests.benchmarks import bench_suite
+
+
+@pytest.mark.slow
+def test_no_benchmark_regressions():
+    """
+    Fail if a microbenchmark is slower than its baseline by more than
+    BENCHMARK_TOLERANCE. Record the baseline on this machine first with
+    python -m tests.benchmarks.bench_suite --save-baseline.
+    """
+    baseline = bench_suite.load_baseline()
+    if baseline is None:
+        pytest.skip(f"No benchmark baseline at {bench_suite.BASELINE_PATH}")
+    max_size = int(os.environ.get("BENCHMARK_MAX_SIZE", bench_suite.MAX_SIZE))
+
+    results = bench_suite.run(max_size=max_size)
+
+    assert bench_suite.confirmed_regressions(baseline, results, max_size=max_size) == []
+
+
+def test_regressions_respect_tolerance():
+    baseline = {"fast": 1e-3, "slow": 1e-3, "tiny": 1e-7, "retired": 1e-3}
+    results = {"fast": 1.2e-3, "slow": 1.3e-3, "tiny": 3e-7, "new": 5e-3}
+
+    assert bench_suite.regressions(baseline, results, tolerance=0.25) == [("slow", 1e-3, 1.3e-3)]
+    assert bench_suite.regressions(baseline, results, tolerance=0.5) == []
+    # A slowdown below min_delta is treated as noise however large in relative terms
+    assert [name for name, _, _ in bench_suite.regressions(baseline, results, min_delta=0)] == [
+        "slow",
+        "tiny",
+    ]
+
+
+def test_every_case_runs():
+    names = []
+    for name, func in bench_suite.cases(max_size=100):
+        func()
+        names.append(name)
+
+    assert "Calculation.get_result.modulus[100]" in names
+    assert "vectorized.divide[2]" in names
+    assert len(names) == len(set(names))
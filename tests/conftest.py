@@ -16,6 +16,7 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from app.database import Base, get_engine, get_sessionmaker
 from app.models.user import User
+from app.models.calculation import Calculation
 from app.config import settings
 from app.database_init import init_db, drop_db
 
@@ -210,6 +211,59 @@ def seed_users(db_session: Session, request) -> List[User]:
     return users
 
 
+@pytest.fixture
+def test_user() -> Generator[User, None, None]:
+    """
+    Persist a fake user, then remove it and its calculations after the test.
+    """
+    with managed_db_session() as session:
+        user = User(**create_fake_user())
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+    yield user
+    with managed_db_session() as session:
+        session.query(Calculation).filter(Calculation.user_id == user.id).delete()
+        session.query(User).filter(User.id == user.id).delete()
+        session.commit()
+
+
+@pytest.fixture
+def auth_client(test_user: User):
+    """
+    Provide a TestClient for the app that is logged in as test_user.
+    """
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        token = User.create_access_token({"sub": str(test_user.id)})
+        client.cookies.set("access_token", token)
+        yield client
+
+
+@pytest.fixture
+def internal_headers(monkeypatch) -> Dict[str, str]:
+    """
+    Configure an INTERNAL_API_TOKEN and return headers carrying it, for /metrics
+    and /internal/*.
+    """
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "test-internal-token")
+    return {"Authorization": "Bearer test-internal-token"}
+
+
+def create_calculations(user: User, count: int, calc_type: str = "addition") -> List[int]:
+    """
+    Store count calculations [i, 1] for the user and return their ids in order.
+    """
+    with managed_db_session() as session:
+        calcs = [Calculation.create(calc_type, user.id, [i, 1]) for i in range(count)]
+        session.add_all(calcs)
+        session.commit()
+        return [calc.id for calc in calcs]
+
+
 # ======================================================================================
 # FastAPI Server Fixture (Optional)
 # ======================================================================================
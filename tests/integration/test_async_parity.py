@@ -0,0 +1,154 @@
+"""
+Sync/async parity tests.
+
+The register, login, browse and calculation-create routes run on AsyncSession.
+These tests check that they leave the database in the same state, and return the
+same responses, as the equivalent sync Session code paths.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import (
+    SessionLocal,
+    get_async_engine,
+    get_async_sessionmaker,
+)
+from app.auth.hashing import password_hasher
+from app.config import settings
+from app.models.calculation import Calculation
+from app.models.user import User
+from main import app
+from tests.conftest import create_calculations, create_fake_user
+
+
+@pytest.fixture
+def anonymous_client():
+    with TestClient(app) as client:
+        yield client
+
+
+def delete_user(username):
+    with SessionLocal() as db:
+        db.query(User).filter(User.username == username).delete()
+        db.commit()
+
+
+def test_register_then_login(anonymous_client):
+    data = create_fake_user()
+    data["password"] = "SecurePass123"
+    try:
+        response = anonymous_client.post(
+            "/users/register", data=data, follow_redirects=False
+        )
+        assert response.status_code == 303
+        assert response.headers["location"] == "/login"
+
+        with SessionLocal() as db:
+            stored = db.query(User).filter(User.username == data["username"]).one()
+            assert stored.email == data["email"]
+            assert stored.verify_password("SecurePass123")
+
+        duplicate = anonymous_client.post(
+            "/users/register", data=data, follow_redirects=False
+        )
+        assert duplicate.status_code == 200
+        with SessionLocal() as db:
+            assert db.query(User).filter(User.username == data["username"]).count() == 1
+
+        login = anonymous_client.post(
+            "/users/login",
+            data={"username": data["username"], "password": "SecurePass123"},
+            follow_redirects=False,
+        )
+        assert login.status_code == 303
+        assert User.verify_token(login.cookies["access_token"]) == stored.id
+
+        bad_login = anonymous_client.post(
+            "/users/login",
+            data={"username": data["username"], "password": "nope"},
+            follow_redirects=False,
+        )
+        assert bad_login.status_code == 200
+        assert "access_token" not in bad_login.cookies
+    finally:
+        delete_user(data["username"])
+
+
+def test_create_routes_store_rows(auth_client, test_user):
+    auth_client.post(
+        "/", data={"a": "10", "b": "4", "operation": "modulus"}, follow_redirects=False
+    )
+    response = auth_client.post(
+        "/calculations",
+        data={"type": "multiplication", "inputs": "2, 3, 4"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+
+    with SessionLocal() as db:
+        rows = (
+            db.query(Calculation)
+            .filter(Calculation.user_id == test_user.id)
+            .order_by(Calculation.id)
+            .all()
+        )
+        assert [(row.type, row.inputs, row.result) for row in rows] == [
+            ("modulus", [10.0, 4.0], 2.0),
+            ("multiplication", [2.0, 3.0, 4.0], 24.0),
+        ]
+
+
+def test_browse_matches_sync_page(auth_client, test_user):
+    ids = create_calculations(test_user, 5)
+
+    response = auth_client.get(
+        "/calculations", params={"format": "json", "limit": 2, "after": ids[0]}
+    ).json()
+
+    with SessionLocal() as db:
+        page = Calculation.page_for_user(db, test_user.id, after=ids[0], limit=2)
+    assert [item["id"] for item in response["items"]] == [c.id for c in page.items]
+    assert response["next_after"] == page.next_after
+    assert response["prev_before"] == page.prev_before
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [{}, {"after": 1}, {"after": 3}, {"before": 4}, {"before": 2}],
+    ids=["first", "after_1", "after_3", "before_4", "before_2"],
+)
+def test_page_for_user_parity(test_user, cursor):
+    ids = create_calculations(test_user, 5)
+    # Translate the 1-based positions above into this user's ids
+    cursor = {key: ids[value - 1] for key, value in cursor.items()}
+
+    with SessionLocal() as db:
+        sync_page = Calculation.page_for_user(db, test_user.id, limit=2, **cursor)
+        sync_ids = [calc.id for calc in sync_page.items]
+
+    async def fetch():
+        engine = get_async_engine(settings.DATABASE_URL)
+        try:
+            async with get_async_sessionmaker(engine)() as db:
+                page = await Calculation.page_for_user_async(db, test_user.id, limit=2, **cursor)
+                return [calc.id for calc in page.items], page
+        finally:
+            await engine.dispose()
+
+    async_ids, async_page = asyncio.run(fetch())
+    assert async_ids == sync_ids
+    assert async_page.next_after == sync_page.next_after
+    assert async_page.prev_before == sync_page.prev_before
+
+
+def test_register_returns_503_when_hashing_queue_is_full(anonymous_client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    response = anonymous_client.post("/users/register", data=create_fake_user())
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert password_hasher.stats()["rejected"] >= 1
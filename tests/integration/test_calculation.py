@@ -5,6 +5,7 @@ from app.models.calculation import (
     Subtraction,
     Multiplication,
     Division,
+    Modulus,
 )
 
 
@@ -46,3 +47,16 @@ def test_division_by_zero():
         assert False
     except ValueError:
         assert True
+
+
+def test_modulus():
+    calc = Modulus(inputs=[10, 4, 3])
+    assert calc.get_result() == 2
+
+
+def test_long_inputs_match_scalar_loop():
+    inputs = [1.0 + i / 1e6 for i in range(10_000)]
+    expected = inputs[0]
+    for value in inputs[1:]:
+        expected /= value
+    assert Division(inputs=inputs).get_result() == expected
@@ -0,0 +1,95 @@
+import json
+
+from app import calculation_import
+from app.models.calculation import Calculation
+from tests.conftest import create_calculations, managed_db_session
+
+
+def stored_rows(user):
+    with managed_db_session() as session:
+        calcs = (
+            session.query(Calculation)
+            .filter(Calculation.user_id == user.id)
+            .order_by(Calculation.id)
+            .all()
+        )
+        return [(calc.type, calc.inputs, calc.result) for calc in calcs]
+
+
+def test_bulk_import_json_reports_rejects(auth_client, test_user, monkeypatch):
+    monkeypatch.setattr(calculation_import, "IMPORT_CHUNK_SIZE", 2)
+    body = [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "division", "inputs": [1, 0]},
+        {"type": "multiplication", "inputs": [2, 3, 4]},
+        {"type": "power", "inputs": [2, 3]},
+        {"type": "modulus", "inputs": [7, 4]},
+        {"type": "subtraction", "inputs": [5]},
+        "not an object",
+    ]
+
+    response = auth_client.post("/calculations/bulk", json=body)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 3
+    assert report["rejected"] == 4
+    assert report["method"] == "executemany"
+    assert report["rows_per_second"] > 0
+    assert [reject["row"] for reject in report["rejects"]] == [2, 4, 6, 7]
+    assert "divide by zero" in report["rejects"][0]["error"]
+    assert stored_rows(test_user) == [
+        ("addition", [1, 2], 3),
+        ("multiplication", [2, 3, 4], 24),
+        ("modulus", [7, 4], 3),
+    ]
+
+
+def test_bulk_import_round_trips_csv_export(auth_client, test_user):
+    create_calculations(test_user, 3, "subtraction")
+    exported = auth_client.get("/calculations/export", params={"format": "csv"}).content
+
+    response = auth_client.post(
+        "/calculations/bulk", files={"file": ("calculations.csv", exported, "text/csv")}
+    )
+
+    assert response.json()["inserted"] == 3
+    rows = stored_rows(test_user)
+    assert rows[3:] == rows[:3]
+
+
+def test_bulk_import_ndjson_body(auth_client, test_user):
+    body = "\n".join(
+        [json.dumps({"type": "addition", "inputs": [1, 1]}), "{broken", ""]
+    )
+
+    response = auth_client.post(
+        "/calculations/bulk",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+    report = response.json()
+    assert report["inserted"] == 1
+    assert report["rejects"][0]["row"] == 2
+
+
+def test_bulk_import_malformed_body_keeps_committed_chunks(auth_client, test_user, monkeypatch):
+    monkeypatch.setattr(calculation_import, "IMPORT_CHUNK_SIZE", 1)
+    body = '[{"type": "addition", "inputs": [1, 2]}, {"type": '
+
+    response = auth_client.post(
+        "/calculations/bulk", content=body, headers={"content-type": "application/json"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["inserted"] == 1
+    assert response.json()["error"]
+    assert len(stored_rows(test_user)) == 1
+
+
+def test_bulk_import_rejects_unknown_media_type(auth_client):
+    response = auth_client.post(
+        "/calculations/bulk", content=b"x", headers={"content-type": "text/plain"}
+    )
+    assert response.status_code == 415
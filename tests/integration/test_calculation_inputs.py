@@ -0,0 +1,78 @@
+import struct
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app import calculation_inputs
+from app.calculation_inputs import backfill_packed, check_packed, ensure_packed_column
+from app.database import get_sessionmaker
+from app.models.types import PackedFloats
+
+
+@pytest.fixture
+def legacy_engine():
+    """A calculations table as it was before inputs_packed existed."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE calculations (id INTEGER PRIMARY KEY, type VARCHAR, inputs JSON)")
+        )
+        connection.execute(
+            text("INSERT INTO calculations (id, type, inputs) VALUES (:id, 'addition', :inputs)"),
+            [{"id": i, "inputs": f"[{i}, 0.1, -0.0]"} for i in range(1, 6)]
+            + [{"id": 6, "inputs": None}],
+        )
+    yield engine
+    engine.dispose()
+
+
+def test_packed_floats_round_trip():
+    engine = create_engine("sqlite://")
+    column_type = PackedFloats()
+    dialect = engine.dialect
+
+    packed = column_type.process_bind_param([1, 2.5, -0.0, 1e308], dialect)
+
+    assert packed == struct.pack("<4d", 1.0, 2.5, -0.0, 1e308)
+    assert column_type.process_result_value(packed, dialect) == [1.0, 2.5, -0.0, 1e308]
+    assert column_type.process_bind_param(None, dialect) is None
+
+
+def test_migrate_inputs_to_packed(legacy_engine):
+    assert ensure_packed_column(legacy_engine) is True
+    assert ensure_packed_column(legacy_engine) is False
+
+    db = get_sessionmaker(legacy_engine)()
+    try:
+        assert backfill_packed(db, chunk_size=2) == 5
+        # Rerunning only visits rows that still need it
+        assert backfill_packed(db, chunk_size=2) == 0
+        assert check_packed(db, sample_size=10) == []
+
+        db.execute(text("UPDATE calculations SET inputs = '[9, 9]' WHERE id = 3"))
+        mismatches = check_packed(db, sample_size=10)
+        assert [(m.id, m.json, m.packed) for m in mismatches] == [(3, [9, 9], [3.0, 0.1, -0.0])]
+    finally:
+        db.close()
+
+
+def test_check_command_exit_status(legacy_engine, monkeypatch, capsys):
+    ensure_packed_column(legacy_engine)
+    SessionLocal = get_sessionmaker(legacy_engine)
+    monkeypatch.setattr(calculation_inputs, "SessionLocal", SessionLocal)
+    monkeypatch.setattr("sys.argv", ["calculation_inputs", "check", "--sample-size", "10"])
+    with SessionLocal() as db:
+        backfill_packed(db)
+
+    with pytest.raises(SystemExit) as passed:
+        calculation_inputs.main()
+    assert passed.value.code == 0
+
+    with SessionLocal() as db:
+        db.execute(text("UPDATE calculations SET inputs = '[9, 9]' WHERE id = 3"))
+        db.commit()
+    with pytest.raises(SystemExit) as failed:
+        calculation_inputs.main()
+    assert failed.value.code == 1
+    assert "1 mismatches in sample of 10" in capsys.readouterr().out
@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.calculation_results import (
+    backfill_results,
+    check_results,
+    ensure_formula_column,
+    ensure_result_column,
+    ensure_version_column,
+)
+from app.database import Base, get_sessionmaker
+from app.models.calculation import Calculation
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = get_sessionmaker(engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_result_written_on_insert(db):
+    calc = Calculation.create("multiplication", uuid.uuid4(), [2, 3, 4])
+    db.add(calc)
+    db.commit()
+    db.refresh(calc)
+    assert calc.result == 24
+
+
+def test_result_rewritten_on_update(db):
+    calc = Calculation.create("addition", uuid.uuid4(), [1, 2])
+    db.add(calc)
+    db.commit()
+
+    calc.inputs = [10, 4]
+    db.commit()
+    db.refresh(calc)
+    assert calc.result == 14
+
+
+def test_result_is_null_when_it_cannot_be_computed(db):
+    calc = Calculation.create("division", uuid.uuid4(), [1, 0])
+    db.add(calc)
+    db.commit()
+    db.refresh(calc)
+    assert calc.result is None
+
+
+def test_expression_result_written_on_insert(db):
+    calc = Calculation.create("expression", uuid.uuid4(), [1, 2, 4, 3], "(a + b) * c / d")
+    db.add(calc)
+    db.commit()
+    db.refresh(calc)
+    assert calc.result == 4.0
+    assert calc.get_result() == 4.0
+
+    calc.inputs = [1, 2, 4, 0]
+    db.commit()
+    db.refresh(calc)
+    assert calc.result is None
+
+
+def test_backfill_and_check(db):
+    for inputs in ([1, 2], [3, 4], [5, 6]):
+        db.add(Calculation.create("addition", uuid.uuid4(), inputs))
+    db.commit()
+    # Simulate rows written before the column existed, plus one stale value
+    db.execute(text("UPDATE calculations SET result = NULL WHERE id < 3"))
+    db.execute(text("UPDATE calculations SET result = 99 WHERE id = 3"))
+    db.commit()
+
+    assert {m.id for m in check_results(db, sample_size=10)} == {1, 2, 3}
+    assert backfill_results(db, chunk_size=2) == 2
+    assert [m.id for m in check_results(db, sample_size=10)] == [3]
+    assert backfill_results(db, chunk_size=2, only_missing=False) == 3
+    assert check_results(db, sample_size=10) == []
+
+
+def test_ensure_result_column():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE calculations (id INTEGER PRIMARY KEY, type VARCHAR, inputs JSON)")
+        )
+    assert ensure_result_column(engine) is True
+    assert ensure_result_column(engine) is False
+
+
+def test_ensure_formula_column():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE calculations (id INTEGER PRIMARY KEY, type VARCHAR, inputs JSON)")
+        )
+    assert ensure_formula_column(engine) is True
+    assert ensure_formula_column(engine) is False
+
+
+def test_ensure_version_column():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE calculations (id INTEGER PRIMARY KEY, type VARCHAR, inputs JSON)")
+        )
+        connection.execute(text("INSERT INTO calculations (type, inputs) VALUES ('addition', '[1, 2]')"))
+    assert ensure_version_column(engine) is True
+    assert ensure_version_column(engine) is False
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version FROM calculations")).scalar() == 1
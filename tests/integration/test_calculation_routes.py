@@ -0,0 +1,386 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app import calculation_export, templating
+from app.models.calculation import Calculation
+from main import app
+from tests.conftest import create_calculations
+
+# Edits that change the type used to flush through the old subclass; fail on it
+raise_sa_warnings = pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+
+
+def test_browse_requires_login():
+    with TestClient(app) as client:
+        response = client.get("/calculations", params={"format": "json"})
+    assert response.status_code == 401
+
+
+def test_browse_json_pages_forward_and_back(auth_client, test_user):
+    ids = create_calculations(test_user, 5)
+
+    first = auth_client.get("/calculations", params={"format": "json", "limit": 2}).json()
+    assert [item["id"] for item in first["items"]] == ids[:2]
+    assert first["prev_before"] is None
+    assert first["next_after"] == ids[1]
+
+    second = auth_client.get(
+        "/calculations", params={"format": "json", "limit": 2, "after": ids[1]}
+    ).json()
+    assert [item["id"] for item in second["items"]] == ids[2:4]
+    assert second["prev_before"] == ids[2]
+    assert second["next_after"] == ids[3]
+
+    last = auth_client.get(
+        "/calculations", params={"format": "json", "limit": 2, "after": ids[3]}
+    ).json()
+    assert [item["id"] for item in last["items"]] == ids[4:]
+    assert last["next_after"] is None
+
+    back = auth_client.get(
+        "/calculations", params={"format": "json", "limit": 2, "before": ids[2]}
+    ).json()
+    assert [item["id"] for item in back["items"]] == ids[:2]
+    assert back["prev_before"] is None
+    assert back["next_after"] == ids[1]
+    assert back["items"][1]["result"] == 2
+
+
+def test_list_and_detail_serialize_a_row_alike(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1)
+
+    page = auth_client.get("/calculations", params={"format": "json"})
+    detail = auth_client.get(f"/calculations/{calc_id}")
+
+    assert page.json()["items"] == [detail.json()]
+    # Compare the bodies, since 0 == 0.0 once parsed
+    assert '"inputs":[0.0,1.0]' in page.text
+    assert '"inputs":[0.0,1.0]' in detail.text
+
+
+def test_browse_html_has_page_links(auth_client, test_user):
+    ids = create_calculations(test_user, 3)
+
+    response = auth_client.get("/calculations", params={"limit": 2})
+
+    assert response.status_code == 200
+    assert f"after={ids[1]}" in response.text
+    assert 'id="prev-page"' not in response.text
+
+
+def test_browse_html_list_fragment_cache(auth_client, test_user):
+    templating.fragment_cache.clear()
+    create_calculations(test_user, 2)
+
+    first = auth_client.get("/calculations")
+    hits = templating.cache_stats()["hits"]
+    second = auth_client.get("/calculations")
+    assert second.text == first.text
+    assert templating.cache_stats()["hits"] == hits + 1
+    assert templating.cache_stats()["entries"] == 1
+
+    auth_client.post(
+        "/calculations",
+        data={"type": "multiplication", "inputs": "6, 7"},
+        follow_redirects=False,
+    )
+    assert templating.cache_stats()["entries"] == 0
+    response = auth_client.get("/calculations")
+    assert "<strong>multiplication</strong>" in response.text
+    assert response.text.count('class="list-group-item"') == 3
+
+
+def test_browse_rejects_bad_limit(auth_client):
+    response = auth_client.get("/calculations", params={"limit": 0})
+    assert response.status_code == 400
+
+
+@raise_sa_warnings
+def test_read_and_edit_calculation(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1, "multiplication")
+
+    response = auth_client.get(f"/calculations/{calc_id}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "id": calc_id,
+        "user_id": str(test_user.id),
+        "type": "multiplication",
+        "formula": None,
+        "inputs": [0.0, 1.0],
+        "result": 0.0,
+    }
+
+    edited = auth_client.put(
+        f"/calculations/{calc_id}",
+        json={"type": "multiplication", "inputs": [3, 4], "user_id": str(test_user.id)},
+    )
+    assert edited.status_code == 200
+    assert edited.json()["result"] == 12.0
+
+    retyped = auth_client.put(
+        f"/calculations/{calc_id}",
+        json={"type": "addition", "inputs": None, "user_id": None},
+    )
+    assert retyped.status_code == 200
+    assert retyped.json()["type"] == "addition"
+    assert retyped.json()["result"] == 7.0
+    assert auth_client.get("/calculations/999999").status_code == 404
+
+
+@raise_sa_warnings
+def test_calculation_etag_and_conditional_get(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1)
+
+    first = auth_client.get(f"/calculations/{calc_id}")
+    etag = first.headers["etag"]
+    assert etag == f'"{calc_id}-1"'
+
+    cached = auth_client.get(f"/calculations/{calc_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    edited = auth_client.put(
+        f"/calculations/{calc_id}",
+        json={"type": "addition", "inputs": [5, 5], "user_id": str(test_user.id)},
+    )
+    assert edited.headers["etag"] == f'"{calc_id}-2"'
+    changed = auth_client.get(f"/calculations/{calc_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["result"] == 10
+
+    missing = auth_client.get("/calculations/999999", headers={"If-None-Match": etag})
+    assert missing.status_code == 404
+
+
+@raise_sa_warnings
+def test_concurrent_edit_conflicts(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1)
+    body = {"type": "addition", "inputs": [5, 5], "user_id": str(test_user.id)}
+    calculations = Calculation.__table__
+
+    def bump_version(mapper, connection, target):
+        # Another writer commits between this request's load and its flush
+        connection.execute(
+            update(calculations)
+            .where(calculations.c.id == target.id)
+            .values(version=calculations.c.version + 1)
+        )
+
+    event.listen(Calculation, "before_update", bump_version, propagate=True)
+    try:
+        conflict = auth_client.put(f"/calculations/{calc_id}", json=body)
+        precondition = auth_client.put(
+            f"/calculations/{calc_id}", json=body, headers={"If-Match": f'"{calc_id}-1"'}
+        )
+    finally:
+        event.remove(Calculation, "before_update", bump_version)
+    assert conflict.status_code == 409
+    assert precondition.status_code == 412
+
+    # Neither edit was applied
+    current = auth_client.get(f"/calculations/{calc_id}")
+    assert current.headers["etag"] == f'"{calc_id}-1"'
+    assert current.json()["result"] == 1
+
+    edited = auth_client.put(
+        f"/calculations/{calc_id}", json=body, headers={"If-Match": current.headers["etag"]}
+    )
+    assert edited.status_code == 200
+    assert edited.json()["result"] == 10
+    stale = auth_client.put(
+        f"/calculations/{calc_id}", json=body, headers={"If-Match": current.headers["etag"]}
+    )
+    assert stale.status_code == 412
+
+
+@raise_sa_warnings
+def test_retyping_edit_conflicts(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1)
+    body = {"type": "multiplication", "inputs": [5, 5], "user_id": None}
+    calculations = Calculation.__table__
+
+    def bump_version(orm_execute_state):
+        # Another writer commits between this request's load and its update
+        if orm_execute_state.is_update:
+            orm_execute_state.session.connection().execute(
+                update(calculations)
+                .where(calculations.c.id == calc_id)
+                .values(version=calculations.c.version + 1)
+            )
+
+    event.listen(Session, "do_orm_execute", bump_version)
+    try:
+        conflict = auth_client.put(f"/calculations/{calc_id}", json=body)
+    finally:
+        event.remove(Session, "do_orm_execute", bump_version)
+    assert conflict.status_code == 409
+    assert auth_client.get(f"/calculations/{calc_id}").json()["type"] == "addition"
+
+    retyped = auth_client.put(
+        f"/calculations/{calc_id}", json=body, headers={"If-Match": f'"{calc_id}-1"'}
+    )
+    assert retyped.status_code == 200
+    assert retyped.headers["etag"] == f'"{calc_id}-2"'
+    assert (retyped.json()["type"], retyped.json()["result"]) == ("multiplication", 25.0)
+
+
+@raise_sa_warnings
+def test_if_match_rejects_weak_etags(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1)
+    body = {"type": "addition", "inputs": [5, 5], "user_id": str(test_user.id)}
+    etag = auth_client.get(f"/calculations/{calc_id}").headers["etag"]
+
+    weak = auth_client.put(f"/calculations/{calc_id}", json=body, headers={"If-Match": f"W/{etag}"})
+    assert weak.status_code == 412
+    assert auth_client.get(f"/calculations/{calc_id}").json()["result"] == 1
+
+    strong = auth_client.put(
+        f"/calculations/{calc_id}", json=body, headers={"If-Match": f'"other", {etag}'}
+    )
+    assert strong.status_code == 200
+
+
+@raise_sa_warnings
+def test_page_etag_changes_with_its_rows(auth_client, test_user):
+    ids = create_calculations(test_user, 3)
+    params = {"format": "json", "limit": 2}
+
+    etag = auth_client.get("/calculations", params=params).headers["etag"]
+    assert auth_client.get(
+        "/calculations", params=params, headers={"If-None-Match": f'W/{etag}, "other"'}
+    ).status_code == 304
+    # Another page of the same user has its own ETag
+    assert auth_client.get("/calculations", params={**params, "after": ids[1]}).headers[
+        "etag"
+    ] != etag
+
+    auth_client.put(
+        f"/calculations/{ids[0]}",
+        json={"type": "addition", "inputs": [7, 1], "user_id": str(test_user.id)},
+    )
+    response = auth_client.get("/calculations", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["result"] == 8
+    etag = response.headers["etag"]
+
+    auth_client.delete(f"/calculations/{ids[1]}")
+    response = auth_client.get("/calculations", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [ids[0], ids[2]]
+
+
+def test_export_ndjson(auth_client, test_user):
+    ids = create_calculations(test_user, 3)
+
+    response = auth_client.get("/calculations/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert rows[2] == {"id": ids[2], "type": "addition", "inputs": [2, 1], "result": 3, "formula": None}
+
+
+def test_export_csv_in_batches(auth_client, test_user, monkeypatch):
+    ids = create_calculations(test_user, 5)
+    monkeypatch.setattr(calculation_export, "EXPORT_BATCH_SIZE", 2)
+
+    response = auth_client.get("/calculations/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "type", "inputs", "result", "formula"]
+    assert [int(row[0]) for row in rows[1:]] == ids
+    assert json.loads(rows[1][2]) == [0, 1]
+
+
+def test_export_empty_csv(auth_client):
+    response = auth_client.get("/calculations/export", params={"format": "csv"})
+    assert response.text.splitlines() == ["id,type,inputs,result,formula"]
+
+
+def test_stats_groups_by_type(auth_client, test_user):
+    ids = create_calculations(test_user, 3, "addition")
+    create_calculations(test_user, 2, "multiplication")
+
+    stats = auth_client.get("/calculations/stats").json()
+
+    assert stats["count"] == 5
+    assert stats["by_type"] == [
+        {"type": "addition", "count": 3, "min": 1, "max": 3, "sum": 6, "mean": 2},
+        {"type": "multiplication", "count": 2, "min": 0, "max": 1, "sum": 1, "mean": 0.5},
+    ]
+
+    bounded = auth_client.get(
+        "/calculations/stats", params={"min_id": ids[1], "max_id": ids[2]}
+    ).json()
+    assert bounded["by_type"] == [
+        {"type": "addition", "count": 2, "min": 2, "max": 3, "sum": 5, "mean": 2.5},
+    ]
+
+
+def test_stats_empty(auth_client):
+    assert auth_client.get("/calculations/stats").json() == {"count": 0, "by_type": []}
+
+
+def test_add_calculation_validates_expressions(auth_client):
+    invalid = auth_client.post(
+        "/calculations",
+        data={"type": "expression", "formula": "a+(", "inputs": "1"},
+        follow_redirects=False,
+    )
+    assert invalid.status_code == 400
+    assert "Invalid formula" in invalid.json()["error"]
+    wrong_count = auth_client.post(
+        "/calculations",
+        data={"type": "expression", "formula": "a * b", "inputs": "1"},
+        follow_redirects=False,
+    )
+    assert wrong_count.status_code == 400
+    assert auth_client.get("/calculations", params={"format": "json"}).json()["items"] == []
+
+    stored = auth_client.post(
+        "/calculations",
+        data={"type": "expression", "formula": "a * b", "inputs": "3, 4"},
+        follow_redirects=False,
+    )
+    assert stored.status_code == 303
+    [item] = auth_client.get("/calculations", params={"format": "json"}).json()["items"]
+    assert (item["formula"], item["result"]) == ("a * b", 12.0)
+
+
+@raise_sa_warnings
+def test_edit_calculation_clears_and_validates_formulas(auth_client, test_user):
+    [calc_id] = create_calculations(test_user, 1)
+    url = f"/calculations/{calc_id}"
+
+    def put(**body):
+        return auth_client.put(url, json={"type": None, "inputs": None, "user_id": None, **body})
+
+    expression = put(type="expression", formula="x*y", inputs=[3, 4])
+    assert expression.json()["result"] == 12.0
+    # The formula stays with the expression when only its inputs change
+    assert put(inputs=[5, 4]).json()["result"] == 20.0
+
+    for body in (
+        {"type": "expression", "formula": "x*(", "inputs": [3, 4]},
+        {"type": "expression", "formula": "x*y", "inputs": [3]},
+        {"inputs": [3, 4, 5]},
+        {"type": "addition", "formula": "x*y", "inputs": [3, 4]},
+    ):
+        assert put(**body).status_code == 400
+    assert auth_client.get(url).json()["inputs"] == [5.0, 4.0]
+
+    multiplication = put(type="multiplication")
+    assert (multiplication.json()["formula"], multiplication.json()["result"]) == (None, 20.0)
+    addition = put(type="addition", inputs=[3, 4]).json()
+    assert (addition["type"], addition["formula"], addition["result"]) == ("addition", None, 7.0)
+    assert put(type="expression").status_code == 400
@@ -23,3 +23,17 @@ def test_division_by_zero():
     data = {"type": CalculationType.division, "inputs": [8, 0], "user_id": 1}
     with pytest.raises(ValueError):
         CalculationCreate(**data)
+
+
+def test_expression_needs_one_input_per_variable():
+    data = {"type": "expression", "formula": "x ** 2", "inputs": [3], "user_id": "1"}
+    assert CalculationCreate(**data).formula == "x ** 2"
+    for changes in ({"inputs": [3, 4]}, {"formula": None}, {"formula": "x("}):
+        with pytest.raises(ValueError):
+            CalculationCreate(**{**data, **changes})
+
+
+def test_formula_only_for_expressions():
+    data = {"type": "addition", "formula": "a + b", "inputs": [1, 2], "user_id": "1"}
+    with pytest.raises(ValueError):
+        CalculationCreate(**data)
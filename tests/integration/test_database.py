@@ -62,3 +62,60 @@ def test_get_sessionmaker(mock_settings):
     engine = database.get_engine()
     SessionLocal = database.get_sessionmaker(engine)
     assert isinstance(SessionLocal, sessionmaker)
+
+
+def test_get_engine_uses_pool_settings(mock_settings):
+    """Test that get_engine applies the pool settings to a QueuePool."""
+    database = reload_database_module()
+    with patch.multiple(
+        database.settings, DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2, DB_ECHO=False
+    ):
+        engine = database.get_engine("sqlite:////tmp/pool_test.db")
+    assert isinstance(engine.pool, database.InstrumentedQueuePool)
+    assert engine.pool.size() == 3
+    assert engine.echo is False
+
+
+def test_get_engine_memory_sqlite_keeps_default_pool(mock_settings):
+    database = reload_database_module()
+    engine = database.get_engine("sqlite://")
+    assert not isinstance(engine.pool, database.InstrumentedQueuePool)
+    assert database.get_pool_status(engine)["pool"] == type(engine.pool).__name__
+
+
+def test_get_pool_status_counts_checkouts(mock_settings):
+    """Test that pool status reports checked-out connections and checkout waits."""
+    database = reload_database_module()
+    engine = database.get_engine("sqlite:////tmp/pool_test.db")
+    with engine.connect():
+        status = database.get_pool_status(engine)
+        assert status["checked_out"] == 1
+        assert status["checkouts"] == 1
+    status = database.get_pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 1
+    assert status["wait_seconds_max"] >= 0
+    engine.dispose()
+
+
+def test_get_db_counts_unused_sessions(monkeypatch):
+    """Test that sessions only connect on first use and unused ones are counted."""
+    from sqlalchemy import create_engine, text
+
+    database = importlib.import_module(DATABASE_MODULE)
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(database, "SessionLocal", database.get_sessionmaker(engine))
+    stats = database.SessionStats()
+    monkeypatch.setitem(database.session_stats, "sync", stats)
+
+    unused = database.get_db()
+    next(unused)
+    unused.close()
+
+    used = database.get_db()
+    db = next(used)
+    assert db.execute(text("SELECT 1")).scalar() == 1
+    used.close()
+
+    assert stats.snapshot() == {"sessions": 2, "unused": 1, "unused_ratio": 0.5}
+    engine.dispose()
@@ -6,6 +6,7 @@ from fastapi.testclient import (
     TestClient,
 )  # Import TestClient for simulating API requests
 from main import app  # Import the FastAPI app instance from your main application file
+from app.config import settings
 
 # ---------------------------------------------
 # Pytest Fixture: client
@@ -185,3 +186,170 @@ def test_divide_by_zero_api(client):
     assert (
         "Cannot divide by zero!" in response.json()["error"]
     ), f"Expected error message 'Cannot divide by zero!', got '{response.json()['error']}'"
+
+
+# ---------------------------------------------
+# Test Function: test_batch_api
+# ---------------------------------------------
+
+
+def test_batch_api(client):
+    """
+    Test the Batch API Endpoint.
+
+    This test verifies that the `/batch` endpoint evaluates every element of a
+    columnar payload and reports zero divisors per element without failing the batch.
+    """
+    response = client.post(
+        "/batch",
+        json={
+            "op": ["add", "divide", "modulus", "multiply"],
+            "a": [10, 10, 10, 10],
+            "b": [5, 0, 3, 5],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [15.0, None, 1.0, 50.0],
+        "errors": [{"index": 1, "error": "Cannot divide by zero!"}],
+    }
+
+
+def test_batch_api_overflow(client):
+    """
+    Test that an element overflowing to infinity fails on its own instead of
+    failing the batch.
+    """
+    response = client.post(
+        "/batch",
+        json={"op": ["multiply", "add", "divide"], "a": [1e308, 1, 1], "b": [10, 2, 1e-320]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [None, 3.0, None],
+        "errors": [
+            {"index": 0, "error": "Result is not a finite number (overflow)"},
+            {"index": 2, "error": "Result is not a finite number (overflow)"},
+        ],
+    }
+
+
+def test_batch_api_mismatched_lengths(client):
+    """
+    Test that the `/batch` endpoint rejects columns of different lengths.
+    """
+    response = client.post("/batch", json={"op": ["add"], "a": [1, 2], "b": [3]})
+
+    assert response.status_code == 400
+    assert "same length" in response.json()["error"]
+
+
+def test_db_pool_status_api(client, internal_headers):
+    """
+    Test that the internal pool endpoint reports the pool state.
+    """
+    response = client.get("/internal/db/pool", headers=internal_headers)
+
+    assert response.status_code == 200
+    assert "pool" in response.json()["sync"]
+    assert "pool" in response.json()["async"]
+
+
+def test_internal_endpoints_require_token(client, monkeypatch):
+    """
+    Test that `/metrics` and `/internal/*` refuse requests without the internal
+    API token, and refuse everything while no token is configured.
+    """
+    for path in ("/metrics", "/internal/db/pool", "/internal/cache/users"):
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers={"Authorization": "Bearer guess"}).status_code == 403
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "secret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+
+# ---------------------------------------------
+# Test Function: test_expression_api
+# ---------------------------------------------
+
+
+def test_expression_api(client, internal_headers):
+    """
+    Test that `/expressions/evaluate` evaluates a formula for one set of bindings
+    and for a columnar batch, reporting failed batch elements individually.
+    """
+    formula = "(a + b) * c / d"
+    single = client.post(
+        "/expressions/evaluate",
+        json={"formula": formula, "bindings": {"a": 1, "b": 2, "c": 4, "d": 3}},
+    )
+    assert single.status_code == 200
+    assert single.json() == {
+        "variables": ["a", "b", "c", "d"],
+        "result": 4.0,
+        "results": None,
+        "errors": [],
+    }
+
+    batch = client.post(
+        "/expressions/evaluate",
+        json={"formula": formula, "batch": {"a": [1, 1], "b": [2, 2], "c": [4, 4], "d": [3, 0]}},
+    )
+    assert batch.status_code == 200
+    assert batch.json()["results"] == [4.0, None]
+    assert [error["index"] for error in batch.json()["errors"]] == [1]
+
+    for constant in ("1/0", "2.0**5000"):
+        failed = client.post("/expressions/evaluate", json={"formula": constant, "batch": {}})
+        assert failed.status_code == 200
+        assert failed.json()["results"] == [None]
+        assert [error["index"] for error in failed.json()["errors"]] == [0]
+
+    stats = client.get("/internal/cache/expressions", headers=internal_headers).json()
+    assert stats["hits"] >= 1
+
+
+def test_expression_api_rejects_unsafe_formula(client):
+    """
+    Test that `/expressions/evaluate` refuses anything but arithmetic.
+    """
+    response = client.post(
+        "/expressions/evaluate", json={"formula": "__import__('os').getcwd()", "bindings": {}}
+    )
+
+    assert response.status_code == 400
+    assert "Unsupported syntax" in response.json()["error"]
+
+
+# ---------------------------------------------
+# Test Function: test_static_pages
+# ---------------------------------------------
+
+
+def test_static_pages(client):
+    """
+    Test that the homepage is served prebuilt and compressed, and that its assets
+    are served from content-hashed URLs with long-lived caching.
+    """
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "<h1>Hello World</h1>" in response.text
+    revalidated = client.get(
+        "/", headers={"If-None-Match": response.headers["etag"], "Accept-Encoding": "gzip"}
+    )
+    assert revalidated.status_code == 304
+
+    script = response.text.split('<script src="', 1)[1].split('"', 1)[0]
+    asset = client.get(script)
+    assert asset.status_code == 200
+    assert "immutable" in asset.headers["cache-control"]
+    assert "async function calculate" in asset.text
+
+    assert client.get("/static/missing.js").status_code == 404
+    assert client.get("/static/index.html").status_code == 404
+    assert client.get("/login").status_code == 200
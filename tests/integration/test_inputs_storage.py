@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.calculation_inputs import check_packed
+from app.database import SessionLocal
+from app.models import calculation
+
+
+def test_inputs_round_trip(auth_client):
+    """
+    Write inputs through every route that stores them and read them back through
+    every route that returns them, in this process's CALCULATION_INPUTS_STORAGE.
+    """
+    created = auth_client.post(
+        "/calculations", data={"type": "division", "inputs": "8, 2"}, follow_redirects=False
+    )
+    assert created.status_code == 303
+    imported = auth_client.post(
+        "/calculations/bulk",
+        json=[
+            {"type": "addition", "inputs": [1, 2.5, -0.0]},
+            {"type": "expression", "formula": "a * b", "inputs": [3, 4]},
+        ],
+    )
+    assert imported.json()["inserted"] == 2
+    items = auth_client.get("/calculations", params={"format": "json"}).json()["items"]
+    ids = [item["id"] for item in items]
+
+    edited = auth_client.put(
+        f"/calculations/{ids[0]}", json={"type": None, "inputs": [9, 3], "user_id": None}
+    )
+    assert (edited.json()["inputs"], edited.json()["result"]) == ([9.0, 3.0], 3.0)
+    retyped = auth_client.put(
+        f"/calculations/{ids[1]}", json={"type": "multiplication", "inputs": [2, 5], "user_id": None}
+    )
+    assert (retyped.json()["inputs"], retyped.json()["result"]) == ([2.0, 5.0], 10.0)
+
+    expected = [[9.0, 3.0], [2.0, 5.0], [3.0, 4.0]]
+    page = auth_client.get("/calculations", params={"format": "json"}).json()
+    assert [item["inputs"] for item in page["items"]] == expected
+    assert [auth_client.get(f"/calculations/{id}").json()["inputs"] for id in ids] == expected
+    export = auth_client.get("/calculations/export", params={"format": "ndjson"})
+    assert [json.loads(line)["inputs"] for line in export.text.splitlines()] == expected
+    stats = auth_client.get("/calculations/stats").json()
+    assert [(row["type"], row["sum"]) for row in stats["by_type"]] == [
+        ("division", 3.0),
+        ("expression", 12.0),
+        ("multiplication", 10.0),
+    ]
+
+    if calculation.INPUTS_STORAGE == "dual":
+        # Every write kept both columns in step
+        with SessionLocal() as db:
+            assert check_packed(db, sample_size=10) == []
+
+
+@pytest.mark.parametrize("storage", ["dual", "packed"])
+def test_inputs_round_trip_in_storage_mode(storage, tmp_path):
+    """
+    The storage mode is read once, when app.models.calculation is imported, so
+    run test_inputs_round_trip in a fresh interpreter with the mode set.
+    """
+    env = {
+        **os.environ,
+        "CALCULATION_INPUTS_STORAGE": storage,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'storage.db'}",
+    }
+    env.pop("ASYNC_DATABASE_URL", None)
+    result = subprocess.run(
+        [
+            sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "-o", "addopts=",
+            f"{__file__}::test_inputs_round_trip",
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
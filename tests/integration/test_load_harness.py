@@ -0,0 +1,65 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.database import async_engine
+from main import app
+from tests.load import harness
+from tests.load.scenarios import FULL
+
+
+def run_against_app(scenario, internal_headers):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+                users, site = await harness.seed(client, users=2, rows=20, seed=1)
+                site.internal_headers = internal_headers
+                assert site.assets and all(len(user.calculation_ids) == 20 for user in users)
+                return await scenario(client, users, site)
+        finally:
+            # ASGITransport does not run the lifespan, which would close these
+            await async_engine.dispose()
+
+    return asyncio.run(run())
+
+
+# PUT /calculations/{id} changes types; a flush through the old subclass warns
+@pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+def test_every_action_succeeds(internal_headers):
+    async def scenario(client, users, site):
+        rng = random.Random(0)
+        return {
+            action.route: (await action.send(client, rng, users[0], site)).status_code
+            for action, _ in FULL
+        }
+
+    statuses = run_against_app(scenario, internal_headers)
+    assert {route: status for route, status in statuses.items() if status >= 400} == {}
+
+
+# PUT /calculations/{id} changes types; a flush through the old subclass warns
+@pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning")
+def test_run_load_reports_every_request(internal_headers):
+    async def scenario(client, users, site):
+        return await harness.run_load(client, "full", users, site, concurrency=2, requests=200)
+
+    recorder, elapsed = run_against_app(scenario, internal_headers)
+    result = harness.report(recorder, elapsed, {"mix": "full"})
+
+    assert result["total"]["requests"] == 200
+    assert result["total"]["errors"] == 0, {
+        route: stats["statuses"] for route, stats in result["routes"].items() if stats["errors"]
+    }
+    assert sum(stats["requests"] for stats in result["routes"].values()) == 200
+    assert result["total"]["p50_ms"] <= result["total"]["p95_ms"] <= result["total"]["p99_ms"]
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert harness.percentile(values, 50) == 50.0
+    assert harness.percentile(values, 99) == 99.0
+    assert harness.percentile([3.0], 95) == 3.0
+    assert harness.percentile([], 50) == 0.0
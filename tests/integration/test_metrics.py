@@ -0,0 +1,67 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+from main import app
+from tests.conftest import create_calculations
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def sample(text, name, **labels):
+    """Return the value of the first sample of name whose labels include labels."""
+    for line in text.splitlines():
+        match = re.match(rf"{name}{{(.*)}} (\S+)$", line)
+        if match and all(f'{k}="{v}"' in match.group(1) for k, v in labels.items()):
+            return float(match.group(2))
+    return None
+
+
+def test_metrics_records_routes_and_statuses(internal_headers):
+    with TestClient(app) as client:
+        client.post("/add", json={"a": 1, "b": 2})
+        client.post("/divide", json={"a": 1, "b": 0})
+        client.get("/no-such-page")
+        response = client.get("/metrics", headers=internal_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(text, "http_requests_total", route="/add", status="200") == 1
+    assert sample(text, "http_requests_total", route="/divide", status="400") == 1
+    assert sample(text, "http_requests_total", route="<unmatched>", status="404") == 1
+    assert sample(text, "http_request_duration_seconds_count", route="/add") == 1
+    assert sample(text, "http_request_duration_seconds_bucket", route="/add", le="+Inf") == 1
+    assert sample(text, "http_response_size_bytes_total", route="/add") == len(b'{"result":3.0}')
+    assert "db_pool_checkouts" in text
+    assert "user_cache_hits_total" in text
+    assert "password_hash_queue_depth" in text
+
+
+def test_metrics_counts_sql_statements(auth_client, test_user, internal_headers):
+    create_calculations(test_user, 2)
+
+    auth_client.get("/calculations", params={"format": "json"})
+    text = auth_client.get("/metrics", headers=internal_headers).text
+
+    # The user lookup (sync session) and the page query (async session)
+    statements = sample(
+        text, "http_request_db_statements_total", method="GET", route="/calculations"
+    )
+    assert statements >= 2
+    assert sample(text, "http_request_db_duration_seconds_sum", route="/calculations") > 0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, insert, select
+
+from app import replicas as replicas_module
+from app.database import Base, engine, get_sessionmaker
+from app.models.calculation import Calculation
+from app.replicas import Replica, ReplicaRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    """Two SQLite databases standing in for read replicas."""
+    replicas = [Replica(f"sqlite:///{tmp_path / f'replica{i}.db'}") for i in range(2)]
+    for replica in replicas:
+        Base.metadata.create_all(bind=replica.engine)
+    yield replicas
+    for replica in replicas:
+        replica.engine.dispose()
+
+
+def insert_rows(bind, user_id, inputs_list):
+    with bind.begin() as connection:
+        connection.execute(
+            insert(Calculation.__table__),
+            [Calculation.row_values("addition", user_id, inputs) for inputs in inputs_list],
+        )
+
+
+def test_round_robin_skips_unhealthy_replicas(replicas):
+    router = ReplicaRouter(replicas)
+    assert [router.choose() for _ in range(3)] == [replicas[0], replicas[1], replicas[0]]
+
+    replicas[0].healthy = False
+    assert [router.choose() for _ in range(2)] == [replicas[1], replicas[1]]
+
+    replicas[1].healthy = False
+    assert router.choose() is None
+    assert router.replica_for("user") is None
+    assert router.stats()["primary_reads"] == 1
+
+
+def test_read_your_writes_window(replicas):
+    clock = FakeClock()
+    router = ReplicaRouter(replicas, read_your_writes_seconds=5, clock=clock)
+
+    router.note_write("user")
+    assert router.replica_for("user") is None
+    assert router.replica_for("other") is not None
+
+    clock.now = 5.1
+    assert router.replica_for("user") is not None
+    assert router.stats()["read_your_writes"] == 1
+
+
+def test_routing_session_reads_from_replica_and_writes_to_primary(replicas, test_user):
+    insert_rows(replicas[0].engine, test_user.id, [[100, 1]])
+    db = get_sessionmaker(engine)()
+    db.info["read_bind"] = replicas[0].engine
+    try:
+        query = select(Calculation.result).where(Calculation.user_id == test_user.id)
+        assert db.execute(query).scalars().all() == [101]
+
+        db.add(Calculation.create("addition", test_user.id, [1, 2]))
+        db.commit()
+        del db.info["read_bind"]
+        assert db.execute(query).scalars().all() == [3]
+    finally:
+        db.close()
+
+
+def test_routing_session_reads_its_own_writes_from_primary(replicas, test_user):
+    insert_rows(replicas[0].engine, test_user.id, [[100, 1]])
+    db = get_sessionmaker(engine)()
+    db.info["read_bind"] = replicas[0].engine
+    query = select(Calculation.result).where(Calculation.user_id == test_user.id)
+    during_flush = []
+
+    @event.listens_for(db, "after_flush")
+    def read_during_flush(session, flush_context):
+        during_flush.append(session.execute(query).scalars().all())
+
+    try:
+        assert db.execute(query).scalars().all() == [101]
+
+        db.add(Calculation.create("addition", test_user.id, [1, 2]))
+        assert db.execute(query).scalars().all() == []
+        db.flush()
+        assert during_flush == [[3]]
+        assert db.execute(query).scalars().all() == [3]
+
+        db.commit()
+        assert db.execute(query).scalars().all() == [101]
+    finally:
+        db.close()
+
+
+def test_health_check_marks_failing_replica(replicas, tmp_path):
+    broken = Replica(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter([replicas[0], broken])
+
+    async def check():
+        await router.check_health()
+        for replica in router.replicas:
+            await replica.async_engine.dispose()
+
+    asyncio.run(check())
+
+    assert replicas[0].healthy is True
+    assert broken.healthy is False
+    assert broken.stats()["failed_checks"] == 1
+    assert [router.choose() for _ in range(2)] == [replicas[0], replicas[0]]
+
+
+def test_read_routes_use_replicas_until_the_user_writes(replicas, test_user, auth_client, monkeypatch):
+    router = ReplicaRouter(replicas)
+    monkeypatch.setattr(replicas_module, "replica_router", router)
+    insert_rows(replicas[0].engine, test_user.id, [[10, 0]])
+    insert_rows(replicas[1].engine, test_user.id, [[20, 0]])
+
+    def results():
+        page = auth_client.get("/calculations", params={"format": "json"}).json()
+        return [item["result"] for item in page["items"]]
+
+    assert results() == [10]
+    assert results() == [20]
+
+    auth_client.post("/calculations", data={"type": "addition", "inputs": "1, 2"})
+    assert results() == [3]
+    assert [replica.reads for replica in replicas] == [1, 1]
@@ -0,0 +1,53 @@
+import pytest
+
+from app.auth.user_cache import user_cache
+from app.database import SessionLocal
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def test_second_request_is_served_from_cache(auth_client, test_user):
+    auth_client.get("/calculations", params={"format": "json"})
+    hits = user_cache.hits
+
+    response = auth_client.get("/calculations", params={"format": "json"})
+
+    assert response.status_code == 200
+    assert user_cache.hits == hits + 1
+    assert user_cache.get(test_user.id).username == test_user.username
+
+
+def test_user_update_invalidates_entry(auth_client, test_user):
+    assert auth_client.get("/calculations", params={"format": "json"}).status_code == 200
+
+    with SessionLocal() as db:
+        user = db.get(User, test_user.id)
+        user.is_active = False
+        db.commit()
+
+    assert user_cache.get(test_user.id) is None
+    response = auth_client.get("/calculations", params={"format": "json"})
+    assert response.status_code == 400
+    assert response.json()["error"] == "Inactive user"
+
+
+def test_bulk_update_clears_cache(auth_client, test_user):
+    auth_client.get("/calculations", params={"format": "json"})
+
+    with SessionLocal() as db:
+        db.query(User).filter(User.id == test_user.id).update({"is_verified": True})
+        db.commit()
+
+    assert len(user_cache) == 0
+
+
+def test_cache_status_api(auth_client, internal_headers):
+    response = auth_client.get("/internal/cache/users", headers=internal_headers)
+    assert response.status_code == 200
+    assert set(response.json()) >= {"hits", "misses", "evictions", "entries"}
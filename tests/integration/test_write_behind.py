@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.database import get_async_engine
+from app.models.calculation import Calculation
+from app.write_behind import WriteBehindQueue, calculation_writer
+from tests.conftest import managed_db_session
+
+
+def stored_results(user):
+    with managed_db_session() as session:
+        return [
+            calc.result
+            for calc in session.query(Calculation)
+            .filter(Calculation.user_id == user.id)
+            .order_by(Calculation.id)
+        ]
+
+
+def run_queue(coroutine_factory, **options):
+    async def run():
+        engine = get_async_engine(settings.DATABASE_URL)
+        queue = WriteBehindQueue(engine, **options)
+        queue.start()
+        try:
+            await coroutine_factory(queue)
+        finally:
+            await queue.stop()
+            await engine.dispose()
+        return queue.stats()
+
+    return asyncio.run(run())
+
+
+def test_batches_rows_into_few_commits(test_user):
+    rows = [Calculation.row_values("addition", test_user.id, [i, 1]) for i in range(10)]
+
+    async def submit_all(queue):
+        await asyncio.gather(*(queue.submit(row) for row in rows))
+
+    stats = run_queue(submit_all, flush_interval=1.0, max_rows=4)
+
+    # Full batches flush without waiting for the interval
+    assert stats["flushes"] == 3
+    assert stats["flushed_rows"] == 10
+    assert sorted(stored_results(test_user)) == [i + 1 for i in range(10)]
+
+
+def test_stop_flushes_enqueued_rows(test_user):
+    async def submit_and_stop(queue):
+        for i in range(3):
+            await queue.submit(Calculation.row_values("multiplication", test_user.id, [i, 2]))
+        assert queue.stats()["pending"] == 3
+
+    stats = run_queue(submit_and_stop, flush_interval=60.0, wait_for_commit=False)
+
+    assert stats["pending"] == 0
+    assert stored_results(test_user) == [0, 2, 4]
+
+
+def test_failed_flush_reaches_waiters(test_user):
+    async def submit_bad_row(queue):
+        with pytest.raises(Exception):
+            await queue.submit({"user_id": test_user.id, "type": "addition", "inputs": object()})
+
+    stats = run_queue(submit_bad_row, flush_interval=0.0)
+    assert stats["failed_rows"] == 1
+
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", True)
+    yield calculation_writer
+    assert not calculation_writer.running
+
+
+def test_homepage_uses_write_behind(write_behind, auth_client, test_user):
+    response = auth_client.post(
+        "/", data={"a": "6", "b": "4", "operation": "subtract"}, follow_redirects=False
+    )
+
+    assert response.status_code == 303
+    assert write_behind.stats()["flushed_rows"] >= 1
+    assert stored_results(test_user) == [2]
@@ -0,0 +1,348 @@
+# tests/load/harness.py
+
+"""
+HTTP load harness for the app.
+
+Seeds --users users through /users/register (with create_fake_user() from
+tests/conftest.py), logs them in and bulk-imports --seed-rows calculations for
+each. Then --concurrency workers send requests from one of the mixes in
+tests/load/scenarios.py as fast as the server answers, for --duration seconds
+or --requests requests in all, after --warmup seconds that are not recorded.
+Every worker uses its own user unless there are fewer users than workers.
+
+The report gives requests, errors (status >= 400 or a transport error), RPS and
+p50/p95/p99 latency in total and per route. --output writes it as JSON along
+with the git commit and the run's settings, and "compare" prints the change
+between two such files, so runs can be compared between commits.
+
+Usage:
+    # against a server that is already running
+    python -m tests.load.harness run --mix browse --concurrency 50 --duration 30
+
+    # start uvicorn on DATABASE_URL for the run
+    python -m tests.load.harness run --start-server --workers 4 --mix full --output new.json
+
+    python -m tests.load.harness compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from tests.conftest import ServerStartupError, create_fake_user, wait_for_server
+from tests.load.scenarios import MIXES, LoadUser, SiteState
+
+ASSET = re.compile(r'(/static/[\w.-]+)"')
+
+
+# ---------------------------------------------
+# Seeding
+# ---------------------------------------------
+
+
+async def seed_user(client: httpx.AsyncClient, rows: int, rng: random.Random) -> LoadUser:
+    data = create_fake_user()
+    response = await client.post("/users/register", data=data)
+    if response.status_code != 303:
+        raise RuntimeError(f"Registering {data['username']} failed: {response.status_code}")
+    user = LoadUser(username=data["username"], password=data["password"])
+
+    response = await client.post(
+        "/users/login", data={"username": user.username, "password": user.password}
+    )
+    user.token = response.cookies.get("access_token")
+    if user.token is None:
+        raise RuntimeError(f"Logging in {user.username} failed: {response.status_code}")
+
+    batch = [{"type": "addition", "inputs": [rng.randint(1, 100), rng.randint(1, 100)]} for _ in range(rows)]
+    response = await client.post("/calculations/bulk", json=batch, headers=user.headers)
+    response.raise_for_status()
+    after = None
+    while True:
+        params = {"format": "json", "limit": 500}
+        if after is not None:
+            params["after"] = after
+        page = (await client.get("/calculations", params=params, headers=user.headers)).json()
+        user.calculation_ids.extend(item["id"] for item in page["items"])
+        after = page["next_after"]
+        if after is None:
+            return user
+
+
+async def seed(client: httpx.AsyncClient, users: int, rows: int, seed: int):
+    rng = random.Random(seed)
+    # Register a few at a time so seeding does not trip the hashing queue limit
+    semaphore = asyncio.Semaphore(4)
+
+    async def one():
+        async with semaphore:
+            return await seed_user(client, rows, rng)
+
+    seeded = await asyncio.gather(*(one() for _ in range(users)))
+    site = SiteState()
+    for page in ("/", "/login"):
+        site.assets.extend(ASSET.findall((await client.get(page)).text))
+    return list(seeded), site
+
+
+# ---------------------------------------------
+# Running
+# ---------------------------------------------
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Counter = Counter()
+
+    def record(self, route: str, seconds: float, status) -> None:
+        self.latencies[route].append(seconds)
+        self.statuses[route][str(status)] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[route] += 1
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    mix: str,
+    users: List[LoadUser],
+    site: SiteState,
+    concurrency: int,
+    duration: Optional[float] = None,
+    requests: Optional[int] = None,
+    warmup: float = 0.0,
+    seed: int = 0,
+):
+    """
+    Run the mix and return (Recorder, elapsed seconds of the recorded part).
+
+    Stops after duration seconds or once requests requests were sent, whichever
+    is set (both: whichever comes first).
+    """
+    actions, weights = zip(*MIXES[mix])
+    rngs = [random.Random(seed * 1000 + index) for index in range(concurrency)]
+
+    async def phase(seconds: Optional[float], budget: Optional[int], recorder: Optional[Recorder]):
+        deadline = time.perf_counter() + seconds if seconds is not None else math.inf
+        remaining = [math.inf if budget is None else budget]
+
+        async def worker(index: int):
+            rng, user = rngs[index], users[index % len(users)]
+            while time.perf_counter() < deadline and remaining[0] > 0:
+                remaining[0] -= 1
+                action = rng.choices(actions, weights)[0]
+                start = time.perf_counter()
+                try:
+                    status = (await action.send(client, rng, user, site)).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                if recorder is not None:
+                    recorder.record(action.route, time.perf_counter() - start, status)
+
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+
+    if warmup > 0:
+        await phase(warmup, None, None)
+    recorder = Recorder()
+    start = time.perf_counter()
+    await phase(duration, requests, recorder)
+    return recorder, time.perf_counter() - start
+
+
+# ---------------------------------------------
+# Reporting
+# ---------------------------------------------
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        **{f"p{p}_ms": round(percentile(ordered, p) * 1000, 3) for p in (50, 95, 99)},
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(recorder: Recorder, elapsed: float, settings: dict) -> dict:
+    every = [seconds for latencies in recorder.latencies.values() for seconds in latencies]
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "settings": settings,
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(every, sum(recorder.errors.values()), elapsed),
+        "routes": {
+            route: {
+                **summarize(latencies, recorder.errors[route], elapsed),
+                "statuses": dict(recorder.statuses[route]),
+            }
+            for route, latencies in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def print_report(result: dict) -> None:
+    columns = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")
+    print(f"{'route':<34}" + "".join(f"{name:>10}" for name in columns))
+    for route, stats in [*result["routes"].items(), ("total", result["total"])]:
+        print(f"{route:<34}" + "".join(f"{stats[name]:>10}" for name in columns))
+
+
+def compare(old: dict, new: dict) -> None:
+    """Print RPS and tail latency of new relative to old, per route."""
+
+    def change(before, after):
+        return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+    print(f"old: {old['commit']}  new: {new['commit']}")
+    print(f"{'route':<34}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    routes = [route for route in new["routes"] if route in old["routes"]]
+    for route in [*routes, "total"]:
+        before = old["total"] if route == "total" else old["routes"][route]
+        after = new["total"] if route == "total" else new["routes"][route]
+        print(
+            f"{route:<34}{change(before['rps'], after['rps']):>10}"
+            + "".join(
+                f"{change(before[name], after[name]):>10}" for name in ("p50_ms", "p95_ms", "p99_ms")
+            )
+        )
+
+
+# ---------------------------------------------
+# Command line
+# ---------------------------------------------
+
+
+@contextmanager
+def local_server(port: int, workers: int, internal_token: Optional[str] = None):
+    """Run uvicorn with the app on DATABASE_URL for the duration of the block."""
+    env = os.environ.copy()
+    if internal_token:
+        env["INTERNAL_API_TOKEN"] = internal_token
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    try:
+        if not wait_for_server(f"http://127.0.0.1:{port}/", timeout=30):
+            raise ServerStartupError("Failed to start the server for the load run")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run_command(args, base_url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        users, site = await seed(client, args.users or args.concurrency, args.seed_rows, args.seed)
+        if args.internal_token:
+            site.internal_headers = {"Authorization": f"Bearer {args.internal_token}"}
+        recorder, elapsed = await run_load(
+            client,
+            args.mix,
+            users,
+            site,
+            args.concurrency,
+            duration=args.duration if args.requests is None else None,
+            requests=args.requests,
+            warmup=args.warmup,
+            seed=args.seed,
+        )
+    settings = {
+        name: getattr(args, name)
+        for name in ("mix", "concurrency", "duration", "requests", "warmup", "users", "seed_rows", "seed")
+    }
+    settings["base_url"] = base_url
+    return report(recorder, elapsed, settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load harness for the app")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Seed users and run a load mix")
+    run.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run.add_argument("--start-server", action="store_true", help="Start uvicorn on DATABASE_URL")
+    run.add_argument("--port", type=int, default=8001, help="Port for --start-server")
+    run.add_argument("--workers", type=int, default=1, help="uvicorn workers for --start-server")
+    run.add_argument("--mix", choices=sorted(MIXES), default="full")
+    run.add_argument("--concurrency", type=int, default=20)
+    run.add_argument("--duration", type=float, default=30.0, help="Seconds to record")
+    run.add_argument("--requests", type=int, help="Stop after this many requests instead")
+    run.add_argument("--warmup", type=float, default=5.0, help="Seconds to run before recording")
+    run.add_argument("--users", type=int, help="Users to seed (default: one per worker)")
+    run.add_argument("--seed-rows", type=int, default=200, help="Calculations seeded per user")
+    run.add_argument("--seed", type=int, default=0, help="Random seed of the request mix")
+    run.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    run.add_argument(
+        "--internal-token",
+        default=os.environ.get("INTERNAL_API_TOKEN"),
+        help="INTERNAL_API_TOKEN for /metrics and /internal/* (default: from the environment)",
+    )
+    run.add_argument("--output", help="Write the report as JSON to this file")
+
+    comparison = commands.add_parser("compare", help="Compare two JSON reports")
+    comparison.add_argument("old")
+    comparison.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.old) as old, open(args.new) as new:
+            compare(json.load(old), json.load(new))
+        return
+
+    if args.start_server:
+        with local_server(args.port, args.workers, args.internal_token) as base_url:
+            result = asyncio.run(run_command(args, base_url))
+    else:
+        result = asyncio.run(run_command(args, args.base_url))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(result, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# tests/load/scenarios.py
+
+"""
+The requests the load harness sends and the mixes it weighs them by.
+
+Every action is one request to one route of main.py. It is named after the
+route, so the report groups by route, and it receives the worker's
+random.Random, its seeded LoadUser and the shared SiteState. Actions that
+need an id use one of the user's seeded calculations; the write actions keep
+that list current.
+
+Mixes:
+    arithmetic  the stateless operation routes, /batch and /expressions/evaluate
+    browse      the calculation reads and the homepage
+    login       logins and registrations (password hashing)
+    write       homepage calculations, creates, bulk imports, updates, deletes
+    full        every route, including /metrics and /internal/*, which need
+                the server's INTERNAL_API_TOKEN in SiteState.internal_headers
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from app.operations.registry import BY_CODE, OPERATIONS
+from tests.conftest import create_fake_user
+
+TYPES = [operation.name for operation in OPERATIONS.values()]
+FORMULAS = ["(a + b) * c", "a / (b + 1)", "a ** 2 + b ** 2", "(a - b) % (c + 1)"]
+
+INTERNAL_ROUTES = [
+    "/metrics",
+    "/internal/db/pool",
+    "/internal/db/replicas",
+    "/internal/db/sessions",
+    "/internal/cache/users",
+    "/internal/cache/results",
+    "/internal/cache/expressions",
+    "/internal/cache/fragments",
+    "/internal/write-behind",
+    "/internal/auth/hashing",
+]
+
+
+@dataclass
+class LoadUser:
+    username: str
+    password: str
+    token: Optional[str] = None
+    calculation_ids: List[int] = field(default_factory=list)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class SiteState:
+    # /static/ URLs of the homepage and login page assets
+    assets: List[str] = field(default_factory=list)
+    # Carry INTERNAL_API_TOKEN for /metrics and /internal/*
+    internal_headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Action:
+    route: str
+    send: Callable
+
+
+def operands(rng) -> List[float]:
+    # Never zero, so divide and modulus succeed
+    return [round(rng.uniform(1, 1000), 2) for _ in range(rng.randint(2, 5))]
+
+
+def calculation_id(rng, user: LoadUser) -> Optional[int]:
+    return rng.choice(user.calculation_ids) if user.calculation_ids else None
+
+
+# ---------------------------------------------
+# Pages and monitoring
+# ---------------------------------------------
+
+
+def get_path(path: str) -> Action:
+    return Action(f"GET {path}", lambda client, rng, user, site: client.get(path))
+
+
+def get_internal(path: str) -> Action:
+    def send(client, rng, user, site):
+        return client.get(path, headers=site.internal_headers)
+
+    return Action(f"GET {path}", send)
+
+
+def get_asset(client, rng, user, site):
+    return client.get(rng.choice(site.assets))
+
+
+# ---------------------------------------------
+# Arithmetic
+# ---------------------------------------------
+
+
+def operation_action(code: str) -> Action:
+    def send(client, rng, user, site):
+        a, b = operands(rng)[:2]
+        return client.post(f"/{code}", json={"a": a, "b": b})
+
+    return Action(f"POST /{code}", send)
+
+
+def post_batch(client, rng, user, site):
+    size = rng.randint(10, 200)
+    return client.post(
+        "/batch",
+        json={
+            "op": [rng.choice(list(BY_CODE)) for _ in range(size)],
+            "a": [rng.uniform(1, 1000) for _ in range(size)],
+            "b": [rng.uniform(1, 1000) for _ in range(size)],
+        },
+    )
+
+
+def post_expression(client, rng, user, site):
+    formula = rng.choice(FORMULAS)
+    if rng.random() < 0.5:
+        return client.post(
+            "/expressions/evaluate",
+            json={"formula": formula, "bindings": {name: rng.uniform(1, 100) for name in "abc"}},
+        )
+    size = rng.randint(10, 200)
+    return client.post(
+        "/expressions/evaluate",
+        json={
+            "formula": formula,
+            "batch": {name: [rng.uniform(1, 100) for _ in range(size)] for name in "abc"},
+        },
+    )
+
+
+# ---------------------------------------------
+# Calculation reads
+# ---------------------------------------------
+
+
+def browse(format: str) -> Action:
+    def send(client, rng, user, site):
+        params = {"format": format, "limit": rng.choice([10, 50])}
+        if user.calculation_ids and rng.random() < 0.3:
+            params["after"] = calculation_id(rng, user)
+        return client.get("/calculations", params=params, headers=user.headers)
+
+    return Action(f"GET /calculations ({format})", send)
+
+
+def read_calculation(client, rng, user, site):
+    return client.get(f"/calculations/{calculation_id(rng, user)}", headers=user.headers)
+
+
+def export_calculations(client, rng, user, site):
+    return client.get(
+        "/calculations/export",
+        params={"format": rng.choice(["ndjson", "csv"])},
+        headers=user.headers,
+    )
+
+
+def calculation_stats(client, rng, user, site):
+    return client.get("/calculations/stats", headers=user.headers)
+
+
+# ---------------------------------------------
+# Authentication
+# ---------------------------------------------
+
+
+def login(client, rng, user, site):
+    return client.post(
+        "/users/login", data={"username": user.username, "password": user.password}
+    )
+
+
+def register(client, rng, user, site):
+    return client.post("/users/register", data=create_fake_user())
+
+
+# ---------------------------------------------
+# Calculation writes
+# ---------------------------------------------
+
+
+def store_homepage_calculation(client, rng, user, site):
+    a, b = operands(rng)[:2]
+    return client.post(
+        "/",
+        data={"a": a, "b": b, "operation": rng.choice(list(BY_CODE))},
+        headers=user.headers,
+    )
+
+
+def add_calculation(client, rng, user, site):
+    return client.post(
+        "/calculations",
+        data={"type": rng.choice(TYPES), "inputs": ", ".join(map(str, operands(rng)))},
+        headers=user.headers,
+    )
+
+
+def bulk_import(client, rng, user, site):
+    rows = [{"type": rng.choice(TYPES), "inputs": operands(rng)} for _ in range(rng.randint(10, 100))]
+    return client.post("/calculations/bulk", json=rows, headers=user.headers)
+
+
+def edit_calculation(client, rng, user, site):
+    return client.put(
+        f"/calculations/{calculation_id(rng, user)}",
+        json={"type": rng.choice(TYPES), "inputs": operands(rng), "user_id": None},
+        headers=user.headers,
+    )
+
+
+async def delete_calculation(client, rng, user, site):
+    # Keep at least one row so reads and edits always have an id
+    if len(user.calculation_ids) < 2:
+        return await add_calculation(client, rng, user, site)
+    calc_id = user.calculation_ids.pop(rng.randrange(len(user.calculation_ids)))
+    return await client.delete(f"/calculations/{calc_id}", headers=user.headers)
+
+
+# ---------------------------------------------
+# Mixes
+# ---------------------------------------------
+
+ARITHMETIC = [
+    *((operation_action(code), 10) for code in BY_CODE),
+    (Action("POST /batch", post_batch), 5),
+    (Action("POST /expressions/evaluate", post_expression), 5),
+]
+BROWSE = [
+    (browse("json"), 30),
+    (browse("html"), 20),
+    (Action("GET /calculations/{id}", read_calculation), 30),
+    (Action("GET /calculations/stats", calculation_stats), 10),
+    (Action("GET /calculations/export", export_calculations), 2),
+    (get_path("/"), 5),
+    (Action("GET /static/{name}", get_asset), 3),
+]
+LOGIN = [
+    (Action("POST /users/login", login), 90),
+    (Action("POST /users/register", register), 5),
+    (get_path("/login"), 5),
+]
+WRITE = [
+    (Action("POST /", store_homepage_calculation), 30),
+    (Action("POST /calculations", add_calculation), 30),
+    (Action("POST /calculations/bulk", bulk_import), 5),
+    (Action("PUT /calculations/{id}", edit_calculation), 25),
+    (Action("DELETE /calculations/{id}", delete_calculation), 10),
+]
+FULL = [
+    *ARITHMETIC,
+    *BROWSE,
+    *LOGIN,
+    *WRITE,
+    *((get_internal(path), 1) for path in INTERNAL_ROUTES),
+]
+
+MIXES = {
+    "arithmetic": ARITHMETIC,
+    "browse": BROWSE,
+    "login": LOGIN,
+    "write": WRITE,
+    "full": FULL,
+}
@@ -0,0 +1,76 @@
+# tests/unit/test_cache.py
+
+from app.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_and_set() -> None:
+    cache = LRUCache()
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_entry() -> None:
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_bound() -> None:
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 4)
+    assert cache.current_bytes == 10
+
+    cache.set("c", "z" * 3)
+    assert cache.get("a") is None
+    assert cache.current_bytes == 7
+    assert cache.set("huge", "w" * 11) is False
+    assert cache.get("huge") is None
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache = LRUCache(ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_invalidate_and_clear() -> None:
+    cache = LRUCache(sizeof=lambda value: 2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.current_bytes == 2
+    cache.set(("user", 1), 3)
+    cache.set(("user", 2), 4)
+    assert cache.invalidate_where(lambda key: key[0] == "user") == 2
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.calculation_import import ImportFormatError, iter_csv_records, iter_json_records
+
+
+async def byte_chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def collect(parser, data: bytes, size: int):
+    async def run():
+        return [record async for record in parser(byte_chunks(data, size))]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1024])
+def test_json_records_across_chunk_boundaries(size):
+    data = '[ {"type": "addition", "inputs": [1.5, 2]}, 12345, "é" ,[]]'.encode()
+    assert collect(iter_json_records, data, size) == [
+        {"type": "addition", "inputs": [1.5, 2]},
+        12345,
+        "é",
+        [],
+    ]
+
+
+def test_json_empty_array():
+    assert collect(iter_json_records, b" [ ] ", 1) == []
+
+
+@pytest.mark.parametrize("data", [b"{}", b"[1, 2", b"[1 2]", b"[1] [2]", b"[{]"])
+def test_json_malformed(data):
+    with pytest.raises(ImportFormatError):
+        collect(iter_json_records, data, 2)
+
+
+@pytest.mark.parametrize("size", [1, 5, 1024])
+def test_csv_records_across_chunk_boundaries(size):
+    data = b'id,type,inputs,result\r\n1,addition,"[1, 2]",3\r\n2,division,"[4, 2]",2'
+    assert collect(iter_csv_records, data, size) == [
+        {"id": "1", "type": "addition", "inputs": "[1, 2]", "result": "3"},
+        {"id": "2", "type": "division", "inputs": "[4, 2]", "result": "2"},
+    ]
+
+
+def test_csv_requires_header_columns():
+    with pytest.raises(ImportFormatError):
+        collect(iter_csv_records, b"a,b\n1,2\n", 4)
@@ -0,0 +1,102 @@
+# tests/unit/test_expressions.py
+
+import pytest
+
+from app.cache import LRUCache
+from app.operations import expressions
+from app.operations.expressions import (
+    NOT_FINITE,
+    ExpressionError,
+    compile_expression,
+    get_expression,
+)
+
+
+@pytest.fixture
+def expression_cache(monkeypatch):
+    cache = LRUCache(max_entries=2)
+    monkeypatch.setattr(expressions, "expression_cache", cache)
+    return cache
+
+
+def test_evaluate_single_binding() -> None:
+    compiled = compile_expression("(a + b) * c / d")
+    assert compiled.variables == ("a", "b", "c", "d")
+    assert compiled.evaluate({"a": 1, "b": 2, "c": 4, "d": 3}) == 4.0
+    assert compiled.evaluate_values([1, 2, 4, 3]) == 4.0
+    # Literals are floats, so integer-looking formulas divide and power as floats
+    assert compile_expression("7 / 2 + 2 ** -1").evaluate({}) == 4.0
+    assert compile_expression("-x % 3").evaluate({"x": 4}) == 2.0
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        "__import__('os')",
+        "a.real",
+        "a[0]",
+        "a if b else c",
+        "a < b",
+        "a and b",
+        "lambda: 1",
+        "True + 1",
+        "'a' * 3",
+        "__class__",
+        "a // b",
+        "x = 1",
+        "",
+        "1 +",
+        "a + " * 300 + "a",
+    ],
+)
+def test_rejects_anything_but_arithmetic(formula) -> None:
+    with pytest.raises(ExpressionError):
+        compile_expression(formula)
+
+
+@pytest.mark.parametrize(
+    "formula, bindings",
+    [
+        ("a / b", {"a": 1, "b": 0}),
+        ("a % b", {"a": 1, "b": 0}),
+        ("a ** b", {"a": 10, "b": 400}),
+        ("a ** 0.5", {"a": -4}),
+        ("a + b", {"a": 1}),
+    ],
+)
+def test_evaluation_errors(formula, bindings) -> None:
+    with pytest.raises(ExpressionError):
+        compile_expression(formula).evaluate(bindings)
+
+
+def test_evaluate_batch_reports_failed_elements() -> None:
+    compiled = compile_expression("(a + b) / c")
+    result = compiled.evaluate_batch({"a": [1, 2, 3], "b": [1, 2, 3], "c": [2, 0, -3]})
+    assert result.to_list() == [1.0, None, -2.0]
+    assert list(result.errors) == [1]
+
+    constant = compile_expression("2 * 3").evaluate_batch({})
+    assert constant.to_list() == [6.0]
+
+    # Constant formulas run on Python floats, which raise rather than overflow
+    for formula in ("1/0", "2.0**5000", "(-8) ** 0.5"):
+        failed = compile_expression(formula).evaluate_batch({})
+        assert failed.to_list() == [None]
+        assert failed.errors == {0: NOT_FINITE}
+
+    with pytest.raises(ExpressionError):
+        compiled.evaluate_batch({"a": [1], "b": [1, 2], "c": [1]})
+
+
+def test_get_expression_caches_compiled_formulas(expression_cache) -> None:
+    first = get_expression("a * b")
+    assert get_expression("a * b") is first
+    get_expression("a + b")
+    get_expression("a - b")
+    stats = expressions.cache_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["hit_ratio"] == 0.25
+    # Invalid formulas are not cached
+    with pytest.raises(ExpressionError):
+        get_expression("a(")
+    assert len(expression_cache) == 2
@@ -0,0 +1,63 @@
+# tests/unit/test_hashing.py
+
+import asyncio
+
+import pytest
+
+from app.auth.hashing import HashingQueueFull, PasswordHasher
+from app.models.user import User
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(kind="thread", workers=2, max_pending=4)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify(hasher) -> None:
+    async def run():
+        hashed = await hasher.hash("SecurePass123")
+        return hashed, await hasher.verify("SecurePass123", hashed), await hasher.verify(
+            "wrong", hashed
+        )
+
+    hashed, good, bad = asyncio.run(run())
+
+    assert User(password=hashed).verify_password("SecurePass123")
+    assert good is True
+    assert bad is False
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["latency_seconds_max"] > 0
+
+
+def test_full_queue_rejects_fast(hasher) -> None:
+    """
+    Calls beyond max_pending fail immediately instead of waiting for the pool.
+    """
+    async def run():
+        return await asyncio.gather(
+            *(hasher.hash("SecurePass123") for _ in range(6)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    rejected = [r for r in results if isinstance(r, HashingQueueFull)]
+    assert len(rejected) == 2
+    assert hasher.stats()["rejected"] == 2
+
+
+def test_process_pool() -> None:
+    hasher = PasswordHasher(kind="process", workers=1, max_pending=2)
+    try:
+        hashed = asyncio.run(hasher.hash("SecurePass123"))
+    finally:
+        hasher.shutdown()
+    assert User(password=hashed).verify_password("SecurePass123")
+
+
+def test_unknown_kind() -> None:
+    with pytest.raises(ValueError):
+        PasswordHasher(kind="gpu")
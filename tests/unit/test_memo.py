@@ -0,0 +1,74 @@
+# tests/unit/test_memo.py
+
+import pytest
+
+from app.cache import LRUCache
+from app.config import settings
+from app.operations import add, divide, memo
+from app.operations.reductions import reduce_inputs
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "RESULT_CACHE_MAX_INPUTS", 4)
+    monkeypatch.setattr(memo, "bypassed", 0)
+    cache = LRUCache(max_bytes=settings.RESULT_CACHE_MAX_BYTES, sizeof=memo._entry_size)
+    monkeypatch.setattr(memo, "result_cache", cache)
+    return cache
+
+
+def test_cache_key_is_canonical() -> None:
+    assert memo.cache_key("addition", [1.0, 2.0]) == memo.cache_key("addition", (1.0, 2.0))
+    assert memo.cache_key("addition", [1.0, 2.0]) != memo.cache_key("addition", [1, 2])
+    assert memo.cache_key("addition", [0.0, 1.0]) != memo.cache_key("addition", [-0.0, 1.0])
+    assert memo.cache_key("addition", [1.0, 2.0]) != memo.cache_key("subtraction", [1.0, 2.0])
+
+
+def test_disabled_by_default() -> None:
+    assert settings.RESULT_CACHE_ENABLED is False
+    before = memo.stats()
+    assert reduce_inputs("addition", [1, 2]) == 3
+    assert memo.stats() == before
+
+
+def test_reduce_inputs_hits_cache(result_cache) -> None:
+    assert reduce_inputs("multiplication", [2.0, 3.0]) == 6.0
+    assert reduce_inputs("multiplication", [2.0, 3.0]) == 6.0
+    # int inputs keep their own entry and their own result type
+    assert type(reduce_inputs("multiplication", [2, 3])) is int
+
+    stats = memo.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_operations_share_the_cache(result_cache) -> None:
+    assert add(1.5, 2.0) == 3.5
+    assert add(1.5, 2.0) == 3.5
+    assert memo.stats()["hits"] == 1
+    assert add.__name__ == "add"
+
+
+def test_errors_are_not_cached(result_cache) -> None:
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            divide(1.0, 0.0)
+    assert len(result_cache) == 0
+
+
+def test_long_inputs_bypass_cache(result_cache) -> None:
+    assert reduce_inputs("addition", [1.0] * 5) == 5.0
+    assert memo.stats()["bypassed"] == 1
+    assert len(result_cache) == 0
+
+
+def test_byte_bound_evicts_least_recently_used(result_cache, monkeypatch) -> None:
+    entry = memo._entry_size(1.0)
+    monkeypatch.setattr(result_cache, "max_bytes", entry * 2)
+
+    for value in (1.0, 2.0, 3.0):
+        reduce_inputs("addition", [value, 1.0])
+
+    assert len(result_cache) == 2
+    assert memo.stats()["evictions"] == 1
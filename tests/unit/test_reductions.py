@@ -0,0 +1,67 @@
+# tests/unit/test_reductions.py
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.operations.reductions import (
+    SCALAR_KERNELS,
+    VECTOR_KERNELS,
+    reduce_inputs,
+    use_vector,
+)
+
+CALC_TYPES = ["addition", "subtraction", "multiplication", "division", "modulus"]
+
+
+def make_inputs(size):
+    rng = random.Random(size)
+    return [rng.uniform(0.99, 1.01) for _ in range(size)]
+
+
+@pytest.mark.parametrize("calc_type", CALC_TYPES)
+@pytest.mark.parametrize("size", [2, 3, 100, 5000])
+def test_vector_matches_scalar(calc_type, size) -> None:
+    """
+    Both kernels fold left to right, so they agree for every calculation type.
+    Addition is compared with a tolerance because NumPy sums pairwise.
+    """
+    values = make_inputs(size)
+
+    scalar = SCALAR_KERNELS[calc_type](values)
+    vector = VECTOR_KERNELS[calc_type](values)
+
+    if calc_type == "addition":
+        assert math.isclose(scalar, vector, rel_tol=1e-12)
+    else:
+        assert scalar == vector
+
+
+@pytest.mark.parametrize("calc_type", ["division", "modulus"])
+@pytest.mark.parametrize("kernels", [SCALAR_KERNELS, VECTOR_KERNELS])
+def test_zero_divisor_raises(calc_type, kernels) -> None:
+    with pytest.raises(ValueError):
+        kernels[calc_type]([8, 2, 0, 4])
+
+
+@pytest.mark.parametrize("kernels", [SCALAR_KERNELS, VECTOR_KERNELS])
+def test_zero_dividend_is_allowed(kernels) -> None:
+    assert kernels["division"]([0, 2]) == 0
+
+
+def test_kernel_selection() -> None:
+    """
+    Short lists use the scalar kernel; long lists and arrays use the vector kernel.
+    """
+    assert not use_vector("division", [8, 2])
+    assert use_vector("division", make_inputs(10_000))
+    assert not use_vector("addition", make_inputs(10_000))
+    assert use_vector("addition", np.array([1.0, 2.0]))
+
+
+def test_reduce_inputs() -> None:
+    assert reduce_inputs("addition", [1, 2, 3]) == 6
+    assert reduce_inputs("modulus", [10, 4]) == 2
+    assert reduce_inputs("multiplication", np.array([2.0, 3.0, 4.0])) == 24.0
@@ -0,0 +1,53 @@
+# tests/unit/test_registry.py
+
+import pytest
+
+from app.models.calculation import Calculation
+from app.operations import reductions, vectorized
+from app.operations.registry import BY_CODE, CALCULATION_TYPES, OPERATIONS, Operation, register
+from app.schemas.calculation import CalculationType
+
+
+def test_registry_fills_dispatch_tables() -> None:
+    assert list(OPERATIONS) == list(reductions.SCALAR_KERNELS) == list(reductions.VECTOR_KERNELS)
+    assert list(BY_CODE) == list(vectorized.KERNELS)
+    for operation in OPERATIONS.values():
+        assert BY_CODE[operation.code] is operation
+        assert vectorized.KERNELS[operation.code] == (operation.batch, operation.zero_divisor_error)
+        assert reductions.VECTOR_THRESHOLDS[operation.name] == operation.vector_threshold
+
+
+def test_schema_and_models_follow_registry() -> None:
+    assert [member.value for member in CalculationType] == [*OPERATIONS, "expression"]
+    for name, operation in OPERATIONS.items():
+        calc = Calculation.create(name, None, [6, 3])
+        assert type(calc) is operation.model
+        assert calc.get_result() == operation.scalar(6, 3)
+    assert type(Calculation.create("power", None, [2, 3])) is Calculation
+
+
+def test_expression_is_a_calculation_type_without_kernels() -> None:
+    expression = CALCULATION_TYPES["expression"]
+    assert list(CALCULATION_TYPES) == [*OPERATIONS, "expression"]
+    assert "expression" not in OPERATIONS and "expression" not in reductions.SCALAR_KERNELS
+    assert None not in BY_CODE
+
+    calc = Calculation.create("expression", None, [3, 4], "x * y")
+    assert type(calc) is expression.model
+    assert calc.get_result() == 12.0
+    assert Calculation.compute_result("expression", [3], "x * y") is None
+    assert Calculation.compute_result("expression", [3, 4], "x * (") is None
+
+    expression.validate([3, 4], "x * y")
+    for inputs, formula in (([3], "x * y"), ([3, 4], None), ([3, 4], "x * (")):
+        with pytest.raises(ValueError):
+            expression.validate(inputs, formula)
+    with pytest.raises(ValueError):
+        OPERATIONS["addition"].validate([3, 4], "x * y")
+
+
+def test_register_rejects_duplicates() -> None:
+    addition = OPERATIONS["addition"]
+    with pytest.raises(ValueError):
+        register(Operation(**{**addition.__dict__, "code": "plus"}))
+    assert "plus" not in BY_CODE
@@ -0,0 +1,55 @@
+# tests/unit/test_static_pages.py
+
+import gzip
+
+from app import static_pages
+
+
+def test_minifiers() -> None:
+    assert static_pages.minify_css("/* c */ a { color : red ; }\n b{x:1}") == "a{color:red}b{x:1}"
+    assert static_pages.minify_js("  /* c */\n  // line\n  f(1);  \n\n  g();") == "f(1);\ng();"
+    assert static_pages.minify_html("<p>\n  <!-- c -->\n  a   b\n</p>") == "<p>\na b\n</p>"
+
+
+def test_build_then_load(tmp_path) -> None:
+    manifest = static_pages.build(tmp_path)
+
+    assert set(manifest["files"]) >= set(static_pages.PAGES)
+    assets = [name for name in manifest["files"] if name not in static_pages.PAGES]
+    index = (tmp_path / "index.html").read_text()
+    assert "<!--" not in index and "<style>" not in index
+    for asset in assets:
+        assert f"/static/{asset}" in index
+    assert gzip.decompress((tmp_path / "index.html.gz").read_bytes()).decode() == index
+
+    site = static_pages.load_site(tmp_path)
+    assert site.files["index.html"].variants["identity"][0] == index.encode()
+
+
+def test_stale_build_is_rebuilt_in_memory(tmp_path) -> None:
+    static_pages.build(tmp_path)
+    (tmp_path / "index.html").write_text("old build")
+    manifest = (tmp_path / "manifest.json").read_text().replace('"index.html": "', '"index.html": "x')
+    (tmp_path / "manifest.json").write_text(manifest)
+
+    site = static_pages.load_site(tmp_path)
+    assert b"Hello World" in site.files["index.html"].variants["identity"][0]
+
+
+def test_response_negotiates_encoding_and_revalidates() -> None:
+    site = static_pages.load_site(static_pages.Path("/nonexistent"))
+
+    plain = site.response("index.html", {})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Cache-Control"] == "no-cache"
+
+    compressed = site.response("index.html", {"accept-encoding": "br;q=0, gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == plain.body
+
+    etag = compressed.headers["ETag"]
+    cached = site.response(
+        "index.html", {"accept-encoding": "gzip", "if-none-match": etag}
+    )
+    assert cached.status_code == 304
+    assert site.response("missing.css", {}) is None
@@ -0,0 +1,84 @@
+# tests/unit/test_vectorized.py
+
+import math
+
+import pytest
+
+from app import operations
+from app.operations import vectorized
+
+
+@pytest.mark.parametrize(
+    "op, scalar",
+    [
+        ("add", operations.add),
+        ("subtract", operations.subtract),
+        ("multiply", operations.multiply),
+        ("divide", operations.divide),
+        ("modulus", operations.modulus),
+    ],
+    ids=["add", "subtract", "multiply", "divide", "modulus"],
+)
+def test_kernel_matches_scalar(op, scalar) -> None:
+    """
+    Each vectorized kernel returns the same values as its scalar counterpart.
+    """
+    a = [7, -7, 2.5, 0, 1e10]
+    b = [3, 3, -0.5, 4, 7]
+    kernel, _ = vectorized.KERNELS[op]
+
+    result = kernel(a, b).tolist()
+
+    assert result == [scalar(x, y) for x, y in zip(a, b)]
+
+
+def test_evaluate_mixed_batch() -> None:
+    """
+    A batch can mix operations and keeps the element order.
+    """
+    batch = vectorized.evaluate(
+        ["add", "subtract", "multiply", "divide", "modulus"],
+        [10, 10, 10, 10, 10],
+        [5, 5, 5, 5, 3],
+    )
+
+    assert batch.to_list() == [15.0, 5.0, 50.0, 2.0, 1.0]
+    assert batch.errors == {}
+
+
+def test_evaluate_reports_zero_divisors() -> None:
+    """
+    Zero divisors fail only their own element; the rest of the batch is evaluated.
+    """
+    batch = vectorized.evaluate(
+        ["divide", "add", "modulus", "divide"], [1, 1, 1, 8], [0, 0, 0, 2]
+    )
+
+    assert batch.to_list() == [None, 1.0, None, 4.0]
+    assert batch.errors == {
+        0: "Cannot divide by zero!",
+        2: "Cannot perform modulus by zero!",
+    }
+    assert math.isnan(batch.results[0])
+
+
+def test_evaluate_reports_overflow() -> None:
+    """
+    Results that overflow to infinity are reported instead of returned.
+    """
+    batch = vectorized.evaluate(["multiply", "add"], [1e308, 1], [10, 2])
+
+    assert batch.to_list() == [None, 3.0]
+    assert batch.errors == {0: vectorized.NOT_FINITE}
+
+
+def test_evaluate_empty_batch() -> None:
+    batch = vectorized.evaluate([], [], [])
+    assert batch.to_list() == []
+
+
+def test_evaluate_rejects_bad_input() -> None:
+    with pytest.raises(ValueError, match="same length"):
+        vectorized.evaluate(["add"], [1, 2], [3])
+    with pytest.raises(ValueError, match="Unknown operation"):
+        vectorized.evaluate(["power"], [1], [2])